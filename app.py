@@ -4,14 +4,24 @@
 
 import asyncio
 import os
-import re
 import sqlite3
 import time
+import uuid
 from datetime import datetime
 import pandas as pd
 
 import streamlit as st
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from browser_pool import BrowserManager, HandoffLimit
+from netrules import RouteRules
+from http_backend import SessionExpired
+from portal import browser_fetch, capture_captcha_image, init_portal, portal_cookies, warm_portal
+from storage import DB_PATH, LOG_COLUMNS, LOG_PAGE_SIZE, SOURCE_APP, connect, ensure_schema, get_writer, query_log_page
+from case_cache import CaseCache, format_age
+from case_search import index_case, search_cases
+from pdf_pipeline import get_downloader
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue
+import metrics
+from metrics import span
 
 # Windows fix
 try:
@@ -19,127 +29,249 @@ try:
 except (AttributeError, NotImplementedError):
     pass
 
-# --- Playwright in streamlint ---
-if "playwright" not in st.session_state:
-    try:
-        st.session_state.playwright = sync_playwright().start()
-        st.session_state.browser = st.session_state.playwright.chromium.launch(headless=False)
-        st.session_state.page = st.session_state.browser.new_page()
-    except Exception as e:
-        st.error(f"Playwright shuru nahi ho saka: {e}")
-        st.stop()
-
 # ---------- Constants ----------
-ECOURTS_START_URL = "https://services.ecourts.gov.in/ecourtindia_v6/"
-DB_PATH = "queries.db"
+COURT_NAME = "Gaya District Court (eCourts)"
+CACHE_TTL_SECONDS = 6 * 3600
+MAX_BROWSER_CONTEXTS = 8
+BROWSER_IDLE_TIMEOUT = 15 * 60
+WARM_PORTALS = int(os.environ.get("COURT_WARM_PORTALS", "2"))  # pehle se khule portal pages (CAPTCHA ready)
+WARM_PORTAL_TTL = 10 * 60
+FETCH_WORKERS = 4       # ek saath chalne wale background lookups (saare sessions milakar)
+MAX_QUEUED_LOOKUPS = 2  # ek session ke itne lookups ek saath (har ek ke paas apna pinned browser page)
+JOB_POLL_SECONDS = 2
 CASE_TYPES = ["CR", "CS", "CIVIL", "CRIMINAL", "MISC", "M.A.", "EA", "EX", "FA", "SA"]
 EMBLEM_URL = "https://upload.wikimedia.org/wikipedia/commons/thumb/5/55/Emblem_of_India.svg/120px-Emblem_of_India.svg.png"
 
 # ---------- Utilities (Backend Logic) ----------
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS queries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT NOT NULL, court TEXT NOT NULL,
-            case_type TEXT NOT NULL, case_number TEXT NOT NULL, filing_year TEXT NOT NULL,
-            captcha_used TEXT, result_ok INTEGER NOT NULL, latest_pdf TEXT, html TEXT
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
+def log_query(court, case_type, case_number, filing_year, result_ok, latest_pdf, html, parsed=None):
+    """Background writer ki queue mein daalta hai; False agar queue bhari thi. Successful `parsed` result
+    case search index mein bhi jaata hai."""
+    now = datetime.now()
+    ts = now.isoformat(timespec="seconds")
+    writer = get_writer(DB_PATH)
+    with span("db_write") as sp:
+        logged = writer.submit("snapshots", {
+            "ts": int(now.timestamp()), "source": SOURCE_APP, "court": court, "case_type": case_type,
+            "case_number": case_number, "filing_year": filing_year, "ok": 1 if result_ok else 0,
+            "latest_pdf": latest_pdf or None, "html": html or "",
+        })
+        if logged and result_ok and parsed:
+            index_case(writer, court, case_type, case_number, filing_year, parsed, ts, "app")
+        if not logged:
+            sp.fail("queue full")
+    return logged
 
-def log_query(court, case_type, case_number, filing_year, captcha_used, result_ok, latest_pdf, html):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO queries (ts, court, case_type, case_number, filing_year, captcha_used, result_ok, latest_pdf, html) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        (datetime.now().isoformat(timespec="seconds"), court, case_type, case_number, filing_year, captcha_used or "", 1 if result_ok else 0, latest_pdf or "", html or ""),
-    )
-    conn.commit()
-    conn.close()
+@st.cache_resource
+def get_case_cache():
+    return CaseCache(DB_PATH, ttl=CACHE_TTL_SECONDS)
+
+# --- Playwright in streamlit: ek shared headless browser, har session ka apna context ---
+@st.cache_resource
+def get_browser_manager():
+    return BrowserManager(max_contexts=MAX_BROWSER_CONTEXTS, idle_timeout=BROWSER_IDLE_TIMEOUT, route_rules=RouteRules(),
+                          warm_size=WARM_PORTALS, warmup=warm_portal, warm_ttl=WARM_PORTAL_TTL, max_handoffs=MAX_QUEUED_LOOKUPS)
 
-def get_browser_page():
-    if "page" not in st.session_state or st.session_state.page.is_closed():
-        if "browser" not in st.session_state or not st.session_state.browser.is_connected():
-            reset_browser()
-        st.session_state.page = st.session_state.browser.new_page()
-    return st.session_state.page
-
-def goto_case_number_page(page):
-    page.goto(ECOURTS_START_URL, timeout=60000, wait_until="load")
-    possible_texts = ["Case Status", "Case Number"]
-    for t in possible_texts:
+def session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def in_browser(fn, *args, **kwargs):
+    """`fn(page, ...)` ko is session ke browser context mein chalata hai."""
+    return get_browser_manager().call(session_id(), fn, *args, **kwargs)
+
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(workers=FETCH_WORKERS)
+
+def fetch_case(manager, page_id, case_type, case_number, filing_year, captcha_text, http_session=None, use_http=False):
+    """(parsed result dict ya None agar portal ne details/CAPTCHA reject kar diye, direct-HTTP session: chalu wala,
+    naya capture hua, ya None agar expire ho gaya). Browser ka kaam `page_id` ke page par hota hai."""
+    if http_session is not None:
         try:
-            page.get_by_text(t, exact=False).first.click(timeout=3000)
-        except Exception:
-            pass
+            with span("http_lookup"):
+                # CAPTCHA nahi: `captcha_text` kisi doosre page ka hai, aur http_session ke cookies apne capture wale
+                # CAPTCHA se jude hain; build() wahi recorded value bhejta hai
+                parsed = http_session.lookup(
+                    case_type=http_session.option_values.get(case_type, case_type),
+                    case_number=case_number, year=filing_year,
+                )
+            parsed["source"] = "http"
+            return parsed, http_session
+        except SessionExpired:
+            http_session.close()
 
-def select_state_and_district(page, state_name="Bihar", district_name="Gaya"):
+    return manager.call(page_id, browser_fetch, case_type, case_number, filing_year, captcha_text, record_http=use_http)
+
+def run_lookup(progress, manager, cache, page_id, case_type, case_number, filing_year, captcha_text, http_session, use_http):
+    """Background worker mein ek lookup: submit + parse, cache, order PDF aur log. Yahan Streamlit APIs nahi chalti;
+    UI job poora hone par result se session state update karta hai."""
+    result = {"parsed": None, "http_session": None, "use_http": use_http, "order_pdf": None, "logged": None}
+    case_label = f"{case_type}/{case_number}/{filing_year}"
+    try:
+        progress("submitting to the portal")
+        result["parsed"], result["http_session"] = fetch_case(manager, page_id, case_type, case_number, filing_year,
+                                                              captcha_text, http_session, use_http)
+        parsed = result["parsed"]
+        if parsed is None:
+            return result
+        if parsed["success"]:
+            progress("saving")
+            cache.put(COURT_NAME, case_type, case_number, filing_year, parsed)
+            try:
+                cookies = manager.call(page_id, portal_cookies)
+            except Exception:
+                cookies = None
+            result["order_pdf"] = queue_order_pdf(parsed, case_label, cookies)
+    finally:
+        # Job ka page sirf is ek submit ke liye tha
+        manager.release(page_id)
     try:
-        page.select_option("select[id*='state']", label=state_name, timeout=5000)
-        time.sleep(1)
-        page.select_option("select[id*='district']", label=district_name, timeout=5000)
-        time.sleep(1)
+        result["logged"] = log_query(court=COURT_NAME, case_type=case_type, case_number=case_number, filing_year=filing_year,
+                                     result_ok=parsed["success"], latest_pdf=parsed.get("latest_pdf", ""),
+                                     html=parsed.get("html", ""), parsed=parsed)
+    except Exception as e:
+        result["log_error"] = str(e)
+    return result
+
+def queue_lookup(case_type, case_number, filing_year, captcha_text, use_http):
+    """Session ka page (jis par user ne CAPTCHA padha) job ko saunp kar lookup queue karta hai aur job id deta hai.
+    Session ko turant warm page mil jaata hai (ho toh), taaki agle lookup ka CAPTCHA dikh jaaye. None agar woh page
+    ab tha hi nahi (idle ho kar band / browser restart): tab naya CAPTCHA khulta hai aur job nahi banta. Session ke
+    MAX_QUEUED_LOOKUPS pehle se chal rahe hon toh HandoffLimit; page (aur CAPTCHA) session ke paas hi rehta hai."""
+    manager = get_browser_manager()
+    page_id = f"{session_id()}:{uuid.uuid4().hex[:8]}"
+    handed_off = manager.handoff(session_id(), page_id)
+    for k in ("portal_ready", "captcha_src", "captcha_png", "portal_waits"):
+        st.session_state.pop(k, None)
+    http_session = st.session_state.get("http_session") if use_http else None
+    if not handed_off and http_session is None:
+        # Naye page par purana CAPTCHA kabhi sahi nahi hoga; job bhejne ke bajaye user ko naya CAPTCHA dikhao
+        open_portal()
+        return None
+    job_id = get_job_queue().submit(session_id(), f"{case_type}/{case_number}/{filing_year}", run_lookup, manager, get_case_cache(),
+                                    page_id, case_type, case_number, filing_year, captcha_text, http_session, use_http)
+    try:
+        open_portal(cold=False)
     except Exception:
         pass
+    return job_id
+
+def absorb_job(job):
+    """Poore hue job ka result session state mein (har job ek hi baar)."""
+    st.session_state.seen_jobs.add(job.id)
+    if job.status != DONE:
+        return
+    result = job.result
+    if result["use_http"]:
+        if result["http_session"] is not None:
+            st.session_state.http_session = result["http_session"]
+        else:
+            st.session_state.pop("http_session", None)
+    if result["order_pdf"] is not None:
+        st.session_state.setdefault("order_pdfs", {})[result["parsed"]["latest_pdf"]] = result["order_pdf"]
+    if result["parsed"] is not None:
+        st.session_state.parsed_results = result["parsed"]
+        st.session_state.shown_job = job.id
+
+def job_outcome(job):
+    if job.status == FAILED:
+        return job.error
+    if not job.finished:
+        return job.stage
+    parsed = job.result["parsed"]
+    if parsed is None:
+        return "rejected: invalid details or CAPTCHA"
+    text = "found" if parsed["success"] else "case not found"
+    if job.result.get("log_error"):
+        text += f", not logged ({job.result['log_error']})"
+    elif job.result["logged"] is False:
+        text += ", not logged (database queue full)"
+    return text
+
+def show_jobs(jobs):
+    """Is session ke lookups: status/progress, aur poore hue ka result dekhne ka button."""
+    icons = {QUEUED: "⏳", RUNNING: "🔄", DONE: "✅", FAILED: "❌"}
+    for job in jobs[:10]:
+        cols = st.columns([5, 1])
+        cols[0].write(f"{icons[job.status]} **{job.label}** ({job.elapsed:.0f}s): {job_outcome(job)}")
+        if job.status == DONE and job.result["parsed"] is not None and job.id != st.session_state.get("shown_job"):
+            if cols[1].button("Show", key=f"show_{job.id}"):
+                st.session_state.parsed_results = job.result["parsed"]
+                st.session_state.shown_job = job.id
+                st.rerun()
 
-def capture_captcha_image(page):
-    loc = page.locator("img#captcha_image, img[id*='captcha']").first
-    return loc.screenshot(timeout=5000)
+def poll_jobs():
+    """Jobs chal rahe hon tab tak har JOB_POLL_SECONDS par sirf yeh hissa dobara chalta hai; koi job poora hote hi
+    poora app rerun hota hai (result, CAPTCHA, log table sab naye)."""
+    jobs = get_job_queue().for_session(session_id())
+    if any(job.finished and job.id not in st.session_state.seen_jobs for job in jobs):
+        st.rerun()
+    show_jobs(jobs)
+
+# Streamlit >= 1.37: fragment apne aap refresh hota hai; purane versions mein "Refresh status" button
+if hasattr(st, "fragment"):
+    poll_jobs = st.fragment(run_every=JOB_POLL_SECONDS)(poll_jobs)
 
-def fill_form_and_submit(page, case_type, case_number, filing_year, captcha_text):
-    page.select_option("select[id*='caseType'], select[id*='ctype']", label=case_type)
-    page.fill("input[id*='caseNo'], input[placeholder*='Case Number' i]", case_number)
-    year_selector = "select[id*='year']"
-    if page.locator(year_selector).count() > 0:
-        page.select_option(year_selector, value=str(filing_year))
+def queue_order_pdf(parsed, case_key, cookies=None):
+    """Latest order PDF ka background download (pehle se stored ho toh turant poora). Future, ya None."""
+    url = parsed.get("latest_pdf")
+    if not url:
+        return None
+    return get_downloader(DB_PATH).submit(url, case_key, cookies, timeout=0)
+
+def open_portal(cold=True):
+    """Session ko warm pool se ready portal page deta hai; koi warm na ho aur `cold` ho toh yahin initialize karta hai.
+    True agar portal ready hai."""
+    info = get_browser_manager().claim_warm(session_id())
+    if info is not None:
+        st.session_state.portal_waits = [("warm pool", 0.0)]
+        st.session_state.captcha_src = info["captcha_src"]
+        st.session_state.captcha_png = info["captcha_png"]
+    elif cold:
+        st.session_state.portal_waits = in_browser(init_portal)
+        st.session_state.pop("captcha_src", None)
     else:
-        page.fill("input[id*='year']", str(filing_year))
-    page.fill("input[id*='captcha']", captcha_text.strip())
-    page.click("button:has-text('Search'), button:has-text('Get Status')")
-    page.wait_for_timeout(3000)
-    body = page.content()
-    return "Invalid CAPTCHA" not in body and "Invalid Case Details" not in body
-
-def parse_results(page):
-    html = page.content()
-    def extract_text(pattern):
-        m = re.search(pattern, html, flags=re.I | re.S)
-        return re.sub(r"<[^>]+>|\s+", " ", m.group(1)).strip() if m else ""
-
-    petitioner = extract_text(r"Petitioner\s*</[^>]+>\s*<[^>]+>\s*(.*?)</")
-    respondent = extract_text(r"Respondent\s*</[^>]+>\s*<[^>]+>\s*(.*?)</")
-    filing_date = extract_text(r"Filing\s*Date\s*[:\-]\s*(.*?)</")
-    next_hearing = extract_text(r"Next\s*Hearing\s*Date\s*[:\-]\s*(.*?)</")
-    pdf_link_match = re.search(r'href\s*=\s*"([^"]+\.pdf[^"]*)"', html, flags=re.I)
-    pdf_link = ""
-    if pdf_link_match:
-        pdf_link = pdf_link_match.group(1)
-        if pdf_link.startswith("/"):
-            pdf_link = "https://services.ecourts.gov.in" + pdf_link
-
-    success = any([petitioner, respondent, filing_date])
-    return {"success": success, "petitioner": petitioner, "respondent": respondent, "filing_date": filing_date, "next_hearing": next_hearing, "latest_pdf": pdf_link, "html": html}
+        return False
+    st.session_state.portal_ready = True
+    return True
 
 def reset_browser():
-    for k in ("page", "browser", "playwright", "captcha_png"):
+    """Is session ka browser context band karta hai (shared browser chalta rehta hai)."""
+    get_browser_manager().release(session_id())
+    for k in ("captcha_png", "captcha_src", "http_session", "portal_waits", "portal_ready"):
         if k in st.session_state:
             try:
                 if hasattr(st.session_state[k], 'close'): st.session_state[k].close()
-                elif hasattr(st.session_state[k], 'stop'): st.session_state[k].stop()
             except Exception: pass
             del st.session_state[k]
 
-def get_query_log():
-    if not os.path.exists(DB_PATH):
-        return pd.DataFrame()
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT ts as Timestamp, case_type, case_number, filing_year, result_ok, latest_pdf FROM queries ORDER BY id DESC", conn)
+@st.cache_resource
+def prepare_db():
+    """Tables aur indexes process mein ek baar (purane DBs par bhi indexes ban jaate hain)."""
+    conn = connect(DB_PATH)
+    ensure_schema(conn)
     conn.close()
-    return df
+    return True
+
+def log_version():
+    """max(snapshots.id): naya lookup log hote hi badalta hai, isliye cached log pages apne aap purane ho jaate hain."""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute("SELECT coalesce(max(id), 0) FROM snapshots").fetchone()[0]
+    finally:
+        conn.close()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_query_log(version, before_id=None, case_type=None, filing_year=None, result_ok=None):
+    """Log ka sirf ek page (DataFrame, agle page ka before_id). `version` sirf cache key ke liye hai."""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows, next_id = query_log_page(conn, before_id, LOG_PAGE_SIZE, case_type, filing_year, result_ok)
+    finally:
+        conn.close()
+    df = pd.DataFrame(rows, columns=list(LOG_COLUMNS)).drop(columns="id").rename(columns={"ts": "Timestamp"})
+    return df, next_id
 
 # ---------- Streamlit App ----------
 st.set_page_config(page_title="Court Case Data Fetcher", page_icon="⚖️", layout="wide", initial_sidebar_state="expanded")
@@ -214,9 +346,7 @@ with st.sidebar:
     if st.button("Initialize / Refresh Portal", use_container_width=True):
         with st.spinner("Initializing portal..."):
             try:
-                page = get_browser_page()
-                goto_case_number_page(page)
-                select_state_and_district(page, "Bihar", "Gaya")
+                open_portal()
                 st.success(" Portal initialized.")
                 st.rerun()
             except Exception as e:
@@ -227,6 +357,16 @@ with st.sidebar:
         st.info("Browser session reset.")
         st.rerun()
 
+    if st.session_state.get("portal_waits"):
+        st.caption("Ready in: " + ", ".join(f"{label} {secs:.1f}s" for label, secs in st.session_state.portal_waits))
+    pool = get_browser_manager().stats()
+    st.caption(f"Shared browser: {pool['contexts']}/{pool['max_contexts']} sessions, {pool['warm']} warm"
+               + ("" if pool["connected"] else " (restarting)"))
+    net = get_browser_manager().net_stats(session_id())
+    if net is not None and net.requests:
+        st.caption(f"Network: {net.requests_saved}/{net.requests} requests saved "
+                   f"({net.blocked} blocked, {net.cache_hits + net.revalidated} from cache, {net.bytes_from_cache / 1024:.0f} KB)")
+
     st.markdown("---")
     
     with st.form(key="case_form"):
@@ -236,8 +376,15 @@ with st.sidebar:
         filing_year = st.selectbox("Filing Year", options=range(datetime.now().year, 1990, -1))
         st.divider()
         captcha_text = st.text_input("Enter CAPTCHA from main panel", placeholder="Text from the image")
+        force_refresh = st.checkbox("Force refresh", value=False, help="Skip the cache and fetch fresh details from the portal.")
+        use_http = st.checkbox("Direct HTTP mode", value=False, help="After one browser lookup, reuse its session cookies and CAPTCHA for fast direct requests.")
         submitted = st.form_submit_button(" Fetch Case Details", use_container_width=True, type="primary")
 
+    if st.button("Forget cached result for this case", use_container_width=True, disabled=not case_number):
+        get_writer(DB_PATH).flush()  # queue mein pade rows bhi invalidate hon
+        get_case_cache().invalidate(COURT_NAME, case_type, case_number.strip(), str(filing_year))
+        st.info("Cached result cleared; the next search will go to the portal.")
+
 # --- MAIN PAGE: HEADER, CAPTCHA, AND RESULTS ---
 with st.container():
     st.markdown("<p style='text-align:center; color:#555;'>ई-कमेटी, उच्चतम न्यायालय, भारत | E-COMMITTEE, SUPREME COURT OF INDIA</p>", unsafe_allow_html=True)
@@ -254,12 +401,23 @@ with st.container():
 
 col_display1, col_display2 = st.columns(2, gap="large")
 
+# Pehli baar page khulte hi warm pool se portal le lo, taaki CAPTCHA bina button dabaye dikh jaaye
+if not st.session_state.get("portal_ready") and not st.session_state.get("warm_tried"):
+    st.session_state.warm_tried = True
+    try:
+        open_portal(cold=False)
+    except Exception:
+        pass
+
 with col_display1:
     with st.container(border=True):
         st.subheader("CAPTCHA Image")
         try:
-            page = get_browser_page()
-            captcha_png = capture_captcha_image(page)
+            captcha_png = None
+            if st.session_state.get("portal_ready"):
+                # Src wahi hai toh purana PNG hi dikhao; naya screenshot sirf CAPTCHA badalne par
+                src, captcha_png = in_browser(capture_captcha_image, st.session_state.get("captcha_src"))
+                st.session_state.captcha_src = src
             if captcha_png:
                 st.image(captcha_png, use_column_width=True)
                 st.session_state.captcha_png = captcha_png
@@ -270,70 +428,197 @@ with col_display1:
         except Exception:
              st.info("Click 'Initialize / Refresh Portal' to load CAPTCHA.")
 
-if submitted:
-    # Results will be displayed in the second column
-    with col_display2:
-        with st.container(border=True):
-            st.subheader("Case Results")
-            if not all([case_number, str(filing_year), captcha_text]):
+if "seen_jobs" not in st.session_state:
+    st.session_state.seen_jobs = set()
+for job in reversed(get_job_queue().for_session(session_id())):
+    if job.finished and job.id not in st.session_state.seen_jobs:
+        absorb_job(job)
+
+def show_results(parsed):
+    if not parsed["success"]:
+        st.error("Case not found or page structure changed.")
+        return
+    st.success("Case Details Fetched!" + (" (direct HTTP)" if parsed.get("source") == "http" else ""))
+    if parsed.get("source") == "cache":
+        st.info(f"Served from cache ({parsed['cache_tier']}), {format_age(parsed['cache_age'])} old. Tick 'Force refresh' to fetch again.")
+    dates_col1, dates_col2 = st.columns(2)
+    with dates_col1:
+        st.metric(label="Filing Date", value=parsed.get("filing_date", "N/A"))
+    with dates_col2:
+        st.metric(label="Next Hearing Date", value=parsed.get("next_hearing", "N/A"))
+    if parsed.get("case_status"):
+        st.caption(f"Status: {parsed['case_status']}")
+    st.divider()
+    if parsed.get("petitioner") or parsed.get("respondent"):
+        st.write("**Parties**")
+        st.text(f"Petitioner: {parsed.get('petitioner', 'N/A')}")
+        st.text(f"Respondent: {parsed.get('respondent', 'N/A')}")
+    if parsed.get("latest_pdf"):
+        st.divider()
+        st.write("**Documents**")
+        order_pdf = st.session_state.get("order_pdfs", {}).get(parsed["latest_pdf"])
+        if order_pdf is not None and order_pdf.done() and order_pdf.exception() is None:
+            doc = order_pdf.result()
+            st.download_button("📄 Download Latest Order/Judgment PDF", data=get_downloader(DB_PATH).read(doc["sha256"]),
+                               file_name=f"order-{doc['sha256'][:12]}.pdf", mime="application/pdf")
+        else:
+            st.markdown(f"📄 [Download Latest Order/Judgment PDF]({parsed['latest_pdf']})")
+            if order_pdf is not None and not order_pdf.done():
+                st.caption("Saving a copy of this order in the background; it will be downloadable from here on the next refresh.")
+        older = [o for o in parsed.get("orders", []) if o.get("url") and o["url"] != parsed["latest_pdf"]]
+        if older:
+            with st.expander(f"All orders ({len(older) + 1})"):
+                for o in reversed(older):
+                    st.markdown(f"- [{o.get('date') or o.get('number') or 'Order'}]({o['url']}) {o.get('title', '')}")
+    if parsed.get("hearings"):
+        with st.expander(f"Hearing history ({len(parsed['hearings'])})"):
+            st.dataframe(pd.DataFrame(parsed["hearings"]), use_container_width=True, hide_index=True)
+    if parsed.get("source") != "cache":
+        st.info("Query has been logged to the database.")
+
+with col_display2:
+    with st.container(border=True):
+        st.subheader("Case Results")
+        if submitted:
+            cache = get_case_cache()
+            hit = None
+            if case_number and not force_refresh:
+                try:
+                    hit = cache.get(COURT_NAME, case_type, case_number.strip(), str(filing_year))
+                except Exception:
+                    hit = None
+            if hit is not None:
+                st.session_state.parsed_results = {**hit.result, "source": "cache", "cache_tier": hit.tier, "cache_age": hit.age}
+                st.session_state.shown_job = None
+                order_pdf = queue_order_pdf(hit.result, f"{case_type}/{case_number.strip()}/{filing_year}")
+                if order_pdf is not None:
+                    st.session_state.setdefault("order_pdfs", {})[hit.result["latest_pdf"]] = order_pdf
+            elif not all([case_number, str(filing_year), captcha_text]):
                 st.error("Please fill all fields in the sidebar.")
+            elif not st.session_state.get("portal_ready"):
+                st.error("The portal is not ready yet. Click 'Initialize / Refresh Portal' and enter the new CAPTCHA.")
             else:
-                with st.spinner("Submitting details and fetching case data..."):
-                    try:
-                        page = get_browser_page()
-                        ok = fill_form_and_submit(page, case_type, case_number.strip(), str(filing_year), captcha_text.strip())
-                        if not ok:
-                            st.error("Invalid details or CAPTCHA. Please try again.")
-                        else:
-                            st.session_state.parsed_results = parse_results(page)
-                            try:
-                                init_db()
-                                log_query(
-                                    court="Gaya District Court (eCourts)", case_type=case_type,
-                                    case_number=case_number.strip(), filing_year=str(filing_year),
-                                    captcha_used=captcha_text.strip(), result_ok=True,
-                                    latest_pdf=st.session_state.parsed_results.get("latest_pdf", ""),
-                                    html=st.session_state.parsed_results.get("html", ""),
-                                )
-                            except Exception as dbe:
-                                st.warning(f"Could not log to database: {dbe}")
-                    except Exception as e:
-                        st.error(f"An error occurred during fetching: {e}")
-
-            # Display results if they exist in session state
-            if "parsed_results" in st.session_state and st.session_state.parsed_results:
-                parsed = st.session_state.parsed_results
-                if not parsed["success"]:
-                    st.error("Case not found or page structure changed.")
+                try:
+                    job_id = queue_lookup(case_type, case_number.strip(), str(filing_year), captcha_text.strip(), use_http)
+                except HandoffLimit:
+                    st.warning(f"You already have {MAX_QUEUED_LOOKUPS} lookups running. Wait for one of them to finish, "
+                               "then press Fetch again; the CAPTCHA on screen is still valid.")
+                except Exception as e:
+                    st.error(f"Could not queue the lookup: {e}")
                 else:
-                    st.success("Case Details Fetched!")
-                    dates_col1, dates_col2 = st.columns(2)
-                    with dates_col1:
-                        st.metric(label="Filing Date", value=parsed.get("filing_date", "N/A"))
-                    with dates_col2:
-                        st.metric(label="Next Hearing Date", value=parsed.get("next_hearing", "N/A"))
-                    st.divider()
-                    if parsed.get("petitioner") or parsed.get("respondent"):
-                        st.write("**Parties**")
-                        st.text(f"Petitioner: {parsed.get('petitioner', 'N/A')}")
-                        st.text(f"Respondent: {parsed.get('respondent', 'N/A')}")
-                    if parsed.get("latest_pdf"):
-                        st.divider()
-                        st.write("**Documents**")
-                        st.markdown(f"📄 [Download Latest Order/Judgment PDF]({parsed['latest_pdf']})")
-                    st.info("Query has been logged to the database.")
+                    if job_id is None:
+                        st.session_state.portal_expired = True
+                    st.rerun()  # naya CAPTCHA aur job list turant dikhe
+        if st.session_state.pop("portal_expired", False):
+            st.warning("The portal page had expired, so the lookup was not sent. Enter the new CAPTCHA and search again.")
+
+        session_jobs = get_job_queue().for_session(session_id())
+        if session_jobs:
+            if get_job_queue().pending(session_id()):
+                poll_jobs()
+                if not hasattr(st, "fragment"):
+                    st.button("Refresh status")
             else:
-                st.info("Results will be displayed here after a successful search.")
+                show_jobs(session_jobs)
+            st.divider()
+
+        # Display results if they exist in session state
+        if "parsed_results" in st.session_state and st.session_state.parsed_results:
+            show_results(st.session_state.parsed_results)
+        elif not session_jobs:
+            st.info("Results will be displayed here after a successful search. You can queue several lookups; each one shows up here as it finishes.")
+
+# Case search: parties / advocates / acts / CNR par full-text search
+st.divider()
+st.header("🔎 Search Cases")
+search_cols = st.columns([4, 1])
+search_text = search_cols[0].text_input("Party, advocate, act or CNR", placeholder="e.g., Ram Kumar", key="case_search_text")
+search_type = search_cols[1].selectbox("Case type", ["All"] + CASE_TYPES, key="case_search_type")
+if search_text.strip():
+    try:
+        prepare_db()
+        conn = connect(DB_PATH)
+        try:
+            started = time.perf_counter()
+            matches = search_cases(conn, search_text, case_type=None if search_type == "All" else search_type)
+            took_ms = (time.perf_counter() - started) * 1000
+        finally:
+            conn.close()
+        if matches:
+            st.caption(f"{len(matches)} best matches in {took_ms:.0f} ms")
+            st.dataframe(pd.DataFrame(matches).drop(columns="rank"), use_container_width=True, hide_index=True)
+        else:
+            st.info("No indexed cases match. Run `py case_search.py backfill` to index older logged searches.")
+    except Exception as e:
+        st.warning(f"Search failed: {e}")
+
+# Performance: har stage ka latency aur failure rate (metrics table se)
+@st.cache_data(ttl=30, show_spinner=False)
+def get_performance(window_seconds, bucket_seconds):
+    since = time.time() - window_seconds
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        stats = metrics.stage_stats(conn, since, source="app")
+        rates = metrics.failure_rates(conn, since, bucket_seconds, source="app")
+    finally:
+        conn.close()
+    table = pd.DataFrame([{"stage": stage, "count": s["count"], "failure %": round(s["fail_rate"] * 100, 1),
+                           **{f"p{p} ms": round(s[f"p{p}"]) for p in metrics.PERCENTILES}} for stage, s in stats.items()])
+    trend = pd.DataFrame(rates, columns=["bucket", "stage", "total", "failed"])
+    if not trend.empty:
+        trend["failure %"] = trend["failed"] / trend["total"] * 100
+        trend["time"] = pd.to_datetime(trend["bucket"], unit="s")
+        trend = trend.pivot_table(index="time", columns="stage", values="failure %")
+    return table, trend
+
+with st.expander("📈 Performance"):
+    windows = {"Last hour": (3600, 300), "Last 24 hours": (86400, 3600), "Last 7 days": (7 * 86400, 6 * 3600)}
+    window = st.selectbox("Window", list(windows), index=1, key="perf_window")
+    try:
+        prepare_db()
+        perf_table, perf_trend = get_performance(*windows[window])
+        if perf_table.empty:
+            st.info("No timings recorded in this window yet.")
+        else:
+            st.dataframe(perf_table, use_container_width=True, hide_index=True)
+            st.caption("Failure rate over time (%)")
+            st.line_chart(perf_trend)
+    except Exception as e:
+        st.warning(f"Could not load metrics: {e}")
 
 # Extra Feature: Query Log Display
 st.divider()
 st.header("🗂️ Previous Search Log")
+log_filter_cols = st.columns(3)
+log_type = log_filter_cols[0].selectbox("Case type", ["All"] + CASE_TYPES, key="log_case_type")
+log_year = log_filter_cols[1].selectbox("Filing year", ["All"] + list(range(datetime.now().year, 1990, -1)), key="log_year")
+log_status = log_filter_cols[2].selectbox("Result", ["All", "Success", "Failed"], key="log_status")
+log_filters = (
+    None if log_type == "All" else log_type,
+    None if log_year == "All" else str(log_year),
+    {"All": None, "Success": 1, "Failed": 0}[log_status],
+)
+# Har page ka before_id ek stack mein; filter badle toh pehle page par wapas
+if st.session_state.get("log_filters") != log_filters:
+    st.session_state.log_filters = log_filters
+    st.session_state.log_cursors = [None]
+log_cursors = st.session_state.log_cursors
 try:
-    log_df = get_query_log()
+    prepare_db()
+    log_df, next_before = get_query_log(log_version(), log_cursors[-1], *log_filters)
     if not log_df.empty:
         st.dataframe(log_df, use_container_width=True)
     else:
-        st.info("No searches have been logged to the database yet.")
+        st.info("No searches have been logged to the database yet." if log_cursors == [None] and log_filters == (None, None, None)
+                else "No logged searches match these filters.")
+    nav_cols = st.columns([1, 1, 4])
+    if nav_cols[0].button("← Newer", disabled=len(log_cursors) == 1, use_container_width=True):
+        log_cursors.pop()
+        st.rerun()
+    if nav_cols[1].button("Older →", disabled=next_before is None, use_container_width=True):
+        log_cursors.append(next_before)
+        st.rerun()
+    nav_cols[2].caption(f"Page {len(log_cursors)} · {LOG_PAGE_SIZE} per page")
 except Exception as e:
     st.warning(f"Could not load query log from database: {e}")
 
@@ -0,0 +1,325 @@
+# benchmarks/fixture_server.py
+# eCourts aur Gaya (dcourts) portals ka local stand-in: case-number/case-type form, `#showList` result list (pagination
+# ke saath) aur case detail pages. Detail pages queries.db mein save hue HTML (ya fixture se bane synthetic pages)
+# se aate hain. Har response par configurable latency, aur CAPTCHA hamesha ek fixed text hota hai. Static JS/CSS
+# max-age ke saath ETag / Last-Modified bhejte hain aur conditional GET par 304, taaki netrules unhe cache kar sake.
+#
+#   py benchmarks/fixture_server.py --port 8765 --latency 150 --synthetic 200 [--db queries.db]
+#   set COURT_GAYA_URL=http://127.0.0.1:8765
+#   set COURT_ECOURTS_URL=http://127.0.0.1:8765/ecourts/
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parse_throughput import FIXTURE, load_db  # noqa: E402
+
+TEST_CAPTCHA = "TEST1"
+PAGE_SIZE = 10
+YEAR = "2024"
+ESTABLISHMENTS = {"BRGA01,BRGA03,BRGA02,BRGA05": "Civil Court Gaya"}
+CASE_TYPES = {"100": "CS", "101": "CR", "102": "MISC"}
+
+
+def _png(width=120, height=40):
+    """Chhoti safed PNG (CAPTCHA image ki jagah)."""
+    raw = b"".join(b"\x00" + b"\xff" * width * 3 for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+CAPTCHA_PNG = _png()
+
+GAYA_JS = """
+async function post(url, data) {
+  const r = await fetch(url, {method: "POST", body: new URLSearchParams(data),
+    headers: {"Content-Type": "application/x-www-form-urlencoded", "X-Requested-With": "XMLHttpRequest"}});
+  return r.text();
+}
+const val = id => (document.getElementById(id) || {}).value || "";
+function fill(id, options) {
+  const el = document.getElementById(id);
+  for (const [value, label] of Object.entries(options)) el.add(new Option(label, value));
+}
+async function search(page) {
+  document.getElementById("showList").innerHTML = await post("/search", {
+    est_code: val("est_code"), case_type: val("case_type"), year: val("year"), reg_no: val("reg_no"),
+    reg_year: val("reg_year"), captcha: val("captcha"), page: page});
+}
+document.addEventListener("DOMContentLoaded", async () => {
+  const opts = await (await fetch("/options")).json();
+  fill("est_code", opts.establishments);
+  fill("case_type", opts.case_types);
+  document.getElementById("search-button").onclick = () => search(1);
+});
+document.addEventListener("click", async e => {
+  const view = e.target.closest(".viewCnrDetails");
+  if (view) {
+    const panel = document.getElementById("cnrResultsDetails");
+    panel.innerHTML = await post("/detail", {cino: view.dataset.cno});
+    panel.style.display = "block";
+  }
+  const next = e.target.closest("a.next");
+  if (next) { e.preventDefault(); search(next.dataset.page); }
+});
+"""
+
+GAYA_FORM = """<!DOCTYPE html><html><head><title>Case Status</title>
+<link rel="stylesheet" href="/static/site.css"><script src="/static/gaya.js"></script></head><body>
+<h1>District Court Gaya (fixture)</h1>
+<select id="est_code"><option value="">Select</option></select>
+<select id="case_type"><option value="">Select</option></select>
+{fields}
+<img id="siwp_captcha_image_0" src="/captcha.png?r={nonce}">
+<input id="captcha"><button id="search-button" type="button">Search</button>
+<div id="showList"></div><div id="cnrResultsDetails" style="display:none"></div>
+</body></html>"""
+
+ECOURTS_JS = """
+async function options(url, id) {
+  const opts = await (await fetch(url)).json();
+  const el = document.getElementById(id);
+  el.length = 1;
+  for (const [value, label] of Object.entries(opts)) el.add(new Option(label, value));
+}
+document.addEventListener("DOMContentLoaded", () => {
+  options("/ecourts/options?list=state", "sess_state_code");
+  document.getElementById("sess_state_code").onchange = () => options("/ecourts/options?list=district", "sess_dist_code");
+  document.getElementById("sess_dist_code").onchange = () => options("/ecourts/options?list=case_type", "case_type_ctype");
+  document.getElementById("searchbtn").onclick = async () => {
+    const r = await fetch("/ecourts/search", {method: "POST", body: new URLSearchParams({
+      case_type: document.getElementById("case_type_ctype").value, case_no: document.getElementById("search_caseNo").value,
+      year: document.getElementById("rgyear").value, captcha: document.getElementById("fcaptcha_code").value}),
+      headers: {"Content-Type": "application/x-www-form-urlencoded"}});
+    document.getElementById("results").innerHTML = await r.text();
+  };
+});
+"""
+
+ECOURTS_FORM = """<!DOCTYPE html><html><head><title>eCourts Services</title>
+<link rel="stylesheet" href="/static/site.css"><script src="/static/ecourts.js"></script></head><body>
+<nav><a href="#">Case Status</a> <a href="#">Case Number</a></nav>
+<select id="sess_state_code"><option value="">Select State</option></select>
+<select id="sess_dist_code"><option value="">Select District</option></select>
+<select id="case_type_ctype"><option value="">Select Case Type</option></select>
+<input id="search_caseNo" placeholder="Case Number">
+<select id="rgyear">{years}</select>
+<img id="captcha_image" src="/captcha.png?r={nonce}">
+<input id="fcaptcha_code"><button id="searchbtn" type="button">Search</button>
+<div id="results"></div>
+</body></html>"""
+
+
+class CaseStore:
+    """Fixture cases: har case ka CNR, case type code, registration number aur detail HTML."""
+
+    def __init__(self, pages):
+        self.cases = []
+        codes = list(CASE_TYPES)
+        for i, html in enumerate(pages):
+            self.cases.append({"cnr": f"BRGA01{i + 1:06d}{YEAR}", "case_type": codes[i % len(codes)], "reg_no": str(i // len(codes) + 1),
+                               "year": YEAR, "html": html})
+        self.by_cnr = {c["cnr"]: c for c in self.cases}
+
+    @classmethod
+    def build(cls, synthetic=100, db_path=None):
+        with open(FIXTURE, encoding="utf-8") as f:
+            base = f.read()
+        pages = load_db(db_path) if db_path else []
+        names = ["Ram Kumar", "Sita Devi", "Mohan Lal", "Rajesh Singh", "Anita Kumari", "Suresh Prasad"]
+        for i in range(len(pages), len(pages) + synthetic):
+            pages.append(base.replace("BRGA010001232024", f"BRGA01{i + 1:06d}{YEAR}")
+                         .replace("1) Ram Kumar", f"1) {names[i % len(names)]} {i + 1}"))
+        return cls(pages)
+
+    def search(self, case_type, reg_no="", year=""):
+        return [c for c in self.cases if c["case_type"] == case_type and (not reg_no or c["reg_no"] == reg_no.lstrip("0"))
+                and (not year or c["year"] == year)]
+
+
+def result_list(cases, page):
+    start = (page - 1) * PAGE_SIZE
+    rows = "".join(
+        f"<tr><td>{start + i + 1}</td><td>{CASE_TYPES[c['case_type']]}/{c['reg_no']}/{c['year']}</td>"
+        f"<td><a href='#' class='viewCnrDetails' data-cno='{c['cnr']}'>View</a></td></tr>"
+        for i, c in enumerate(cases[start:start + PAGE_SIZE])
+    )
+    more = f"<a href='#' class='next' data-page='{page + 1}'>Next</a>" if start + PAGE_SIZE < len(cases) else ""
+    return f"<table class='table'><tr><th>#</th><th>Case</th><th></th></tr>{rows}</table>{more}"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "CourtFixture/1.0"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200, cache=False):
+        cfg = self.server.config
+        delay = cfg["latency"] + random.uniform(0, cfg["jitter"])
+        if delay:
+            time.sleep(delay / 1000)
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        path = self.path.split("?")[0]
+        headers = {"Content-Type": content_type, "Cache-Control": "max-age=86400" if cache else "no-store"}
+        if cache:
+            # Validators: bina inke netrules static response cache nahi karta (revalidate ka koi tareeka nahi)
+            headers["ETag"] = '"%s"' % hashlib.sha1(data).hexdigest()[:16]
+            headers["Last-Modified"] = formatdate(self.server.started, usegmt=True)
+            if self._not_modified(headers["ETag"]):
+                status, data = 304, b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with self.server.lock:
+            self.server.hits[path] = self.server.hits.get(path, 0) + 1
+            if status == 304:
+                self.server.not_modified[path] = self.server.not_modified.get(path, 0) + 1
+
+    def _not_modified(self, etag):
+        """If-None-Match (ho toh wahi maana jaata hai) ya If-Modified-Since se cached copy abhi bhi sahi hai?"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= int(self.server.started)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True).items()}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        nonce = random.randint(0, 1 << 30)
+        if url.path in ("/case-status-search-by-case-type/", "/case-status-search-by-case-number/"):
+            if "case-number" in url.path:
+                fields = '<input id="reg_no"><input id="reg_year">'
+            else:
+                fields = '<input id="year"><label><input type="radio" id="rad_pending" name="status" value="P">Pending</label>'
+            self._send(GAYA_FORM.format(fields=fields, nonce=nonce))
+        elif url.path == "/options":
+            self._send(json.dumps({"establishments": ESTABLISHMENTS, "case_types": CASE_TYPES}), "application/json")
+        elif url.path in ("/ecourts/", "/ecourts"):
+            years = "".join(f"<option value='{y}'>{y}</option>" for y in range(2025, 1990, -1))
+            self._send(ECOURTS_FORM.format(years=years, nonce=nonce))
+        elif url.path == "/ecourts/options":
+            lists = {"state": {"8": "Bihar", "9": "Jharkhand"}, "district": {"5": "Gaya", "6": "Patna"},
+                     "case_type": {code: label for code, label in CASE_TYPES.items()}}
+            self._send(json.dumps(lists.get(parse_qs(url.query).get("list", [""])[0], {})), "application/json")
+        elif url.path == "/captcha.png":
+            self._send(CAPTCHA_PNG, "image/png")
+        elif url.path == "/static/gaya.js":
+            self._send(GAYA_JS, "application/javascript", cache=True)
+        elif url.path == "/static/ecourts.js":
+            self._send(ECOURTS_JS, "application/javascript", cache=True)
+        elif url.path == "/static/site.css":
+            self._send("body{font-family:sans-serif} table{border-collapse:collapse}", "text/css", cache=True)
+        else:
+            self._send("Not found", "text/plain", status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        form = self._form()
+        store = self.server.store
+        if url.path in ("/search", "/ecourts/search") and form.get("captcha", "").strip() != self.server.config["captcha"]:
+            self._send("<p class='error'>Invalid Captcha</p>")
+        elif url.path == "/search":
+            cases = store.search(form.get("case_type", ""), form.get("reg_no", ""), form.get("year") or form.get("reg_year", ""))
+            if not cases:
+                self._send("<p class='error'>No records found</p>")
+            else:
+                self._send(result_list(cases, int(form.get("page") or 1)))
+        elif url.path == "/detail":
+            case = store.by_cnr.get(form.get("cino", ""))
+            self._send(case["html"] if case else "<p>Record not found</p>", status=200 if case else 404)
+        elif url.path == "/ecourts/search":
+            cases = store.search(form.get("case_type", ""), form.get("case_no", ""), form.get("year", ""))
+            self._send(cases[0]["html"] if cases else "<p class='error'>Invalid Case Details</p>")
+        else:
+            self._send("Not found", "text/plain", status=404)
+
+
+class FixtureServer:
+    """Background thread mein chalne wala fixture server. `url` par Gaya forms, `url/ecourts/` par eCourts form."""
+
+    def __init__(self, store, host="127.0.0.1", port=0, latency=0, jitter=0, captcha=TEST_CAPTCHA):
+        self.httpd = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = store
+        self.httpd.config = {"latency": latency, "jitter": jitter, "captcha": captcha}
+        self.httpd.hits = {}
+        self.httpd.not_modified = {}  # path -> 304 responses (revalidated static files)
+        self.httpd.started = time.time()
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def hits(self):
+        return dict(self.httpd.hits)
+
+    @property
+    def not_modified(self):
+        return dict(self.httpd.not_modified)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the eCourts and Gaya portals")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=100, help="ms added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random ms (0..jitter)")
+    parser.add_argument("--synthetic", type=int, default=100, help="generated cases from the fixture page")
+    parser.add_argument("--db", help="also serve the detail pages saved in this database")
+    parser.add_argument("--captcha", default=TEST_CAPTCHA)
+    args = parser.parse_args()
+
+    store = CaseStore.build(args.synthetic, args.db)
+    server = FixtureServer(store, args.host, args.port, args.latency, args.jitter, args.captcha).start()
+    print(f"Serving {len(store.cases)} cases on {server.url} (CAPTCHA {args.captcha!r}, {args.latency:.0f} ms latency)")
+    print(f"  COURT_GAYA_URL={server.url}\n  COURT_ECOURTS_URL={server.url}/ecourts/")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/parse_throughput.py
+# Saved case pages (queries.db ke `html` / `raw_html` columns, ya HTML files ki directory) par
+# case_parser ka throughput (pages/sec) naapta hai, purane regex parser ke saath comparison ke saath.
+#
+#   py benchmarks/parse_throughput.py --db queries.db --repeat 5
+#   py benchmarks/parse_throughput.py --synthetic 500
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blobstore import BLOB_DIR, INLINE_COLUMNS, BlobStore  # noqa: E402
+from case_parser import parse_case  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "case_detail.html")
+
+
+def legacy_parse(html):
+    """Purana `parse_results`: paanch alag re.search passes (baseline ke liye)."""
+    def extract_text(pattern):
+        m = re.search(pattern, html, flags=re.I | re.S)
+        return re.sub(r"<[^>]+>|\s+", " ", m.group(1)).strip() if m else ""
+
+    return (
+        extract_text(r"Petitioner\s*</[^>]+>\s*<[^>]+>\s*(.*?)</"),
+        extract_text(r"Respondent\s*</[^>]+>\s*<[^>]+>\s*(.*?)</"),
+        extract_text(r"Filing\s*Date\s*[:\-]\s*(.*?)</"),
+        extract_text(r"Next\s*Hearing\s*Date\s*[:\-]\s*(.*?)</"),
+        re.search(r'href\s*=\s*"([^"]+\.pdf[^"]*)"', html, flags=re.I),
+    )
+
+
+def load_db(path, blob_root=BLOB_DIR):
+    """Purane tables ke inline HTML columns aur blob store mein rakhe snapshots (html_hash, har page ek baar)."""
+    pages = []
+    if not os.path.exists(path):
+        return pages
+    conn = sqlite3.connect(path)
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    store = BlobStore(blob_root) if os.path.isdir(blob_root) else None
+    digests = set()
+    for table, column, hash_column in INLINE_COLUMNS + [("snapshots", None, "html_hash")]:
+        if table not in tables:
+            continue
+        columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if column in columns:
+            pages += [h for (h,) in conn.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != ''")]
+        if hash_column in columns:
+            digests.update(d for (d,) in conn.execute(f"SELECT DISTINCT {hash_column} FROM {table} WHERE {hash_column} IS NOT NULL"))
+    conn.close()
+    if store is not None:
+        pages += [store.read_text(d) for d in sorted(digests) if store.exists(d)]
+    return pages
+
+
+def synthetic(n):
+    """Fixture page ke n variants, har ek mein alag length ki hearing history."""
+    with open(FIXTURE, encoding="utf-8") as f:
+        base = f.read()
+    row = "<tr><td>Civil Judge</td><td>01-03-2024</td><td>{d:02d}-04-2024</td><td>Evidence</td></tr>"
+    pages = []
+    for i in range(n):
+        extra = "".join(row.format(d=(j % 28) + 1) for j in range(20 + i % 80))
+        pages.append(base.replace("</table>\n<h2>Interim Orders</h2>", extra + "</table>\n<h2>Interim Orders</h2>"))
+    return pages
+
+
+def measure(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in pages:
+            fn(html)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="case_parser throughput benchmark")
+    parser.add_argument("--db", default="queries.db")
+    parser.add_argument("--blobs", default=BLOB_DIR, help="blob store holding migrated snapshots")
+    parser.add_argument("--dir", help="directory of saved *.html pages")
+    parser.add_argument("--synthetic", type=int, default=0, help="add N generated pages based on the fixture")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    pages = load_db(args.db, args.blobs)
+    if args.dir:
+        for path in sorted(glob.glob(os.path.join(args.dir, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+    pages += synthetic(args.synthetic)
+    if not pages:
+        print("No pages found (queries.db is empty?). Use --dir or --synthetic N.")
+        return
+
+    total_mb = sum(len(p) for p in pages) / 1e6
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB")
+    for name, fn in (("case_parser.parse_case", parse_case), ("legacy regex (5 fields)", legacy_parse)):
+        secs = measure(fn, pages, args.repeat)
+        print(f"{name:26s} {len(pages) / secs:9.1f} pages/s  {total_mb / secs:7.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
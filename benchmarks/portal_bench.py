@@ -0,0 +1,248 @@
+# benchmarks/portal_bench.py
+# app.py aur scraper.py ke flows local fixture server (fixture_server.py) par chalata hai, bina live portal aur bina
+# insaani CAPTCHA ke. Har concurrency level par end-to-end latency (p50/p95), throughput, aur ek browser context ki
+# memory report karta hai, saath mein static JS/CSS kitni baar netrules cache se aayi (hits / 304 revalidations);
+# `--json` se result file mein likh kar do changes ko compare kar sakte hain.
+#
+#   py benchmarks/portal_bench.py --latency 150 --lookups 40 --concurrency 1,2,4,8 --json bench.json
+#   py benchmarks/portal_bench.py --flows scraper,harvest --db queries.db
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import CASE_TYPES, TEST_CAPTCHA, CaseStore, FixtureServer  # noqa: E402
+
+FLOWS = ("app", "scraper", "harvest")
+MEMORY_CONTEXTS = 4
+
+
+def _configure(url):
+    """App/scraper modules import hone se pehle: portal URLs fixture par, aur metrics DB mein na likhe jaayein."""
+    os.environ["COURT_GAYA_URL"] = url
+    os.environ["COURT_ECOURTS_URL"] = url + "/ecourts/"
+    os.environ.setdefault("COURT_METRICS_SAMPLE", "0")
+
+
+def _percentile(values, p):
+    from metrics import percentile
+    return round(percentile(sorted(values), p), 1)
+
+
+def _row(flow, concurrency, latencies_ms, elapsed, ok, nets=()):
+    n = len(latencies_ms)
+    return {"flow": flow, "concurrency": concurrency, "n": n, "ok": ok,
+            "p50_ms": _percentile(latencies_ms, 50), "p95_ms": _percentile(latencies_ms, 95),
+            "throughput_per_s": round(n / elapsed, 2) if elapsed else 0.0, "net": _net_total(nets)}
+
+
+def _net_total(nets):
+    """RouteStats (ya un ke as_dict) ka jod: requests, blocked, cache hits/revalidated/misses, bytes."""
+    total = dict.fromkeys(("requests", "blocked", "cache_hits", "revalidated", "cache_misses", "bytes_from_cache"), 0)
+    for net in nets:
+        net = net.as_dict() if hasattr(net, "as_dict") else (net or {})
+        for k in total:
+            total[k] += net.get(k, 0)
+    return total
+
+
+def _cases_for(store, n):
+    """Pehle n fixture cases ko app ke labels (case type label, number, year) mein."""
+    return [(CASE_TYPES[c["case_type"]], c["reg_no"], c["year"]) for c in store.cases[:n]]
+
+
+def bench_app(store, levels, lookups, cache_dir):
+    """App flow: har Streamlit session jaisa thread apne context mein portal init, CAPTCHA capture, submit + parse."""
+    from browser_pool import BrowserManager
+    from netrules import RouteRules
+    from portal import browser_fetch, capture_captcha_image, init_portal
+
+    cases = _cases_for(store, lookups)
+    rows = []
+    for level in levels:
+        manager = BrowserManager(max_contexts=level, route_rules=RouteRules(cache_dir=cache_dir))
+
+        def lookup(i):
+            sid = f"bench-{i % level}"
+            started = time.perf_counter()
+            manager.call(sid, init_portal)
+            manager.call(sid, capture_captcha_image)
+            parsed, _ = manager.call(sid, browser_fetch, *cases[i % len(cases)], TEST_CAPTCHA)
+            return (time.perf_counter() - started) * 1000, bool(parsed and parsed["success"])
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level) as pool:
+                results = list(pool.map(lookup, range(lookups)))
+            elapsed = time.perf_counter() - started
+            nets = [manager.net_stats(f"bench-{i}") for i in range(level)]
+        finally:
+            manager.close()
+        rows.append(_row("app", level, [r[0] for r in results], elapsed, sum(r[1] for r in results), nets))
+    return rows
+
+
+async def _fixed_captcha(page, job):
+    return TEST_CAPTCHA
+
+
+def bench_scraper(store, levels, lookups):
+    """Scraper batch mode: case-number jobs ek browser ke context pool par."""
+    import scraper
+
+    code_of = {label: code for code, label in CASE_TYPES.items()}
+    rows = []
+    for level in levels:
+        jobs = [scraper.BatchJob(scraper.DEFAULT_ESTABLISHMENT, code_of[ctype], year, number, TEST_CAPTCHA)
+                for ctype, number, year in _cases_for(store, lookups)]
+
+        async def run():
+            return [r async for r in scraper.run_batch(jobs, pool_size=level, retries=0, captcha_solver=_fixed_captcha)]
+
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+        rows.append(_row("scraper", level, [r["elapsed"] * 1000 for r in results], elapsed, sum(r["ok"] for r in results),
+                         [r.get("net") for r in results]))
+    return rows
+
+
+def bench_harvest(store, levels):
+    """Harvest mode: ek case type ki poori list (pagination samet), details `tabs` parallel tabs mein."""
+    import scraper
+
+    code = next(iter(CASE_TYPES))
+    rows = []
+    for level in levels:
+        job = scraper.BatchJob(scraper.DEFAULT_ESTABLISHMENT, code, store.cases[0]["year"], "", TEST_CAPTCHA)
+
+        async def run():
+            return [r async for r in scraper.harvest(job, tabs=level, retries=0, captcha_solver=_fixed_captcha, pdf=False)]
+
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+        rows.append(_row("harvest", level, [r.get("elapsed", 0) * 1000 for r in results], elapsed, sum(r["ok"] for r in results),
+                         [r.get("net") for r in results]))
+    return rows
+
+
+def _tree_rss_kb(pid):
+    """`pid` aur us ke saare child processes ka RSS (KB), /proc se. Linux ke alawa None."""
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration):
+            pass
+        stack.extend(children.get(current, []))
+    return total
+
+
+def bench_memory(url, contexts=MEMORY_CONTEXTS):
+    """Har naye context (form khula hua page) se browser process tree ka RSS kitna badhta hai (MB per context)."""
+    from playwright.async_api import async_playwright
+
+    async def run():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            await page.goto(url + "/case-status-search-by-case-type/", wait_until="domcontentloaded")
+            before = _tree_rss_kb(os.getpid())
+            opened = []
+            for _ in range(contexts):
+                context = await browser.new_context()
+                page = await context.new_page()
+                await page.goto(url + "/case-status-search-by-case-type/", wait_until="domcontentloaded")
+                opened.append(context)
+            after = _tree_rss_kb(os.getpid())
+            await browser.close()
+            return None if before is None else round((after - before) / contexts / 1024, 1)
+
+    return asyncio.run(run())
+
+
+def print_table(rows):
+    # cached: static JS/CSS jo disk cache se aayi (fresh hit / 304), fetched: jo network se poori aayi
+    print(f"{'flow':<9}{'conc':>5}{'n':>6}{'ok':>6}{'p50 ms':>10}{'p95 ms':>10}{'per s':>8}{'cached':>8}{'fetched':>8}")
+    for r in rows:
+        net = r["net"]
+        print(f"{r['flow']:<9}{r['concurrency']:>5}{r['n']:>6}{r['ok']:>6}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}{r['throughput_per_s']:>8.2f}"
+              f"{net['cache_hits'] + net['revalidated']:>8}{net['cache_misses']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks against the local portal fixture")
+    parser.add_argument("--latency", type=float, default=100, help="fixture server ms per response")
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--cases", type=int, default=60, help="synthetic cases served by the fixture")
+    parser.add_argument("--db", help="also serve the detail pages saved in this database")
+    parser.add_argument("--lookups", type=int, default=20, help="lookups per concurrency level (app and scraper flows)")
+    parser.add_argument("--concurrency", default="1,2,4", help="comma-separated levels")
+    parser.add_argument("--flows", default=",".join(FLOWS))
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--json", help="write the results here")
+    args = parser.parse_args()
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    flows = [f for f in args.flows.split(",") if f in FLOWS]
+
+    store = CaseStore.build(args.cases, args.db)
+    server = FixtureServer(store, latency=args.latency, jitter=args.jitter).start()
+    _configure(server.url)
+    cache_dir = tempfile.mkdtemp(prefix="bench_static_")
+    import metrics
+    import scraper
+    scraper.ROUTE_RULES.cache_dir = cache_dir
+
+    report = {"config": {**vars(args), "cases_served": len(store.cases)}, "results": []}
+    print(f"Fixture: {server.url}, {len(store.cases)} cases, {args.latency:.0f} ms latency")
+    try:
+        if "app" in flows:
+            report["results"] += bench_app(store, levels, args.lookups, cache_dir)
+        if "scraper" in flows:
+            report["results"] += bench_scraper(store, levels, args.lookups)
+        if "harvest" in flows:
+            report["results"] += bench_harvest(store, levels)
+        if not args.no_memory:
+            report["memory_mb_per_context"] = bench_memory(server.url)
+    finally:
+        server.stop()
+    report["stages"] = metrics.summarize(metrics.recent)
+    report["requests"] = server.hits
+    report["not_modified"] = server.not_modified
+
+    print_table(report["results"])
+    if "memory_mb_per_context" in report:
+        print(f"Memory per browser context: {report['memory_mb_per_context']} MB")
+    print(metrics.format_summary(report["stages"]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"-> {args.json}")
+
+
+if __name__ == "__main__":
+    main()
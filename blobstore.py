@@ -0,0 +1,151 @@
+# blobstore.py
+# Content-addressed, gzip-compressed store for page snapshots (HTML) and generated PDFs.
+# Har blob apne (uncompressed) SHA-256 hash se pehchana jaata hai, isliye same snapshot sirf ek baar save hota hai.
+# DB rows sirf hash rakhte hain (`html_hash`, `pdf_hash`).
+#
+#   py blobstore.py migrate [--db queries.db] [--vacuum]   # purane inline html/raw_html ko blobs mein le jao
+#   py blobstore.py cat <hash> > page.html                 # blob ko stream karke wapas nikalo
+#   py blobstore.py stats
+
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+BLOB_DIR = "blobs"
+CHUNK_SIZE = 1 << 16
+COMPRESS_LEVEL = 6
+
+# (table, inline column, hash column) jo migrate hote hain
+INLINE_COLUMNS = [("queries", "html", "html_hash"), ("case_logs", "raw_html", "html_hash")]
+
+
+class BlobStore:
+    def __init__(self, root=BLOB_DIR, level=COMPRESS_LEVEL):
+        self.root = root
+        self.level = level
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:] + ".gz")
+
+    def exists(self, digest):
+        return bool(digest) and os.path.exists(self.path(digest))
+
+    def _commit(self, tmp_path, digest):
+        final = self.path(digest)
+        if os.path.exists(final):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(tmp_path, final)
+        return digest
+
+    def _tmp(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        return os.fdopen(fd, "wb"), tmp_path
+
+    def put_bytes(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        if self.exists(digest):
+            return digest
+        raw, tmp_path = self._tmp()
+        with raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.level, mtime=0) as gz:
+            gz.write(data)
+        return self._commit(tmp_path, digest)
+
+    def put_text(self, text):
+        return self.put_bytes(text.encode("utf-8"))
+
+    def put_stream(self, stream):
+        """File-like object ko chunks mein padh kar compress karta hai (poora memory mein nahi aata)."""
+        sha = hashlib.sha256()
+        raw, tmp_path = self._tmp()
+        with raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.level, mtime=0) as gz:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                sha.update(chunk)
+                gz.write(chunk)
+        return self._commit(tmp_path, sha.hexdigest())
+
+    def put_file(self, path):
+        with open(path, "rb") as f:
+            return self.put_stream(f)
+
+    def open(self, digest):
+        """Decompressed content ke liye streaming file object."""
+        return gzip.open(self.path(digest), "rb")
+
+    def iter_chunks(self, digest, size=CHUNK_SIZE):
+        with self.open(digest) as f:
+            yield from iter(lambda: f.read(size), b"")
+
+    def read_text(self, digest):
+        with self.open(digest) as f:
+            return f.read().decode("utf-8", errors="replace")
+
+    def export(self, digest, dest_path):
+        with self.open(digest) as src, open(dest_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        return dest_path
+
+
+def migrate_inline_html(db_path, store, chunk=200, vacuum=False):
+    """Inline HTML columns ko blobs mein move karke row mein sirf hash rakhta hai. Dobara chalana safe hai."""
+    from storage import connect, ensure_schema
+
+    conn = connect(db_path)
+    ensure_schema(conn)
+    moved = 0
+    for table, column, hash_column in INLINE_COLUMNS:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                f"SELECT id, {column} FROM {table} WHERE id > ? AND {column} IS NOT NULL AND {column} != '' ORDER BY id LIMIT ?",
+                (last_id, chunk),
+            ).fetchall()
+            if not rows:
+                break
+            updates = [(store.put_text(html), row_id) for row_id, html in rows]
+            with conn:
+                conn.executemany(f"UPDATE {table} SET {hash_column} = ?, {column} = NULL WHERE id = ?", updates)
+            moved += len(rows)
+            last_id = rows[-1][0]
+    if vacuum and moved:
+        conn.execute("VACUUM")
+    conn.close()
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed blob store for HTML snapshots and PDFs")
+    parser.add_argument("--root", default=BLOB_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="move inline html/raw_html columns out of the database")
+    m.add_argument("--db", default="queries.db")
+    m.add_argument("--vacuum", action="store_true", help="reclaim the freed space afterwards")
+    c = sub.add_parser("cat", help="stream a blob to stdout")
+    c.add_argument("digest")
+    sub.add_parser("stats")
+    args = parser.parse_args()
+
+    store = BlobStore(args.root)
+    if args.cmd == "migrate":
+        print(f"Moved {migrate_inline_html(args.db, store, vacuum=args.vacuum)} snapshots into {args.root}/")
+    elif args.cmd == "cat":
+        for chunk in store.iter_chunks(args.digest):
+            sys.stdout.buffer.write(chunk)
+    else:
+        count = size = 0
+        for dirpath, _, files in os.walk(args.root):
+            for name in files:
+                if name.endswith(".gz"):
+                    count += 1
+                    size += os.path.getsize(os.path.join(dirpath, name))
+        print(f"{count} blobs, {size / 1e6:.1f} MB compressed")
+
+
+if __name__ == "__main__":
+    main()
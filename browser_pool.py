@@ -0,0 +1,280 @@
+# browser_pool.py
+# Process-wide browser manager: ek headless Chromium, har Streamlit session ko apna isolated BrowserContext.
+# Playwright (async API) ek background thread ke event loop par chalta hai; Streamlit ke script threads
+# `manager.call(session_id, fn, ...)` se us loop par kaam bhejte hain aur result ka intezaar karte hain.
+# `warm_size` > 0 ho toh manager itne pages pehle se `warmup(page)` (portal + CAPTCHA) karke ready rakhta hai;
+# `claim_warm(session_id)` inme se ek session ko turant de deta hai aur background mein naya bana leta hai.
+# `handoff(session_id, job_id)` session ka page (bhara hua CAPTCHA samet) background job ko saunp deta hai; job ka page
+# `release(job_id)` tak pinned rehta hai (kabhi evict nahi hota), aur ek session ke `max_handoffs` se zyada nahi.
+
+import asyncio
+import threading
+import time
+
+from playwright.async_api import async_playwright
+
+from netrules import install_routes
+
+MAX_CONTEXTS = 8
+IDLE_TIMEOUT = 15 * 60   # seconds; itni der se unused context band ho jaata hai
+REAP_INTERVAL = 30       # seconds; idle contexts aur browser health check
+CALL_TIMEOUT = 120       # seconds
+WARM_TTL = 10 * 60       # seconds; is se purana warm page (session/CAPTCHA expire) phenk diya jaata hai
+MAX_HANDOFFS = 2         # ek session ke itne pages ek saath jobs ke paas reh sakte hain
+
+
+class PoolExhausted(RuntimeError):
+    """Saare contexts busy hain; thodi der baad try karein."""
+
+
+class HandoffLimit(RuntimeError):
+    """Session ke `max_handoffs` pages pehle se jobs ke paas hain; un mein se koi poora hone ke baad try karein."""
+
+
+class _Lease:
+    __slots__ = ("context", "page", "lock", "last_used", "net")
+
+    def __init__(self, context, page, net=None):
+        self.context = context
+        self.page = page
+        self.net = net
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class BrowserManager:
+    def __init__(self, max_contexts=MAX_CONTEXTS, idle_timeout=IDLE_TIMEOUT, headless=True, launch_args=None, route_rules=None,
+                 warm_size=0, warmup=None, warm_ttl=WARM_TTL, max_handoffs=MAX_HANDOFFS):
+        self.max_contexts = max_contexts
+        self.max_handoffs = max_handoffs
+        self.warm_size = warm_size if warmup is not None else 0
+        self.warmup = warmup
+        self.warm_ttl = warm_ttl
+        self._warm = []  # (lease, ready_at, warmup info), oldest first
+        self._refill = None
+        self._tasks = []  # reaper / replenisher, close() par cancel
+        self.route_rules = route_rules
+        self.idle_timeout = idle_timeout
+        self.headless = headless
+        self.launch_args = launch_args or {}
+        self.relaunches = 0
+        self._leases = {}
+        self._pinned = {}  # job id -> (session_id, lease): handoff se release tak; eviction inhe nahi chhoota
+        self._opening = {}  # session_id -> naya context bana rahe task (ek session ke do calls ek hi context paayein)
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-manager", daemon=True)
+        self._thread.start()
+        self.run(self._start())
+
+    # --- thread-safe API (Streamlit threads se) ---
+    def run(self, coro, timeout=CALL_TIMEOUT):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def call(self, session_id, fn, *args, timeout=CALL_TIMEOUT, **kwargs):
+        """`await fn(page, *args, **kwargs)` ko session ke page par chalata hai (ek session ke calls ek ke baad ek)."""
+        async def _do():
+            lease = await self._lease(session_id)
+            async with lease.lock:
+                lease.last_used = time.monotonic()
+                try:
+                    return await fn(lease.page, *args, **kwargs)
+                finally:
+                    lease.last_used = time.monotonic()
+        return self.run(_do(), timeout)
+
+    def claim_warm(self, session_id, timeout=CALL_TIMEOUT):
+        """Ek ready warm page session ko de deta hai; us ka warmup info return karta hai (koi ready na ho toh None)."""
+        return self.run(self._claim(session_id), timeout)
+
+    def release(self, session_id):
+        self.run(self._release(session_id))
+
+    def handoff(self, session_id, new_id, timeout=CALL_TIMEOUT):
+        """Session ka context `new_id` (jaise ek job) ke naam pin kar deta hai; session agli call par naya context ya
+        warm page leta hai. Pinned context `release(new_id)` tak evict nahi hota. False agar session ke paas context hi
+        nahi tha; HandoffLimit agar session ke `max_handoffs` contexts pehle se pinned hain (tab session ka page usi
+        ke paas rehta hai)."""
+        return self.run(self._handoff(session_id, new_id), timeout)
+
+    def net_stats(self, session_id):
+        """Is session ke context ke RouteStats (blocked/cached requests, bytes), ya None."""
+        lease = self._leases.get(session_id)
+        return lease.net if lease is not None else None
+
+    def stats(self):
+        return {"contexts": len(self._leases) + len(self._pinned), "max_contexts": self.max_contexts, "warm": len(self._warm),
+                "pinned": len(self._pinned),
+                "connected": bool(self._browser and self._browser.is_connected()), "relaunches": self.relaunches}
+
+    def close(self):
+        self.run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # --- loop thread ---
+    async def _start(self):
+        self._browser_lock = asyncio.Lock()
+        self._refill = asyncio.Event()
+        self._playwright = await async_playwright().start()
+        await self._ensure_browser()
+        self._tasks.append(self._loop.create_task(self._reaper()))
+        if self.warm_size:
+            self._tasks.append(self._loop.create_task(self._replenisher()))
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._browser is not None:
+                # Crash ke baad purane contexts kisi kaam ke nahi
+                self._leases.clear()
+                self._pinned.clear()
+                self._warm.clear()
+                self.relaunches += 1
+            self._browser = await self._playwright.chromium.launch(headless=self.headless, **self.launch_args)
+            return self._browser
+
+    async def _new_lease(self):
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        net = await install_routes(context, self.route_rules) if self.route_rules is not None else None
+        page = await context.new_page()
+        return _Lease(context, page, net)
+
+    async def _lease(self, session_id):
+        if session_id in self._pinned:
+            # Job ka page: wahi chahiye jis par CAPTCHA bhara tha (band ho gaya ho toh bhi naya blank page nahi)
+            return self._pinned[session_id][1]
+        lease = self._leases.get(session_id)
+        if lease is not None and not lease.page.is_closed() and self._browser.is_connected():
+            return lease
+        # Pehle se koi call is session ka context bana rahi hai toh usi ka intezaar (warna dono banate aur ek leak hota);
+        # shield: intezaar karne wala cancel/timeout ho toh bhi banta hua context _leases tak pahunche
+        opening = self._opening.get(session_id)
+        if opening is None:
+            opening = self._opening[session_id] = self._loop.create_task(self._open_lease(session_id))
+            opening.add_done_callback(lambda _: self._opening.pop(session_id, None))
+        return await asyncio.shield(opening)
+
+    async def _open_lease(self, session_id):
+        lease = self._leases.get(session_id)
+        if lease is not None:
+            await self._release(session_id)
+        if self._in_use() >= self.max_contexts:
+            if self._warm:
+                # Asli session ko jagah dene ke liye sabse purana warm page chhod do
+                await self._close_lease(self._warm.pop(0)[0])
+                self._refill.set()
+            else:
+                await self._evict_one()
+        lease = await self._new_lease()
+        current = self._leases.get(session_id)
+        if current is not None and not current.page.is_closed():
+            # Banne ke dauraan session ko warm page mil gaya (claim_warm); naya wala zaroorat ka nahi
+            await self._close_lease(lease)
+            return current
+        self._leases[session_id] = lease
+        return lease
+
+    async def _claim(self, session_id):
+        now = time.monotonic()
+        try:
+            while self._warm:
+                lease, ready_at, info = self._warm.pop(0)
+                if now - ready_at > self.warm_ttl or lease.page.is_closed():
+                    await self._close_lease(lease)
+                    continue
+                await self._release(session_id)
+                lease.last_used = now
+                self._leases[session_id] = lease
+                return info
+            return None
+        finally:
+            self._refill.set()
+
+    async def _handoff(self, session_id, new_id):
+        lease = self._leases.get(session_id)
+        if lease is None:
+            return False
+        if sum(1 for owner, _ in self._pinned.values() if owner == session_id) >= self.max_handoffs:
+            raise HandoffLimit(f"{self.max_handoffs} lookups from this session are already waiting")
+        del self._leases[session_id]
+        await self._release(new_id)
+        lease.last_used = time.monotonic()
+        self._pinned[new_id] = (session_id, lease)
+        return True
+
+    def _in_use(self):
+        return len(self._leases) + len(self._pinned) + len(self._warm)
+
+    async def _replenisher(self):
+        while True:
+            try:
+                now = time.monotonic()
+                for item in [w for w in self._warm if now - w[1] > self.warm_ttl]:
+                    self._warm.remove(item)
+                    await self._close_lease(item[0])
+                while len(self._warm) < self.warm_size and self._in_use() < self.max_contexts:
+                    lease = await self._new_lease()
+                    try:
+                        info = await self.warmup(lease.page)
+                    except Exception as e:
+                        await self._close_lease(lease)
+                        print(f"[browser_pool] warmup failed: {e}")
+                        break
+                    self._warm.append((lease, time.monotonic(), info))
+            except Exception as e:
+                print(f"[browser_pool] replenish failed: {e}")
+            self._refill.clear()
+            try:
+                await asyncio.wait_for(self._refill.wait(), timeout=REAP_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _evict_one(self):
+        # Sirf sessions ke apne contexts; jobs ke pinned pages (queue mein intezaar karte hue bhi) kabhi nahi
+        idle = [(lease.last_used, sid) for sid, lease in self._leases.items() if not lease.lock.locked()]
+        if not idle:
+            raise PoolExhausted(f"all {self.max_contexts} browser contexts are busy")
+        await self._release(min(idle)[1])
+
+    async def _release(self, session_id):
+        lease = self._leases.pop(session_id, None)
+        if lease is None:
+            lease = self._pinned.pop(session_id, (None, None))[1]
+        if lease is not None:
+            await self._close_lease(lease)
+            if self._refill is not None:
+                self._refill.set()
+
+    async def _close_lease(self, lease):
+        try:
+            await lease.context.close()
+        except Exception:
+            pass
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            try:
+                now = time.monotonic()
+                for sid, lease in list(self._leases.items()) + [(job, lease) for job, (_, lease) in self._pinned.items()]:
+                    # Pinned bhi: job release kiye bina mar gaya ho toh context leak na ho (CAPTCHA tab tak expire)
+                    if not lease.lock.locked() and now - lease.last_used > self.idle_timeout:
+                        await self._release(sid)
+                await self._ensure_browser()
+            except Exception as e:
+                print(f"[browser_pool] health check failed: {e}")
+
+    async def _shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        for sid in [*self._leases, *self._pinned]:
+            await self._release(sid)
+        while self._warm:
+            await self._close_lease(self._warm.pop()[0])
+        if self._browser is not None:
+            await self._browser.close()
+        await self._playwright.stop()
@@ -0,0 +1,126 @@
+# case_cache.py
+# Case result cache: in-process LRU tier ke peeche SQLite tier (`cases` + `snapshots` ka latest successful snapshot).
+# Fresh result mil jaaye toh portal, CAPTCHA aur parse ka poora round-trip bach jaata hai.
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from blobstore import BLOB_DIR, BlobStore
+from case_parser import parse_case_html
+from storage import DB_PATH, connect, ensure_schema, find_case
+
+DEFAULT_TTL = 6 * 3600  # seconds
+LRU_SIZE = 256
+
+CacheHit = namedtuple("CacheHit", "result tier age")
+
+
+def case_key(court, case_type, case_number, filing_year):
+    """Normalized case identity: court/case type case-insensitive, case number bina leading zeros, year int."""
+    number = str(case_number).strip().lstrip("0") or "0"
+    return (court.strip().lower(), case_type.strip().upper(), number, int(str(filing_year).strip()))
+
+
+def _key_text(key):
+    return "|".join(str(part) for part in key)
+
+
+class CaseCache:
+    def __init__(self, db_path=DB_PATH, ttl=DEFAULT_TTL, max_entries=LRU_SIZE, blobs=None):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.blobs = blobs or BlobStore(BLOB_DIR)
+        self._lru = OrderedDict()  # key -> (stored_at epoch, result)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path)
+            ensure_schema(self._conn)
+        return self._conn
+
+    def get(self, court, case_type, case_number, filing_year, ttl=None):
+        """Fresh result ho toh CacheHit(result, tier, age seconds), warna None."""
+        ttl = self.ttl if ttl is None else ttl
+        key = case_key(court, case_type, case_number, filing_year)
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if now - entry[0] <= ttl:
+                    self._lru.move_to_end(key)
+                    return CacheHit(entry[1], "memory", now - entry[0])
+                del self._lru[key]
+            row = self._latest_row(key)
+        if row is None:
+            return None
+        stored_at, html_hash, latest_pdf = row
+        if now - stored_at > ttl or not self.blobs.exists(html_hash):
+            return None
+        result = parse_case_html(self.blobs.read_text(html_hash))
+        if latest_pdf and not result["latest_pdf"]:
+            result["latest_pdf"] = latest_pdf
+        if not result["success"]:
+            return None
+        self._remember(key, stored_at, result)
+        return CacheHit(result, "database", now - stored_at)
+
+    def _latest_row(self, key):
+        """(stored_at epoch, html_hash, latest_pdf), dono lookups unique/covering indexes se (table scan nahi)."""
+        conn = self._db()
+        case_id = find_case(conn, *key)
+        if case_id is None:
+            return None
+        row = conn.execute(
+            "SELECT ts, html_hash, latest_pdf FROM snapshots WHERE case_id = ? AND ok = 1 ORDER BY ts DESC LIMIT 1",
+            (case_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        invalidated = conn.execute("SELECT ts FROM cache_invalidations WHERE case_key = ?", (_key_text(key),)).fetchone()
+        if invalidated and row[0] <= invalidated[0]:
+            return None
+        return row
+
+    def _remember(self, key, stored_at, result):
+        with self._lock:
+            self._lru[key] = (stored_at, result)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def put(self, court, case_type, case_number, filing_year, result):
+        """Abhi-abhi portal se aaya result memory tier mein (DB row log_query likhta hai)."""
+        self._remember(case_key(court, case_type, case_number, filing_year), time.time(), result)
+
+    def invalidate(self, court, case_type, case_number, filing_year):
+        """Is case ke ab tak ke saare cached results (memory + DB tier) ko purana maan lo.
+        DB tier mein invalidation ka waqt yaad rakha jaata hai; sirf us ke baad ke snapshots valid hain
+        (max_id sirf jaankari ke liye: us waqt ka max(snapshots.id))."""
+        key = case_key(court, case_type, case_number, filing_year)
+        with self._lock:
+            self._lru.pop(key, None)
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT INTO cache_invalidations (case_key, max_id, ts) "
+                    "VALUES (?, (SELECT coalesce(max(id), 0) FROM snapshots), ?) "
+                    "ON CONFLICT(case_key) DO UPDATE SET max_id = excluded.max_id, ts = excluded.ts",
+                    (_key_text(key), time.time()),
+                )
+
+    def clear_memory(self):
+        with self._lock:
+            self._lru.clear()
+
+
+def format_age(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60} min"
+    return f"{seconds // 3600} h {seconds % 3600 // 60} min"
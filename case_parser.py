@@ -0,0 +1,350 @@
+# case_parser.py
+# Case detail HTML se fields nikalne wala shared parser (app.py, scraper.py aur HTTP backend teeno use karte hain).
+# HTML ko sirf ek baar walk kiya jaata hai (TAG.split se text aur tags ki flat list): text lines, tables aur links
+# ek hi pass mein collect hote hain, phir un chhote structures se typed CaseRecord banta hai.
+
+import re
+from dataclasses import dataclass, field, asdict
+from html import unescape
+from urllib.parse import urljoin
+
+ECOURTS_BASE_URL = "https://services.ecourts.gov.in"
+
+# In tags par nayi text line shuru hoti hai
+BLOCK_TAGS = {"br", "p", "div", "tr", "td", "th", "li", "ul", "ol", "table", "thead", "tbody", "caption",
+              "h1", "h2", "h3", "h4", "h5", "h6", "section"}
+# Walker sirf in tags par kuch karta hai; baaki (span, b, font, ...) seedhe skip
+ACTIVE_TAGS = BLOCK_TAGS | {"a"}
+# Walk se pehle ek hi sub mein hata diye jaate hain: script/style, comments, doctype
+SKIP = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>|<!--.*?-->|<[!?][^>]*>", re.S | re.I)
+# Tag attributes, unrolled pattern se (quoted values mein ">" bhi chal jaata hai)
+_ATTRS = r"[^>\"']*(?:(?:\"[^\"]*\"|'[^']*')[^>\"']*)*"
+# Tokens: poori "seedhi" table row (cells mein sirf text, jaise hearing history) ek hi token, warna start/end tag
+TAG = re.compile(
+    rf"(<tr\b{_ATTRS}>(?:\s*<t[dh]\b{_ATTRS}>[^<]*</t[dh]\s*>)+\s*</tr\s*>)"
+    rf"|<(/?)([a-zA-Z][a-zA-Z0-9]*)({_ATTRS})>",
+    re.I,
+)
+ROW_CELL = re.compile(rf"<t[dh]\b{_ATTRS}>([^<]*)<", re.I)
+HREF_ATTR = re.compile(r"""href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+PDF_HREF = re.compile(r"\.pdf|display_pdf|pdf_file|viewOrder", re.I)
+KV_LINE = re.compile(r"^([A-Za-z][A-Za-z ()./']{1,40}?)\s*[:\-]\s*(\S.*)$")
+SECTION_HEADING = re.compile(
+    r"^(petitioners?|respondents?)( and advocates?)?$|^(acts?|case history|history of case hearing|"
+    r"interim orders?|final orders?|orders?|case status|case details|fir details|ia status|transfer details)$|"
+    r"^under (acts?|sections?)\b",
+    re.I,
+)
+
+
+@dataclass
+class Hearing:
+    judge: str = ""
+    business_date: str = ""
+    hearing_date: str = ""
+    purpose: str = ""
+
+
+@dataclass
+class Order:
+    number: str = ""
+    date: str = ""
+    title: str = ""
+    url: str = ""
+
+
+@dataclass
+class ActSection:
+    act: str = ""
+    section: str = ""
+
+
+@dataclass
+class CaseRecord:
+    petitioner: str = ""
+    respondent: str = ""
+    petitioner_advocates: list = field(default_factory=list)
+    respondent_advocates: list = field(default_factory=list)
+    case_type: str = ""
+    cnr: str = ""
+    filing_number: str = ""
+    filing_date: str = ""
+    registration_number: str = ""
+    registration_date: str = ""
+    first_hearing: str = ""
+    next_hearing: str = ""
+    decision_date: str = ""
+    case_status: str = ""
+    court: str = ""
+    hearings: list = field(default_factory=list)
+    orders: list = field(default_factory=list)
+    acts: list = field(default_factory=list)
+    pdf_links: list = field(default_factory=list)
+
+    @property
+    def success(self):
+        return any([self.petitioner, self.respondent, self.filing_date])
+
+    @property
+    def latest_pdf(self):
+        # Orders table mein aakhri order sabse naya hota hai; warna page ka pehla PDF link
+        for order in reversed(self.orders):
+            if order.url:
+                return order.url
+        return self.pdf_links[0] if self.pdf_links else ""
+
+    def as_dict(self, html=""):
+        """Purane `parse_results` wale keys + naye fields (app.py aur DB logging yahi use karte hain)."""
+        d = asdict(self)
+        d.update(success=self.success, latest_pdf=self.latest_pdf, html=html)
+        return d
+
+
+class _CaseHTMLWalker:
+    """Single pass: text lines, tables (rows -> cells) aur saare links."""
+
+    def __init__(self):
+        self.lines = []
+        self.tables = []  # (rows of cell text, rows of cell links)
+        self.links = []   # (href, text)
+
+    def walk(self, html):
+        # Pehle har token ek Match object aur handle_* method call tha; profile mein wahi sabse mehenga tha, isliye poora
+        # state machine yahin locals mein, aur seedhi table rows (page ka zyaadatar hissa) ek token mein.
+        #
+        # TAG.split ki flat list: pehle text, phir har match ke TAG.groups (4) groups aur us ke baad ka text:
+        #   [text, row_html, slash, name, attrs, text, row_html, slash, name, attrs, ..., text]
+        #   row_html: poori seedhi <tr>..</tr> (tab baaki teen None), warna None
+        #   slash:    end tag par "/", start tag par ""
+        #   name:     tag ka naam;  attrs: tag ke attributes
+        # Isliye stride TAG.groups + 1 = 5 ka hai, har stride mein (tag se pehle ka text, us tag ke groups). Aakhri
+        # text ke baad koi tag nahi, to wahan khaali groups jod diye (name None -> loop khatam).
+        parts = TAG.split(SKIP.sub(" ", html))
+        parts.extend([None] * TAG.groups)
+        lines, tables, links = self.lines, self.tables, self.links
+        line = []      # current text line ke tukde
+        stack = []     # open tables: [rows, current row, current cell ([parts], [links]) ya None]; seedhi row ke
+                       # cells (clean text, [])
+        table = cell = link = None  # stack[-1], us ka open cell, open <a> [href, [parts]]
+        for text, row_html, slash, name, attrs in zip(*[iter(parts)] * (TAG.groups + 1)):
+            if text and not text.isspace():
+                if "&" in text:
+                    text = unescape(text)
+                line.append(text)
+                if cell is not None:
+                    cell[0].append(text)
+                if link is not None:
+                    link[1].append(text)
+            if row_html is not None:
+                # <tr><td>..</td>...</tr>: har cell apni line, row table mein
+                if line:
+                    text = " ".join(" ".join(line).split())
+                    if text:
+                        lines.append(text)
+                    line = []
+                row = []
+                for text in ROW_CELL.findall(row_html):
+                    if "&" in text:
+                        text = unescape(text)
+                    if link is not None and not text.isspace():
+                        link[1].append(text)
+                    text = " ".join(text.split())
+                    if text:
+                        lines.append(text)
+                    row.append((text, []))
+                if table is not None:
+                    table[1] = row
+                    table[0].append(row)
+                    cell = table[2] = None
+                continue
+            if name is None:
+                break
+            tag = name.lower()
+            if tag not in ACTIVE_TAGS:
+                continue
+            if tag != "a" and line:
+                text = " ".join(" ".join(line).split())
+                if text:
+                    lines.append(text)
+                line = []
+            if not slash:
+                if tag == "table":
+                    table = [[], None, None]
+                    stack.append(table)
+                    cell = None
+                elif table is None:
+                    if tag == "a":
+                        link = [_href(attrs), []]
+                elif tag == "tr":
+                    table[1] = []
+                    table[0].append(table[1])
+                elif tag == "td" or tag == "th":
+                    if table[1] is None:
+                        table[1] = []
+                        table[0].append(table[1])
+                    cell = table[2] = ([], [])
+                    table[1].append(cell)
+                elif tag == "a":
+                    link = [_href(attrs), []]
+            elif tag == "table":
+                if stack:
+                    rows = [r for r in stack.pop()[0] if r]
+                    tables.append(([[c[0] if c[0].__class__ is str else " ".join(" ".join(c[0]).split()) for c in r] for r in rows],
+                                   [[c[1] for c in r] for r in rows]))
+                    table = stack[-1] if stack else None
+                    cell = table[2] if table else None
+            elif tag == "td" or tag == "th":
+                if table is not None:
+                    cell = table[2] = None
+            elif tag == "a" and link is not None:
+                href, text_parts = link
+                link = None
+                if href:
+                    links.append((href, _clean(" ".join(text_parts))))
+                    if cell is not None:
+                        cell[1].append(href)
+        if line:
+            text = _clean(" ".join(line))
+            if text:
+                lines.append(text)
+
+
+def _href(attrs):
+    m = HREF_ATTR.search(attrs)
+    return unescape(next((g for g in m.groups() if g is not None), "")) if m else ""
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+def _key(label):
+    return _clean(label).rstrip(":-").strip().lower()
+
+
+def _columns(header, wanted):
+    """Header cells mein se har wanted naam ka column index (na mile toh None)."""
+    header = [_key(h) for h in header]
+    found = {}
+    for name, needles in wanted.items():
+        found[name] = next((i for i, h in enumerate(header) if any(n in h for n in needles)), None)
+    return found
+
+
+def _pick(row, idxs):
+    """Row ke cells columns ke order mein (dataclass fields bhi isi order mein hain); column na ho toh ""."""
+    n = len(row)
+    return [row[i] if i is not None and i < n else "" for i in idxs]
+
+
+def _party_lines(lines):
+    """'1) Ram Kumar', 'Advocate- X' jaisi lines ko (names, advocates) mein baantta hai."""
+    names, advocates = [], []
+    for line in lines:
+        m = re.match(r"^advocate\s*[:\-]?\s*(.*)$", line, flags=re.I)
+        if m:
+            if m.group(1):
+                advocates.append(m.group(1))
+            continue
+        name, _, adv = re.sub(r"^\d+\)\s*", "", line).partition("Advocate")
+        name = name.strip(" ,;")
+        if name:
+            names.append(name)
+        adv = adv.lstrip(" :-").strip()
+        if adv:
+            advocates.append(adv)
+    return names, advocates
+
+
+def parse_case(html, base_url=ECOURTS_BASE_URL):
+    """Case detail page ko ek pass mein parse karke CaseRecord return karta hai."""
+    walker = _CaseHTMLWalker()
+    walker.walk(html)
+
+    record = CaseRecord()
+    kv = {}
+
+    def remember(label, value):
+        k = _key(label)
+        if k and value and k not in kv:
+            kv[k] = value
+
+    # Ek hi pass: "Label: value" lines, aur Petitioner / Respondent sections (heading ke baad wali lines, agli heading tak)
+    sections, current = {}, None
+    for line in walker.lines:
+        # Dono patterns letter se shuru hote hain; dates / numbers wali lines (hearing history) regex tak nahi jaatin
+        heading = None
+        if line[0].isalpha():
+            m = KV_LINE.match(line)
+            if m:
+                remember(m.group(1), m.group(2).strip())
+            heading = SECTION_HEADING.match(line)
+        if heading:
+            current = (heading.group(1) or "").lower().rstrip("s") or None
+            if current:
+                sections.setdefault(current, [])
+        elif current:
+            sections[current].append(line)
+
+    for rows, row_links in walker.tables:
+        header = rows[0] if rows else []
+        hkeys = [_key(h) for h in header]
+        if any("hearing date" in h for h in hkeys) and any("purpose" in h or "business" in h for h in hkeys):
+            cols = _columns(header, {"judge": ("judge",), "business_date": ("business",), "hearing_date": ("hearing date",), "purpose": ("purpose",)})
+            idxs = list(cols.values())
+            for row in rows[1:]:
+                hearing = Hearing(*_pick(row, idxs))
+                if hearing.hearing_date or hearing.business_date:
+                    record.hearings.append(hearing)
+        elif any("order" in h for h in hkeys) and any("date" in h for h in hkeys):
+            cols = _columns(header, {"number": ("number", "no"), "date": ("date",), "title": ("details", "title")})
+            idxs = list(cols.values())
+            for row, links in zip(rows[1:], row_links[1:]):
+                url = next((href for cell in links for href in cell if PDF_HREF.search(href)), "")
+                order = Order(*_pick(row, idxs), url=urljoin(base_url + "/", url) if url else "")
+                if order.date or order.url:
+                    record.orders.append(order)
+        elif any("act" in h for h in hkeys) and any("section" in h for h in hkeys):
+            cols = _columns(header, {"act": ("act",), "section": ("section",)})
+            idxs = list(cols.values())
+            for row in rows[1:]:
+                act = ActSection(*_pick(row, idxs))
+                if act.act or act.section:
+                    record.acts.append(act)
+        else:
+            # Label | Value | Label | Value jaisi rows
+            for row in rows:
+                for i in range(0, len(row) - 1, 2):
+                    remember(row[i], row[i + 1])
+
+    pet_names, record.petitioner_advocates = _party_lines(sections.get("petitioner", []))
+    res_names, record.respondent_advocates = _party_lines(sections.get("respondent", []))
+    record.petitioner = kv.get("petitioner") or (pet_names[0] if pet_names else "")
+    record.respondent = kv.get("respondent") or (res_names[0] if res_names else "")
+
+    record.case_type = kv.get("case type", "")
+    record.cnr = kv.get("cnr number", "") or kv.get("cnr no", "")
+    record.filing_number = kv.get("filing number", "")
+    record.filing_date = kv.get("filing date", "")
+    record.registration_number = kv.get("registration number", "")
+    record.registration_date = kv.get("registration date", "")
+    record.first_hearing = kv.get("first hearing date", "")
+    record.next_hearing = kv.get("next hearing date", "") or kv.get("next date", "")
+    record.decision_date = kv.get("decision date", "")
+    record.case_status = (kv.get("case status") or kv.get("stage of case") or kv.get("case stage")
+                          or ("Disposed" if record.decision_date else ""))
+    record.court = kv.get("court number and judge", "")
+
+    seen = set()
+    for href, _ in walker.links:
+        if PDF_HREF.search(href):
+            url = urljoin(base_url + "/", href)
+            if url not in seen:
+                seen.add(url)
+                record.pdf_links.append(url)
+    return record
+
+
+def parse_case_html(html, base_url=ECOURTS_BASE_URL):
+    """Backward-compatible dict (success, petitioner, respondent, filing_date, next_hearing, latest_pdf, html, ...)."""
+    return parse_case(html, base_url).as_dict(html)
@@ -0,0 +1,168 @@
+# case_search.py
+# Parsed case fields (parties, advocates, acts, status, dates) ka normalized table `case_records` aur us par FTS5 search.
+# Har successful lookup ka record background writer se upsert hota hai (ek case = ek row, CNR ya case identity se) aur
+# `cases` se juda rehta hai (case_id); parties alag `parties` table mein. Purane snapshots ko `backfill` parse karke bharta hai.
+#
+#   py case_search.py backfill [--db queries.db]
+#   py case_search.py search "ram kumar"
+
+import argparse
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from blobstore import BLOB_DIR, BlobStore
+from case_cache import _key_text, case_key
+from case_parser import parse_case_html
+from migrations import migrate_data
+from storage import (DB_PATH, PETITIONER, PETITIONER_ADVOCATE, RESPONDENT, RESPONDENT_ADVOCATE, SOURCE_APP, SOURCE_NAMES,
+                     SOURCE_SCRAPER, connect, ensure_schema, has_fts, write_rows)
+
+SEARCH_LIMIT = 50
+BACKFILL_CHUNK = 200
+# bm25 weights, storage.FTS_COLUMNS ke order mein: parties aur CNR sabse zyada
+BM25_WEIGHTS = (10.0, 10.0, 5.0, 2.0, 1.0, 10.0, 5.0, 1.0)
+RESULT_COLUMNS = ("case_type", "case_number", "filing_year", "cnr", "petitioner", "respondent", "advocates",
+                  "case_status", "next_hearing", "court", "latest_pdf", "ts")
+# Identity `cases` se (normalized), `ts` case ka sabse naya safal lookup (snapshots index se); baaki record se
+RESULT_SELECT = {
+    "case_type": "coalesce(k.case_type, r.case_type)", "case_number": "coalesce(k.case_number, r.case_number)",
+    "filing_year": "coalesce(k.filing_year, r.filing_year)", "cnr": "coalesce(k.cnr, r.cnr)",
+    "ts": "coalesce((SELECT datetime(max(s.ts), 'unixepoch', 'localtime') FROM snapshots s "
+          "WHERE s.case_id = r.case_id AND s.ok = 1), r.ts)",
+}
+# snapshots.source -> parser ka base URL
+BASE_URLS = {SOURCE_APP: "https://services.ecourts.gov.in", SOURCE_SCRAPER: "https://gaya.dcourts.gov.in"}
+
+
+def party_list(parsed):
+    """Parsed result ke parties `parties` table ke liye: [(role, name), ...]."""
+    names = [(PETITIONER, parsed.get("petitioner", "")), (RESPONDENT, parsed.get("respondent", ""))]
+    names += [(PETITIONER_ADVOCATE, a) for a in parsed.get("petitioner_advocates", [])]
+    return names + [(RESPONDENT_ADVOCATE, a) for a in parsed.get("respondent_advocates", [])]
+
+
+def record_row(court, case_type, case_number, filing_year, parsed, ts, source=""):
+    """Parsed result dict se `case_records` row (writer ko submit karne layak, ya storage.write_rows ko)."""
+    cnr = parsed.get("cnr") or ""
+    try:
+        key = cnr or _key_text(case_key(court, case_type, case_number or "", filing_year))
+    except ValueError:
+        key = _key_text((court, case_type, case_number, filing_year))
+    advocates = parsed.get("petitioner_advocates", []) + parsed.get("respondent_advocates", [])
+    acts = [" ".join(x for x in (a.get("act", ""), a.get("section", "")) if x) for a in parsed.get("acts", [])]
+    return {
+        "case_key": key, "ts": ts, "source": source, "court": court, "case_type": case_type,
+        "case_number": case_number or parsed.get("registration_number", ""), "filing_year": filing_year, "cnr": cnr,
+        "petitioner": parsed.get("petitioner", ""), "respondent": parsed.get("respondent", ""),
+        "advocates": "; ".join(advocates), "acts": "; ".join(acts), "case_status": parsed.get("case_status", ""),
+        "filing_date": parsed.get("filing_date", ""), "registration_date": parsed.get("registration_date", ""),
+        "next_hearing": parsed.get("next_hearing", ""), "decision_date": parsed.get("decision_date", ""),
+        "latest_pdf": parsed.get("latest_pdf", ""), "parties": party_list(parsed),
+    }
+
+
+def index_case(writer, court, case_type, case_number, filing_year, parsed, ts, source=""):
+    """Successful lookup ko search index ke liye queue karta hai (False agar queue bhari thi)."""
+    if not parsed.get("success"):
+        return False
+    return writer.submit("case_records", record_row(court, case_type, case_number, filing_year, parsed, ts, source))
+
+
+def fts_query(text):
+    """User ka text FTS5 query mein: har shabd ek quoted prefix term (AND), taaki operators/quotes se error na aaye."""
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", text))
+
+
+def search_cases(conn, text, limit=SEARCH_LIMIT, case_type=None):
+    """bm25 se ranked matching cases (dicts, best pehle). FTS5 na ho toh LIKE fallback (rank ke bina)."""
+    query = fts_query(text)
+    if not query:
+        return []
+    columns = ", ".join(RESULT_SELECT.get(c, f"r.{c}") for c in RESULT_COLUMNS)
+    args = []
+    if has_fts(conn):
+        sql = (f"SELECT {columns}, bm25(case_records_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS rank "
+               "FROM case_records_fts JOIN case_records r ON r.id = case_records_fts.rowid "
+               "LEFT JOIN cases k ON k.id = r.case_id WHERE case_records_fts MATCH ?")
+        args.append(query)
+    else:
+        terms = re.findall(r"\w+", text)
+        haystack = " || ' ' || ".join(f"coalesce(r.{c}, '')" for c in ("petitioner", "respondent", "advocates", "acts", "cnr", "case_number"))
+        sql = (f"SELECT {columns}, 0 AS rank FROM case_records r LEFT JOIN cases k ON k.id = r.case_id WHERE "
+               + " AND ".join(f"({haystack}) LIKE ?" for _ in terms))
+        args.extend(f"%{t}%" for t in terms)
+    if case_type:
+        sql += " AND coalesce(k.case_type, upper(r.case_type)) = upper(?)"
+        args.append(case_type)
+    rows = conn.execute(sql + " ORDER BY rank LIMIT ?", args + [limit]).fetchall()
+    return [dict(zip(RESULT_COLUMNS + ("rank",), row)) for row in rows]
+
+
+def backfill(db_path=DB_PATH, blobs=None, chunk=BACKFILL_CHUNK):
+    """Purane safal snapshots (blob store ka HTML) parse karke case_records bharta hai. Dobara chalana safe hai (upsert);
+    snapshots id ke order mein jaate hain taaki har case ka sabse naya record bache. Legacy rows ki copy baaki ho toh
+    pehle wahi (warna un ke snapshots abhi hain hi nahi)."""
+    blobs = blobs or BlobStore(BLOB_DIR)
+    conn = connect(db_path)
+    ensure_schema(conn)
+    migrate_data(conn, blobs=blobs)
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT s.id, s.source, s.ts, s.html_hash, c.name, k.case_type, k.case_number, k.filing_year FROM snapshots s "
+            "JOIN cases k ON k.id = s.case_id JOIN courts c ON c.id = k.court_id "
+            "WHERE s.id > ? AND s.ok = 1 ORDER BY s.id LIMIT ?",
+            (last_id, chunk),
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        records = []
+        for _, source, ts, digest, court, case_type, number, year in rows:
+            if not blobs.exists(digest):
+                continue
+            parsed = parse_case_html(blobs.read_text(digest), BASE_URLS.get(source, BASE_URLS[SOURCE_APP]))
+            if parsed["success"]:
+                stamp = datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+                records.append(("case_records", record_row(court, case_type, "" if number is None else str(number),
+                                                           "" if year is None else str(year), parsed, stamp,
+                                                           SOURCE_NAMES.get(source, ""))))
+        if records:
+            with conn:
+                write_rows(conn, records)
+            indexed += len(records)
+    conn.close()
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over parsed case records")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("backfill", help="parse logged pages into the search index")
+    s = sub.add_parser("search", help="search parties, advocates, acts, CNR")
+    s.add_argument("text")
+    s.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.cmd == "backfill":
+        started = time.monotonic()
+        print(f"Indexed {backfill(args.db)} case records in {time.monotonic() - started:.1f}s")
+        return
+    conn = connect(args.db)
+    ensure_schema(conn)
+    started = time.perf_counter()
+    try:
+        results = search_cases(conn, args.text, args.limit)
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f"search failed: {e}")
+    for r in results:
+        print(f"{r['case_type']}/{r['case_number']}/{r['filing_year']} {r['cnr']}  {r['petitioner']} vs {r['respondent']}  [{r['case_status']}]")
+    print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# http_backend.py
+# Direct HTTP backend: browser sirf ek baar session cookies aur CAPTCHA ke liye chalta hai.
+# Us ke baad case-status aur case-detail requests seedhe ek pooled keep-alive HTTP client se jaati hain
+# aur jawab ka HTML `parse_case_html` ko diya jaata hai.
+
+import json
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from case_parser import parse_case_html
+from waits import page_has_error
+
+DEFAULT_POOL_SIZE = 16
+REQUEST_TIMEOUT = 30
+VIEW_MARKERS = ("viewCnrDetails", "viewHistory")
+# Hamare search field -> portal form keys jin mein wo jaata hai (Gaya dcourts aur eCourts dono ke naam)
+SEARCH_FIELDS = {
+    "establishment": ("est_code", "court_code"),
+    "case_type": ("case_type",),
+    "case_number": ("reg_no", "case_no", "search_case_no"),
+    "year": ("reg_year", "year", "rgyear"),
+    "captcha": ("captcha", "fcaptcha_code", "case_captcha_code"),
+}
+# Naam se na jude fields sirf tab value se judte hain jab value itni lambi ho ki ittefaq se match na kare (jaise CNR);
+# "1", "Y" jaise values page number ya flags se bhi match ho jaati hain
+MIN_VALUE_MATCH = 4
+
+
+class SessionExpired(Exception):
+    """Portal ne session/CAPTCHA reject kar diya; browser se dobara capture karna padega."""
+
+
+class RecordedRequest:
+    """Browser ka ek form POST, jise naye values ke saath replay kiya ja sakta hai."""
+
+    def __init__(self, url, headers, form):
+        self.url = url
+        self.headers = {k: v for k, v in headers.items() if k.lower() not in ("cookie", "content-length", "host")}
+        self.form = form  # list of (key, value), order preserved
+        self.bindings = {}  # our field name -> form position
+
+    @classmethod
+    def from_playwright(cls, request):
+        return cls(request.url, dict(request.headers), parse_qsl(request.post_data or "", keep_blank_values=True))
+
+    def bind(self, values, fields=None):
+        """Hamare fields ko form positions se jodta hai (e.g. case_number -> reg_no). Pehle naam se: `fields`
+        (field -> form keys) ya same naam ki key (`data-cino` -> cino); kai candidate keys hon toh jis mein recorded
+        value wahi hai. Baaki fields value se, par sirf jab wo value form mein ek hi jagah ho aur MIN_VALUE_MATCH se
+        lambi ho (case number = page number jaise ittefaq se galat key na jude). Na jude field ke liye build()
+        recorded value hi bhejta hai."""
+        fields = fields or {}
+        taken = set(self.bindings.values())
+        by_value = {}
+        for name, value in values.items():
+            if value in ("", None):
+                continue
+            value = str(value)
+            keys = (*fields.get(name, ()), name, name.removeprefix("data-"))
+            positions = [i for k in keys for i, (key, _) in enumerate(self.form) if key == k and i not in taken]
+            if positions:
+                pos = next((i for i in positions if self.form[i][1] == value), positions[0])
+                self.bindings[name] = pos
+                taken.add(pos)
+            elif len(value) >= MIN_VALUE_MATCH:
+                by_value[name] = value
+        occurrences = Counter(value for _, value in self.form)
+        for name, value in by_value.items():
+            if occurrences[value] == 1:
+                pos = next(i for i, (_, v) in enumerate(self.form) if v == value)
+                # Ek hi value ke do naam (data-cno aur onclick arg) ek hi position par ja sakte hain
+                if pos not in taken or all(values[n] == value for n, p in self.bindings.items() if p == pos):
+                    self.bindings[name] = pos
+        return self
+
+    def build(self, values):
+        by_pos = {self.bindings[name]: str(value) for name, value in values.items() if name in self.bindings}
+        return [(key, by_pos.get(i, value)) for i, (key, value) in enumerate(self.form)]
+
+
+class Recorder:
+    """`page.on("request", recorder.on_request)` se form POSTs collect karta hai (sync aur async dono APIs)."""
+
+    def __init__(self):
+        self.posts = []
+
+    def on_request(self, request):
+        if request.method == "POST" and request.post_data and "=" in request.post_data:
+            self.posts.append(RecordedRequest.from_playwright(request))
+
+    def find(self, values, after=None, fields=None):
+        """`after` ke baad ka woh POST jo `values` se sabse zyada milta hai (barabari par pehla). CAPTCHA value wala
+        POST sabse aage: dropdown bharne wale AJAX POSTs bhi est_code/state_code jaisi values bhejte hain aur search se
+        pehle record hote hain. Phir `fields` (field -> form keys) ya same naam ki key par mili values, phir kahin bhi
+        mili values."""
+        fields = fields or {}
+        wanted = {name: str(v) for name, v in values.items() if v not in ("", None)}
+        start = self.posts.index(after) + 1 if after in self.posts else 0
+        best, best_score = None, None
+        for req in self.posts[start:]:
+            pairs = set(req.form)
+            form_values = {value for _, value in req.form}
+            matched = sum(1 for v in wanted.values() if v in form_values)
+            if not matched:
+                continue
+            keyed = sum(1 for name, v in wanted.items() if any((k, v) in pairs for k in (*fields.get(name, ()), name)))
+            score = ("captcha" in wanted and wanted["captcha"] in form_values, keyed, matched)
+            if best_score is None or score > best_score:
+                best, best_score = req, score
+        return best
+
+
+class _ViewRowFinder(HTMLParser):
+    """Result list mein 'View' elements ke data-* attributes aur onclick args nikalta hai."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        marker = attrs.get("class", "") + " " + attrs.get("onclick", "")
+        if any(m in marker for m in VIEW_MARKERS):
+            self.rows.append(row_params(attrs))
+
+
+def row_params(attrs):
+    params = {k: v for k, v in attrs.items() if k.startswith("data-")}
+    m = re.search(r"\((.*)\)", attrs.get("onclick", "") or "")
+    if m:
+        for i, arg in enumerate(re.findall(r"'([^']*)'|\"([^\"]*)\"|([^,\s]+)", m.group(1))):
+            params[f"arg{i}"] = next(a for a in arg if a != "") if any(arg) else ""
+    return params
+
+
+def find_view_rows(html):
+    finder = _ViewRowFinder()
+    finder.feed(html)
+    return finder.rows
+
+
+def extract_html(text, content_type=""):
+    """Portal kabhi HTML aur kabhi JSON ke andar HTML bhejta hai; dono se HTML string banata hai."""
+    if "json" in content_type:
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return text
+        if isinstance(data, dict):
+            return "\n".join(v for v in data.values() if isinstance(v, str) and "<" in v)
+    return text
+
+
+def response_html(resp):
+    return extract_html(resp.text, resp.headers.get("Content-Type", ""))
+
+
+class PortalSession:
+    """Ek captured browser session par chalne wala pooled HTTP client. Threads ke beech share kiya ja sakta hai."""
+
+    def __init__(self, cookies, search, detail=None, pool_size=DEFAULT_POOL_SIZE, parse=parse_case_html):
+        self.search_request = search
+        self.detail_request = detail
+        self.parse = parse
+        self.pool_size = pool_size
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=1)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        for c in cookies:
+            self.http.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+
+    @classmethod
+    def from_recorder(cls, recorder, cookies, search_values, row=None, **kwargs):
+        """`search_values` wahi values hain jo browser form mein bhari gayi thi (captcha samet)."""
+        search = recorder.find(search_values, fields=SEARCH_FIELDS)
+        if search is None:
+            raise ValueError("search POST not found in recorded requests")
+        search.bind(search_values, SEARCH_FIELDS)
+        detail = recorder.find(row, after=search) if row else None
+        if detail is not None:
+            detail.bind(row)
+        return cls(cookies, search, detail, **kwargs)
+
+    def _post(self, recorded, values):
+        resp = self.http.post(recorded.url, data=recorded.build(values), headers=recorded.headers, timeout=REQUEST_TIMEOUT)
+        if resp.status_code in (401, 403, 419):
+            raise SessionExpired(f"HTTP {resp.status_code}")
+        resp.raise_for_status()
+        return response_html(resp)
+
+    def search(self, **values):
+        html = self._post(self.search_request, values)
+        if re.search(r"Invalid Captcha|session (has )?expired", html, flags=re.I):
+            raise SessionExpired("portal rejected the session/CAPTCHA")
+        return html
+
+    def detail(self, row):
+        if self.detail_request is None:
+            raise ValueError("no case-detail request was captured")
+        return self._post(self.detail_request, row)
+
+    def lookup(self, **values):
+        """Search + (agar capture hua ho toh) pehli row ki detail; parsed dict return karta hai."""
+        html = self.search(**values)
+        if page_has_error(html):
+            return {**self.parse(""), "success": False, "html": html}
+        rows = find_view_rows(html)
+        if self.detail_request is not None and rows:
+            html = self.detail(rows[0])
+        return self.parse(html)
+
+    def lookup_many(self, items, max_workers=None):
+        """Bahut saare lookups parallel; (values, result ya exception) jaise-jaise poore hon yield karta hai."""
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as pool:
+            futures = {pool.submit(self.lookup, **values): values for values in items}
+            for fut in as_completed(futures):
+                try:
+                    yield futures[fut], fut.result()
+                except Exception as e:
+                    yield futures[fut], e
+
+    def close(self):
+        self.http.close()
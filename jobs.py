@@ -0,0 +1,115 @@
+# jobs.py
+# Streamlit app ke case lookups ke liye background job queue. Script run sirf job submit karta hai aur turant job id
+# paata hai; worker threads kaam (browser submit + parse, logging) chalate hain aur UI har rerun par status/progress
+# padh leta hai. Ek session kai lookups ek saath queue kar sakta hai; har job ka apna browser context hota hai
+# (BrowserManager.handoff), isliye do submissions ek hi page par nahi takraate.
+
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+
+WORKERS = 4
+KEEP_FINISHED = 200  # itne poore hue jobs memory mein; us se purane hat jaate hain
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    session_id: str
+    label: str
+    status: str = QUEUED
+    stage: str = "waiting for a worker"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    result: object = None
+    error: str = ""
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self):
+        """Submit se ab tak (ya poora hone tak) ke seconds."""
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class JobQueue:
+    """Worker threads `fn(progress, *args)` chalate hain; `progress(text)` job ka stage badalta hai, return value
+    `result` banti hai aur exception `error`. `get`/`for_session` copies dete hain, isliye UI thread safe padh sakta hai."""
+
+    def __init__(self, workers=WORKERS, keep=KEEP_FINISHED):
+        self.keep = keep
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._threads = [threading.Thread(target=self._run, name=f"fetch-job-{i}", daemon=True) for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, session_id, label, fn, *args):
+        """Job queue karke turant us ki id return karta hai."""
+        with self._lock:
+            job = Job(id=f"job-{next(self._ids)}", session_id=session_id, label=label)
+            self._jobs[job.id] = job
+            self._calls[job.id] = (fn, args)
+            self._trim()
+        self._queue.put(job.id)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job is not None else None
+
+    def for_session(self, session_id):
+        """Session ke jobs, naye pehle."""
+        with self._lock:
+            return [replace(j) for j in reversed(self._jobs.values()) if j.session_id == session_id]
+
+    def pending(self, session_id=None):
+        with self._lock:
+            return sum(1 for j in self._jobs.values()
+                       if not j.finished and (session_id is None or j.session_id == session_id))
+
+    def forget(self, job_id):
+        """Poora hua job list se hata deta hai (chal rahe job ko nahi)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+
+    def _trim(self):
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def _update(self, job_id, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                for k, v in changes.items():
+                    setattr(job, k, v)
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                fn, args = self._calls.pop(job_id, (None, ()))
+            if fn is None:
+                continue
+            self._update(job_id, status=RUNNING, stage="starting", started_at=time.time())
+            try:
+                result = fn(lambda text: self._update(job_id, stage=text), *args)
+            except Exception as e:
+                self._update(job_id, status=FAILED, stage="failed", error=f"{type(e).__name__}: {e}", finished_at=time.time())
+            else:
+                self._update(job_id, status=DONE, stage="done", result=result, finished_at=time.time())
@@ -0,0 +1,120 @@
+# metrics.py
+# Har stage (page load, dropdowns, CAPTCHA, submit, parse, PDF, DB write) ke liye halke timing spans.
+# Span process ki `recent` history mein jaata hai (scraper ka run summary) aur sample hua ho toh background writer
+# se `metrics` table mein (Streamlit ka performance panel wahan se p50/p95/p99 aur failure rate dikhata hai).
+#
+#   with span("submit") as s:
+#       ok = await fill_form_and_submit(...)
+#       if not ok:
+#           s.fail("rejected")
+
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from storage import DB_PATH, get_writer
+
+SAMPLE_RATE = float(os.environ.get("COURT_METRICS_SAMPLE", "1.0"))  # 0..1, DB mein jaane wale spans ka hissa
+RECENT_SIZE = 10000
+PERCENTILES = (50, 95, 99)
+
+recent = deque(maxlen=RECENT_SIZE)  # (stage, ms, ok), newest last
+_source = "app"
+_lock = threading.Lock()
+
+
+def set_source(name):
+    """Metrics rows ka source ("app", "scraper", ...)."""
+    global _source
+    _source = name
+
+
+class span:
+    """Context manager: andar ka kaam time karta hai. Exception ya `fail()` par span failed maana jaata hai."""
+
+    __slots__ = ("stage", "started", "ok", "error", "sample_rate")
+
+    def __init__(self, stage, sample_rate=None):
+        self.stage = stage
+        self.sample_rate = SAMPLE_RATE if sample_rate is None else sample_rate
+        self.ok = True
+        self.error = ""
+
+    def fail(self, error=""):
+        self.ok = False
+        self.error = error
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.started) * 1000
+        if exc_type is not None:
+            self.fail(exc_type.__name__)
+        record(self.stage, ms, self.ok, self.error, self.sample_rate)
+        return False
+
+
+def record(stage, ms, ok=True, error="", sample_rate=SAMPLE_RATE):
+    with _lock:
+        recent.append((stage, ms, ok))
+    if sample_rate >= 1 or random.random() < sample_rate:
+        # Queue bhari ho toh metric chhod do; lookup ko kabhi na roke
+        get_writer(DB_PATH).submit("metrics", {
+            "ts": time.time(), "source": _source, "stage": stage, "ms": round(ms, 2), "ok": 1 if ok else 0, "error": error or None,
+        }, timeout=0)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile; list pehle se sorted honi chahiye."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(spans):
+    """(stage, ms, ok) spans se per-stage {count, failed, fail_rate, p50, p95, p99}, pehli baar dikhe stage ke order mein."""
+    by_stage = {}
+    for stage, ms, ok in spans:
+        entry = by_stage.setdefault(stage, {"times": [], "failed": 0})
+        entry["times"].append(ms)
+        entry["failed"] += 0 if ok else 1
+    stats = {}
+    for stage, entry in by_stage.items():
+        times = sorted(entry["times"])
+        stats[stage] = {"count": len(times), "failed": entry["failed"], "fail_rate": entry["failed"] / len(times),
+                        **{f"p{p}": percentile(times, p) for p in PERCENTILES}}
+    return stats
+
+
+def format_summary(stats):
+    """Scraper ke run summary ke liye text table."""
+    if not stats:
+        return ""
+    lines = [f"   {'stage':<14}{'n':>6}{'fail':>7}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)]
+    for stage, s in stats.items():
+        lines.append(f"   {stage:<14}{s['count']:>6}{s['fail_rate']:>6.0%} " + "".join(f"{s[f'p{p}']:>10.0f}" for p in PERCENTILES))
+    return "\n".join(lines)
+
+
+def stage_stats(conn, since, source=None):
+    """`metrics` table se `since` (epoch) ke baad ke spans ka summarize()."""
+    sql = "SELECT stage, ms, ok FROM metrics WHERE ts >= ?"
+    args = [since]
+    if source:
+        sql += " AND source = ?"
+        args.append(source)
+    return summarize(conn.execute(sql + " ORDER BY ts", args))
+
+
+def failure_rates(conn, since, bucket_seconds=3600, source=None):
+    """[(bucket start epoch, stage, total, failed)] time buckets mein."""
+    sql = ("SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, stage, count(*), sum(1 - ok) FROM metrics WHERE ts >= ?"
+           + (" AND source = ?" if source else "") + " GROUP BY bucket, stage ORDER BY bucket")
+    args = [bucket_seconds, bucket_seconds, since] + ([source] if source else [])
+    return conn.execute(sql, args).fetchall()
@@ -0,0 +1,270 @@
+# migrations.py
+# queries.db ka versioned schema. `PRAGMA user_version` batata hai kaunse migrations lag chuke hain; ensure_schema()
+# har connection par baaki wale chalata hai (sirf schema, turant). Normalized tables: courts, cases (ek row per case:
+# integer number + year, ya sirf CNR), snapshots (har lookup, app ya scraper, epoch time ke saath) aur parties. Naye
+# lookups LogWriter seedha in tables mein likhta hai; purane `queries` / `case_logs` rows alag se chunks mein copy hote
+# hain: app/scraper ka writer ek background thread chala deta hai, ya `py migrations.py data` (har chunk ek
+# transaction; beech mein ruke toh agli baar wahin se aage).
+#
+#   py migrations.py status [--db queries.db]
+#   py migrations.py data                     # copy abhi, foreground mein
+
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from blobstore import BLOB_DIR, BlobStore
+from storage import (ADVOCATE, DB_PATH, FTS_DDL, PETITIONER, RESPONDENT, SOURCE_APP, SOURCE_SCRAPER, add_missing_columns,
+                     connect, ensure_schema, has_fts, replace_parties, resolve_case, write_rows)
+
+DATA_CHUNK = 2000
+DATA_PAUSE = 0.05  # seconds; background copy ke chunks ke beech, taaki writer ko write lock milta rahe
+
+# Purane log tables: snapshots.source aur columns us order mein jo _copy_logs padhta hai
+LEGACY_LOGS = {
+    "queries": (SOURCE_APP, "SELECT id, ts, court, case_type, case_number, filing_year, result_ok, html, html_hash, "
+                            "NULL, NULL, latest_pdf FROM queries"),
+    # purane case_logs mein sirf safal lookups likhe jaate the (result_ok column baad mein aaya)
+    "case_logs": (SOURCE_SCRAPER, "SELECT id, timestamp, 'Gaya District Court', case_type, case_number, case_year, "
+                                  "coalesce(result_ok, 1), raw_html, html_hash, pdf_hash, saved_pdf_path, NULL FROM case_logs"),
+}
+
+_data_lock = threading.Lock()
+_copying = set()  # jin DB paths ki background copy is process mein chal rahi hai
+_copying_lock = threading.Lock()
+
+
+def _v1_normalized_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS courts (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )""")
+    # Number aur year dono ho toh unse pehchaan; warna sirf CNR (jaise harvest ke bina registration number wale rows)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cases (
+            id INTEGER PRIMARY KEY,
+            court_id INTEGER NOT NULL REFERENCES courts (id),
+            case_type TEXT NOT NULL,
+            case_number INTEGER CHECK (typeof(case_number) IN ('integer', 'null')),
+            filing_year INTEGER CHECK (typeof(filing_year) IN ('integer', 'null')),
+            cnr TEXT,
+            CHECK (case_number IS NOT NULL OR cnr IS NOT NULL),
+            UNIQUE (court_id, case_type, case_number, filing_year)
+        )""")
+    # case_id NULL: lookup kisi ek case ka nahi tha (case type ki list); legacy_id: queries/case_logs se copy hua row
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY,
+            case_id INTEGER REFERENCES cases (id),
+            ts INTEGER NOT NULL,
+            source INTEGER NOT NULL,
+            ok INTEGER NOT NULL,
+            html_hash TEXT,
+            pdf_hash TEXT,
+            pdf_path TEXT,
+            latest_pdf TEXT,
+            legacy_id INTEGER,
+            UNIQUE (source, legacy_id)
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS parties (
+            case_id INTEGER NOT NULL REFERENCES cases (id),
+            role INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (case_id, role, position)
+        ) WITHOUT ROWID""")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_cases_cnr ON cases (cnr) WHERE cnr IS NOT NULL")
+    # Cache ka "case ka sabse naya safal snapshot": sirf index se, table tak jaaye bina
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_case ON snapshots (case_id, ok, ts, html_hash, latest_pdf)")
+    # Din/ghante ke hisaab se counts aur failure rate: sirf index se
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON snapshots (ts, source, ok)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_parties_name ON parties (name COLLATE NOCASE, role, case_id)")
+    add_missing_columns(conn, "case_records", {"case_id": "INTEGER REFERENCES cases (id)"})
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_case_records_case ON case_records (case_id)")
+    # Purana update trigger har UPDATE par FTS row dobara likhta tha, case_id bharne par bhi
+    if has_fts(conn):
+        conn.execute("DROP TRIGGER IF EXISTS case_records_au")
+        conn.execute(FTS_DDL[-1])
+    # Purane tables ab na likhe jaate hain na padhe; un ke lookup indexes sirf jagah lete the
+    for index in ("idx_queries_filters", "idx_queries_case_key", "idx_queries_ts", "idx_case_logs_case", "idx_case_logs_ts"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL,
+            upto INTEGER NOT NULL
+        )""")
+    # Is waqt tak ke rows copy karne hain; us ke baad wale writer khud naye tables mein likhta hai
+    for table in (*LEGACY_LOGS, "case_records"):
+        conn.execute(f"INSERT OR IGNORE INTO migration_progress (name, last_id, upto) SELECT ?, 0, coalesce(max(id), 0) FROM {table}",
+                     (table,))
+
+
+# (version, description, fn). Naya migration hamesha list ke aakhir mein, agla version number ke saath.
+MIGRATIONS = [
+    (1, "normalized courts/cases/snapshots/parties tables", _v1_normalized_tables),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Baaki schema migrations version ke order mein, har ek apne transaction mein. Sirf schema: purane rows ki copy
+    migrate_data() / copy_in_background() karte hain. Lage hue versions ki list return karta hai."""
+    applied = []
+    for version, description, fn in MIGRATIONS:
+        if version <= schema_version(conn):
+            continue
+        with conn:
+            fn(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        applied.append((version, description))
+    return applied
+
+
+def pending(conn):
+    """{table: copy hone baaki rows ka andaaza} (id range se)."""
+    return {name: max(0, upto - last_id) for name, last_id, upto in conn.execute("SELECT name, last_id, upto FROM migration_progress")}
+
+
+def _epoch(text):
+    """Legacy local ISO timestamp -> epoch seconds; samajh na aaye toh 0 (taaki cache use fresh na maane)."""
+    try:
+        return int(datetime.fromisoformat(str(text).strip()).timestamp())
+    except ValueError:
+        return 0
+
+
+def _copy_logs(conn, name, lo, hi, blobs, cache):
+    source, sql = LEGACY_LOGS[name]
+    rows = []
+    for row in conn.execute(sql + " WHERE id > ? AND id <= ? ORDER BY id", (lo, hi)).fetchall():
+        row_id, ts, court, case_type, number, year, ok, html, html_hash, pdf_hash, pdf_path, latest_pdf = row
+        if html and not html_hash:
+            html_hash = blobs.put_text(html)
+        rows.append(("snapshots", {
+            "court": court, "case_type": case_type, "case_number": number, "filing_year": year, "ts": _epoch(ts),
+            "source": source, "ok": 1 if ok else 0, "html_hash": html_hash, "pdf_hash": pdf_hash,
+            "pdf_path": pdf_path or None, "latest_pdf": latest_pdf or None, "legacy_id": row_id,
+        }))
+    write_rows(conn, rows, cache)
+    return len(rows)
+
+
+def _legacy_parties(petitioner, respondent, advocates):
+    """Parties table se pehle index hue records: advocates ka side pata nahi, isliye ADVOCATE."""
+    names = [(PETITIONER, petitioner), (RESPONDENT, respondent)]
+    return names + [(ADVOCATE, a.strip()) for a in (advocates or "").split(";")]
+
+
+def _copy_records(conn, lo, hi, cache):
+    rows = conn.execute(
+        "SELECT id, court, case_type, case_number, filing_year, cnr, petitioner, respondent, advocates FROM case_records "
+        "WHERE id > ? AND id <= ? AND case_id IS NULL", (lo, hi),
+    ).fetchall()
+    for row_id, court, case_type, number, year, cnr, petitioner, respondent, advocates in rows:
+        case_id = resolve_case(conn, court, case_type, number, year, cnr, cache=cache)
+        if case_id is not None:
+            conn.execute("UPDATE case_records SET case_id = ? WHERE id = ?", (case_id, row_id))
+            replace_parties(conn, case_id, _legacy_parties(petitioner, respondent, advocates))
+    return len(rows)
+
+
+def _copy_chunk(conn, name, chunk, blobs, cache):
+    """Ek chunk ek IMMEDIATE transaction mein, progress samet: doosra process saath chale toh bhi koi row do baar nahi.
+    (copied rows, aur baaki hai?) return karta hai."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        last_id, upto = conn.execute("SELECT last_id, upto FROM migration_progress WHERE name = ?", (name,)).fetchone()
+        hi = min(last_id + chunk, upto)
+        copied = _copy_records(conn, last_id, hi, cache) if name == "case_records" else _copy_logs(conn, name, last_id, hi, blobs, cache)
+        conn.execute("UPDATE migration_progress SET last_id = ? WHERE name = ?", (hi, name))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return copied, hi < upto
+
+
+def migrate_data(conn, chunk=DATA_CHUNK, blobs=None, progress=None, pause=0):
+    """Migration se pehle ke rows normalized tables mein, `chunk` ids ek transaction mein (har chunk ke baad
+    `progress(table, copied)`, aur `pause` seconds ka aaram). Inline HTML blob store mein chala jaata hai. Beech mein
+    rukne ke baad dobara chalana safe hai. Copied rows ki ginti deta hai."""
+    blobs = blobs or BlobStore(BLOB_DIR)
+    cache = {}
+    copied = 0
+    with _data_lock:
+        for name in (*LEGACY_LOGS, "case_records"):  # records ke cases logs se pehle ban chuke hon
+            more = bool(pending(conn).get(name))
+            while more:
+                n, more = _copy_chunk(conn, name, chunk, blobs, cache)
+                copied += n
+                if progress:
+                    progress(name, copied)
+                if pause:
+                    time.sleep(pause)
+    return copied
+
+
+def copy_in_background(db_path, blobs=None):
+    """Baaki legacy rows ki copy ek daemon thread mein, chunks ke beech ruk-ruk kar: app/scraper ka pehla lookup copy
+    poori hone ka intezaar nahi karta (tab tak purane lookups cache/search/log mein nahi dikhte). Process mein ek DB ki
+    ek hi copy; thread return karta hai, ya None agar kuch baaki nahi ya copy pehle se chal rahi hai."""
+    conn = connect(db_path)
+    try:
+        if not any(pending(conn).values()):
+            return None
+    finally:
+        conn.close()
+    with _copying_lock:
+        if db_path in _copying:
+            return None
+        _copying.add(db_path)
+
+    def run():
+        conn = connect(db_path)
+        try:
+            migrate_data(conn, blobs=blobs, pause=DATA_PAUSE)
+        except Exception as e:
+            print(f"[migrations] background copy stopped ({type(e).__name__}: {e}); it continues on the next start, "
+                  "or run `py migrations.py data`")
+        finally:
+            conn.close()
+            with _copying_lock:
+                _copying.discard(db_path)
+
+    thread = threading.Thread(target=run, name="legacy-copy", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema migrations for queries.db")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("status", help="schema version and rows still to copy")
+    sub.add_parser("data", help="apply migrations and copy rows logged before the normalized tables existed")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.cmd == "status":
+        print(f"schema version {schema_version(conn)} (latest {MIGRATIONS[-1][0]})")
+        if schema_version(conn):
+            for name, rows in pending(conn).items():
+                print(f"   {name:<13} {rows} rows to copy")
+            for table in ("courts", "cases", "snapshots", "parties"):
+                print(f"   {table:<13} {conn.execute(f'SELECT count(*) FROM {table}').fetchone()[0]} rows")
+        return
+    started = time.monotonic()
+    ensure_schema(conn)
+    copied = migrate_data(conn, progress=lambda name, n: print(f"   {name}: {n} rows", end="\r", flush=True))
+    print(f"\nschema version {schema_version(conn)}, {copied} rows copied, nothing left ({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
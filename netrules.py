@@ -0,0 +1,217 @@
+# netrules.py
+# Request interception for app.py and scraper.py pages.
+# Jo resources form ke liye zaroori nahi (images, fonts, analytics, banners) unhe abort karta hai, aur portal ke
+# static JS/CSS ko local disk cache se serve karta hai. Cache server ke Cache-Control (max-age, no-cache, no-store) /
+# Expires ko maanta hai; freshness khatam hone par ETag / Last-Modified se revalidate karta hai. Disk I/O executor mein.
+# Har page ke RouteStats mein requests aur bytes ki bachat gini jaati hai.
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field, asdict
+from email.utils import parsedate_to_datetime
+
+STATIC_CACHE_DIR = "static_cache"
+
+# CAPTCHA image kabhi block nahi honi chahiye
+ALLOW_PATTERNS = (r"captcha", r"securimage", r"siwp_")
+BLOCK_RESOURCE_TYPES = ("image", "font", "media")
+BLOCK_URL_PATTERNS = (
+    r"google-analytics\.com", r"googletagmanager\.com", r"doubleclick\.net", r"facebook\.(net|com)",
+    r"twitter\.com", r"youtube\.com", r"/banner", r"/slider", r"hotjar", r"\.(mp4|webm|woff2?|ttf|otf)(\?|$)",
+)
+CACHE_RESOURCE_TYPES = ("script", "stylesheet")
+REVALIDATE_AFTER = 24 * 3600  # seconds; server ne max-age / Expires na bataya ho toh is ke baad revalidate
+
+
+@dataclass
+class RouteRules:
+    block_types: tuple = BLOCK_RESOURCE_TYPES
+    block_patterns: tuple = BLOCK_URL_PATTERNS
+    allow_patterns: tuple = ALLOW_PATTERNS
+    cache_types: tuple = CACHE_RESOURCE_TYPES
+    cache_dir: str = STATIC_CACHE_DIR
+    revalidate_after: int = REVALIDATE_AFTER
+    enabled: bool = os.environ.get("COURT_ROUTING", "on") != "off"
+
+    def __post_init__(self):
+        self._block = re.compile("|".join(self.block_patterns), re.I) if self.block_patterns else None
+        self._allow = re.compile("|".join(self.allow_patterns), re.I) if self.allow_patterns else None
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    blocked: int = 0
+    cache_hits: int = 0
+    revalidated: int = 0
+    cache_misses: int = 0
+    bytes_from_cache: int = 0
+    bytes_fetched: int = 0
+    blocked_by_type: dict = field(default_factory=dict)
+
+    @property
+    def requests_saved(self):
+        # Blocked requests kabhi network par gaye hi nahi; fresh cache hits bhi
+        return self.blocked + self.cache_hits
+
+    def as_dict(self):
+        return {**asdict(self), "requests_saved": self.requests_saved}
+
+
+class StaticCache:
+    """URL -> (body, headers) on disk. Body aur meta alag files mein; writes atomic."""
+
+    def __init__(self, root=STATIC_CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, key + ".body"), os.path.join(self.root, key + ".json")
+
+    def get(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, body, headers, fresh_for):
+        body_path, meta_path = self._paths(url)
+        now = time.time()
+        meta = {
+            "url": url, "stored_at": now, "fresh_for": fresh_for, "expires_at": now + fresh_for,
+            "content_type": headers.get("content-type", ""),
+            "etag": headers.get("etag", ""), "last_modified": headers.get("last-modified", ""),
+        }
+        for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta), "w")):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def touch(self, url, fresh_for):
+        """304 ke baad: wahi body, nayi freshness (304 mein Cache-Control na ho toh pichhli wali)."""
+        _, meta_path = self._paths(url)
+        meta, _ = self.get(url)
+        if meta is not None:
+            meta["stored_at"] = time.time()
+            meta["fresh_for"] = fresh_for
+            meta["expires_at"] = meta["stored_at"] + fresh_for
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+
+def _cache_control(headers):
+    """Cache-Control directives: {naam: value ya None}."""
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('" ') or None
+    return directives
+
+
+def _cacheable(headers):
+    """no-store / private na ho, aur validator (ETag ya Last-Modified) ho: bina validator ke cached copy
+    ko kabhi revalidate nahi kiya ja sakta."""
+    directives = _cache_control(headers)
+    if "no-store" in directives or "private" in directives:
+        return False
+    return bool(headers.get("etag") or headers.get("last-modified"))
+
+
+def freshness(headers, default):
+    """Response kitne seconds fresh hai: no-cache -> 0 (har baar revalidate), phir max-age, phir Expires - Date,
+    aur kuch na ho toh `default`."""
+    directives = _cache_control(headers)
+    if "no-cache" in directives:
+        return 0
+    if directives.get("max-age") is not None:
+        try:
+            return max(0, int(directives["max-age"]))
+        except ValueError:
+            return 0
+    if headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            date = parsedate_to_datetime(headers["date"]).timestamp() if headers.get("date") else time.time()
+        except (TypeError, ValueError, IndexError):
+            return 0  # galat Expires (jaise "0") matlab pehle se expired
+        return max(0, expires - date)
+    return default
+
+
+async def install_routes(target, rules=None, stats=None):
+    """`target` (Page ya BrowserContext) par interception lagata hai; us target ke RouteStats return karta hai."""
+    rules = rules or RouteRules()
+    stats = stats if stats is not None else RouteStats()
+    if not rules.enabled:
+        return stats
+    cache = StaticCache(rules.cache_dir)
+
+    async def on_disk(fn, *args):
+        # Cache files ki padhai/likhai event loop ko na roke
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def fulfill_from_cache(route, meta, body):
+        stats.bytes_from_cache += len(body)
+        await route.fulfill(status=200, body=body, headers={"content-type": meta.get("content_type") or "application/octet-stream"})
+
+    async def handler(route):
+        request = route.request
+        url, rtype = request.url, request.resource_type
+        stats.requests += 1
+        if rules._allow is not None and rules._allow.search(url):
+            await route.continue_()
+            return
+        if rtype in rules.block_types or (rules._block is not None and rules._block.search(url)):
+            stats.blocked += 1
+            stats.blocked_by_type[rtype] = stats.blocked_by_type.get(rtype, 0) + 1
+            await route.abort("blockedbyclient")
+            return
+        if rtype not in rules.cache_types or request.method != "GET":
+            await route.continue_()
+            return
+
+        meta, body = await on_disk(cache.get, url)
+        # Purani meta files mein expires_at nahi hota
+        if meta is not None and time.time() < meta.get("expires_at", meta["stored_at"] + rules.revalidate_after):
+            stats.cache_hits += 1
+            await fulfill_from_cache(route, meta, body)
+            return
+        try:
+            headers = dict(request.headers)
+            if meta is not None:
+                if meta.get("etag"):
+                    headers["if-none-match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["if-modified-since"] = meta["last_modified"]
+            response = await route.fetch(headers=headers)
+            if response.status == 304 and meta is not None:
+                stats.revalidated += 1
+                await on_disk(cache.touch, url, freshness(response.headers, meta.get("fresh_for", rules.revalidate_after)))
+                await fulfill_from_cache(route, meta, body)
+                return
+            fresh = await response.body()
+            stats.cache_misses += 1
+            stats.bytes_fetched += len(fresh)
+            if response.status == 200 and _cacheable(response.headers):
+                await on_disk(cache.put, url, fresh, response.headers, freshness(response.headers, rules.revalidate_after))
+            await route.fulfill(response=response, body=fresh)
+        except Exception:
+            # Cache layer ki wajah se page kabhi na toote
+            if meta is not None:
+                await fulfill_from_cache(route, meta, body)
+            else:
+                await route.continue_()
+
+    await target.route("**/*", handler)
+    return stats
@@ -0,0 +1,324 @@
+# pdf_pipeline.py
+# Scraping flow ke bahar PDF ka kaam. RenderQueue snapshot HTML ko apne worker pages mein PDF banata hai (scraper ke
+# event loop mein, bounded queue). Downloader order/judgment PDFs worker threads mein chunks mein disk par stream karta
+# hai: adhoori `.part` file Range request se wahin se aage badhti hai, poori file SHA-256 se blob store mein jaati hai
+# (same content ek hi baar), aur `documents` table mein URL -> hash likha jaata hai taaki dobara download na ho.
+#
+#   py pdf_pipeline.py download <url> [--key CS/12/2024]
+#   py pdf_pipeline.py list [--limit 20]
+
+import argparse
+import asyncio
+import atexit
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from html import escape
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from blobstore import BLOB_DIR, CHUNK_SIZE, BlobStore
+from metrics import span
+from netrules import install_routes
+from storage import DB_PATH, PUT_TIMEOUT, connect, ensure_schema, get_writer
+
+PDF_DIR = "case_pdfs"
+PART_DIR = os.path.join(PDF_DIR, "partial")
+RENDER_WORKERS = 2
+RENDER_QUEUE_SIZE = 32    # itne snapshots (HTML) tak memory mein; us ke baad submit() rukta hai
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_QUEUE_SIZE = 500
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 2.0    # seconds, har attempt ke saath badhta hai
+REQUEST_TIMEOUT = 60
+PDF_MAGIC = b"%PDF-"
+
+_HEAD = re.compile(r"<head[^>]*>", re.I)
+
+
+class IncompleteDownload(requests.RequestException):
+    """Server ne Content-Length se kam bytes bheje; agla attempt `.part` file se resume karega."""
+
+
+def with_base(html, base_url):
+    """Snapshot HTML mein `<base href>` daalta hai taaki set_content ke baad relative CSS/images portal se aayein."""
+    if not base_url or re.search(r"<base\s", html, re.I):
+        return html
+    tag = f'<base href="{escape(base_url, quote=True)}">'
+    head = _HEAD.search(html)
+    return html[:head.end()] + tag + html[head.end():] if head else tag + html
+
+
+def order_urls(parsed):
+    """Parsed case ke saare order/judgment PDF links (latest pehle), bina duplicates ke."""
+    urls = [parsed.get("latest_pdf", "")]
+    urls += [o.get("url", "") for o in reversed(parsed.get("orders", []))]
+    urls += parsed.get("pdf_links", [])
+    return list(dict.fromkeys(u for u in urls if u))
+
+
+def cookie_dict(cookies):
+    """Playwright `context.cookies()` list se requests ke liye {name: value}."""
+    return {c["name"]: c["value"] for c in cookies}
+
+
+def stream_to_file(session, url, path, cookies=None, headers=None, chunk_size=CHUNK_SIZE, timeout=REQUEST_TIMEOUT):
+    """`url` ko chunks mein `path` par likhta hai aur file ka size return karta hai. `path` pehle se adhoori ho toh
+    Range request; server 206 de toh aage jodta hai, 200 de toh shuru se."""
+    have = os.path.getsize(path) if os.path.exists(path) else 0
+    headers = dict(headers or {})
+    if have:
+        headers["Range"] = f"bytes={have}-"
+    with session.get(url, headers=headers, cookies=cookies, stream=True, timeout=timeout) as r:
+        if r.status_code == 416 and have:
+            return have  # pichhli baar poori aa chuki thi
+        r.raise_for_status()
+        resumed = have and r.status_code == 206
+        expected = int(r.headers.get("Content-Length") or 0)
+        written = 0
+        with open(path, "ab" if resumed else "wb") as f:
+            for chunk in r.iter_content(chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+        if expected and written < expected:
+            raise IncompleteDownload(f"{written}/{expected} bytes")
+        return (have if resumed else 0) + written
+
+
+class Downloader:
+    """Order PDFs ke background downloads. `submit()` turant Future deta hai (ya None agar queue bhari thi);
+    ek URL ka ek hi download chalta hai aur pehle se stored URL dobara nahi laaya jaata."""
+
+    _STOP = object()
+
+    def __init__(self, db_path=DB_PATH, workers=DOWNLOAD_WORKERS, maxsize=DOWNLOAD_QUEUE_SIZE, blobs=None, writer=None,
+                 part_dir=PART_DIR, retries=DOWNLOAD_RETRIES):
+        self.db_path = db_path
+        self.blobs = blobs or BlobStore(BLOB_DIR)
+        self.writer = writer or get_writer(db_path)
+        self.part_dir = part_dir
+        self.retries = retries
+        self.downloaded = self.reused = self.failed = self.dropped = 0
+        os.makedirs(part_dir, exist_ok=True)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._queue = queue.Queue(maxsize)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._run, name=f"pdf-download-{i}", daemon=True) for i in range(workers)]
+        for t in self._threads:
+            t.start()
+        atexit.register(self.close)
+
+    def submit(self, url, case_key="", cookies=None, referer=None, timeout=PUT_TIMEOUT):
+        """Download queue karta hai. Future ka result {"url", "sha256", "size", "reused"} hota hai."""
+        with self._lock:
+            if self._closed:
+                return None
+            future = self._inflight.get(url)
+            if future is not None:
+                return future
+            future = self._inflight[url] = Future()
+        try:
+            self._queue.put((url, case_key, cookies, referer, future), timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._inflight.pop(url, None)
+            self.dropped += 1
+            return None
+        return future
+
+    def join(self):
+        """Ab tak queue hue saare downloads poore hone tak rukta hai."""
+        self._queue.join()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for t in self._threads:
+            t.join()
+        self.session.close()
+
+    def read(self, digest):
+        """Stored PDF ke bytes (Streamlit download button ke liye)."""
+        with self.blobs.open(digest) as f:
+            return f.read()
+
+    def part_path(self, url):
+        return os.path.join(self.part_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".part")
+
+    def _run(self):
+        conn = connect(self.db_path)  # writer ne schema bana diya hai (get_writer ready hone tak rukta hai)
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    break
+                url, case_key, cookies, referer, future = item
+                try:
+                    future.set_result(self._download(conn, url, case_key, cookies, referer))
+                except Exception as e:
+                    self.failed += 1
+                    self.writer.submit("documents", {"source": url, "kind": "order", "case_key": case_key,
+                                                     "ts": time.time(), "error": f"{type(e).__name__}: {e}"})
+                    future.set_exception(e)
+                finally:
+                    with self._lock:
+                        self._inflight.pop(url, None)
+            finally:
+                self._queue.task_done()
+        conn.close()
+
+    def _download(self, conn, url, case_key, cookies, referer):
+        row = conn.execute("SELECT sha256, size FROM documents WHERE source = ? AND sha256 IS NOT NULL", (url,)).fetchone()
+        if row and self.blobs.exists(row[0]):
+            self.reused += 1
+            return {"url": url, "sha256": row[0], "size": row[1], "reused": True}
+        part = self.part_path(url)
+        headers = {"Referer": referer} if referer else {}
+        with span("order_pdf"):
+            for attempt in range(1, self.retries + 1):
+                try:
+                    size = stream_to_file(self.session, url, part, cookies, headers)
+                    break
+                except requests.RequestException:
+                    # `.part` disk par rehti hai; agla attempt wahin se
+                    if attempt == self.retries:
+                        raise
+                    time.sleep(DOWNLOAD_BACKOFF * attempt)
+            with open(part, "rb") as f:
+                if f.read(len(PDF_MAGIC)) != PDF_MAGIC:
+                    os.remove(part)
+                    raise ValueError("response is not a PDF (session expired or link moved?)")
+            digest = self.blobs.put_file(part)
+            os.remove(part)
+        self.downloaded += 1
+        self.writer.submit("documents", {"source": url, "kind": "order", "case_key": case_key, "ts": time.time(),
+                                         "sha256": digest, "size": size, "error": None})
+        return {"url": url, "sha256": digest, "size": size, "reused": False}
+
+
+_downloaders = {}
+_downloaders_lock = threading.Lock()
+
+
+def get_downloader(db_path=DB_PATH):
+    """Process-wide ek downloader per DB file."""
+    with _downloaders_lock:
+        downloader = _downloaders.get(db_path)
+        if downloader is None or downloader._closed:
+            downloader = _downloaders[db_path] = Downloader(db_path)
+        return downloader
+
+
+class RenderQueue:
+    """Snapshot HTML -> PDF apne context ke worker pages mein, scraping pages se alag. Scraper ke event loop mein chalta
+    hai: `submit()` sirf queue karta hai (queue bhari ho tabhi rukta hai), `close()` bache jobs poore karke band karta hai."""
+
+    def __init__(self, browser, workers=RENDER_WORKERS, maxsize=RENDER_QUEUE_SIZE, route_rules=None, blobs=None,
+                 writer=None, db_path=DB_PATH):
+        self.browser = browser
+        self.workers = workers
+        self.maxsize = maxsize
+        self.route_rules = route_rules
+        self.blobs = blobs or BlobStore(BLOB_DIR)
+        self.writer = writer or get_writer(db_path)
+        self.rendered = self.failed = 0
+        self._context = None
+        self._queue = None
+        self._tasks = []
+
+    async def start(self):
+        self._context = await self.browser.new_context()
+        if self.route_rules is not None:
+            await install_routes(self._context, self.route_rules)
+        self._queue = asyncio.Queue(self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def submit(self, html, path, base_url="", case_key=""):
+        await self._queue.put((html, path, base_url, case_key))
+
+    async def close(self):
+        if self._queue is not None:
+            await self._queue.join()
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._context is not None:
+            await self._context.close()
+
+    async def _worker(self):
+        page = None
+        while True:
+            html, path, base_url, case_key = await self._queue.get()
+            try:
+                if page is None or page.is_closed():
+                    page = await self._context.new_page()
+                with span("pdf"):
+                    await page.set_content(with_base(html, base_url), wait_until="domcontentloaded")
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    await page.pdf(path=path + ".part")
+                    os.replace(path + ".part", path)
+                digest = await asyncio.to_thread(self.blobs.put_file, path)
+                self.writer.submit("documents", {"source": path, "kind": "render", "case_key": case_key, "ts": time.time(),
+                                                 "sha256": digest, "size": os.path.getsize(path), "error": None}, timeout=0)
+                self.rendered += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[pdf] render failed for {os.path.basename(path)}: {type(e).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order PDF downloads and the document index")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("download", help="download (or resume) one order PDF into the blob store")
+    d.add_argument("url")
+    d.add_argument("--key", default="", help="case label stored with the document")
+    s = sub.add_parser("list", help="recently stored documents")
+    s.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.cmd == "download":
+        downloader = Downloader(args.db, workers=1)
+        started = time.monotonic()
+        try:
+            result = downloader.submit(args.url, args.key).result()
+        except Exception as e:
+            raise SystemExit(f"download failed: {type(e).__name__}: {e}")
+        finally:
+            downloader.close()
+            downloader.writer.flush()
+        status = "already stored" if result["reused"] else f"{result['size'] / 1e6:.2f} MB in {time.monotonic() - started:.1f}s"
+        print(f"{result['sha256']}  {status}")
+        return
+    conn = connect(args.db)
+    ensure_schema(conn)
+    try:
+        rows = conn.execute("SELECT ts, kind, case_key, sha256, size, error, source FROM documents ORDER BY ts DESC LIMIT ?",
+                            (args.limit,)).fetchall()
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f"could not read documents: {e}")
+    for ts, kind, case_key, digest, size, error, source in rows:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+        print(f"{when} {kind:<6} {case_key or '-':<20} {(digest or '')[:12]:<12} {size or 0:>9}  {error or source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# portal.py
+# eCourts portal par app.py ke browser steps (async Playwright page helpers): portal kholna, State/District chunna,
+# CAPTCHA capture, form submit aur parse. BrowserManager inhe session ke page par chalata hai; benchmarks bhi yahi
+# helpers seedhe chalate hain. COURT_ECOURTS_URL se portal ka URL badla ja sakta hai (jaise local fixture server).
+
+import os
+
+import waits
+from case_parser import parse_case_html
+from http_backend import PortalSession, Recorder
+from metrics import span
+from pdf_pipeline import cookie_dict
+
+ECOURTS_START_URL = os.environ.get("COURT_ECOURTS_URL", "https://services.ecourts.gov.in/ecourtindia_v6/")
+WAIT_TIMEOUT_MS = 20000
+CASE_TYPE_SELECT = "select[id*='caseType'], select[id*='ctype']"
+CAPTCHA_IMG = "img#captcha_image, img[id*='captcha']"
+
+
+async def goto_case_number_page(page):
+    with span("page_load"):
+        await page.goto(ECOURTS_START_URL, timeout=60000, wait_until="domcontentloaded")
+    possible_texts = ["Case Status", "Case Number"]
+    for t in possible_texts:
+        try:
+            await page.get_by_text(t, exact=False).first.click(timeout=3000)
+        except Exception:
+            pass
+
+
+async def select_state_and_district(page, state_name="Bihar", district_name="Gaya"):
+    """Dropdowns populate hone ka intezaar karta hai; har step ka time (label, seconds) return karta hai."""
+    timings = []
+    with span("dropdowns") as sp:
+        try:
+            timings.append(("states", (await waits.wait_for_options_async(page, "select[id*='state']", timeout=WAIT_TIMEOUT_MS)).seconds))
+            await page.select_option("select[id*='state']", label=state_name, timeout=5000)
+            timings.append(("districts", (await waits.wait_for_options_async(page, "select[id*='district']", timeout=WAIT_TIMEOUT_MS)).seconds))
+            await page.select_option("select[id*='district']", label=district_name, timeout=5000)
+            timings.append(("case types", (await waits.wait_for_options_async(page, CASE_TYPE_SELECT, timeout=WAIT_TIMEOUT_MS)).seconds))
+        except Exception as e:
+            sp.fail(type(e).__name__)
+    return timings
+
+
+async def init_portal(page):
+    await goto_case_number_page(page)
+    return await select_state_and_district(page, "Bihar", "Gaya")
+
+
+async def capture_captcha_image(page, known_src=None):
+    """(src, png). Image ka src `known_src` jaisa hi ho toh CAPTCHA badla nahi, png None (screenshot nahi liya)."""
+    loc = page.locator(CAPTCHA_IMG).first
+    src = await loc.get_attribute("src", timeout=5000)
+    if known_src and src == known_src:
+        return src, None
+    with span("captcha"):
+        return src, await loc.screenshot(timeout=5000)
+
+
+async def warm_portal(page):
+    """Warm pool ke liye: portal form tak pahunch kar CAPTCHA bhi pehle hi capture kar leta hai."""
+    timings = await init_portal(page)
+    src, png = await capture_captcha_image(page)
+    return {"waits": timings, "captcha_src": src, "captcha_png": png}
+
+
+async def fill_form_and_submit(page, case_type, case_number, filing_year, captcha_text):
+    with span("submit") as sp:
+        await page.select_option(CASE_TYPE_SELECT, label=case_type)
+        await page.fill("input[id*='caseNo'], input[placeholder*='Case Number' i]", case_number)
+        year_selector = "select[id*='year']"
+        if await page.locator(year_selector).count() > 0:
+            await page.select_option(year_selector, value=str(filing_year))
+        else:
+            await page.fill("input[id*='year']", str(filing_year))
+        await page.fill("input[id*='captcha']", captcha_text.strip())
+        await waits.after_ajax_async(page, lambda: page.click("button:has-text('Search'), button:has-text('Get Status')"), timeout=WAIT_TIMEOUT_MS)
+        body = await page.content()
+        accepted = "Invalid CAPTCHA" not in body and "Invalid Case Details" not in body
+        if not accepted:
+            sp.fail("rejected")
+    return accepted
+
+
+async def parse_results(page):
+    html = await page.content()
+    with span("parse") as sp:
+        parsed = parse_case_html(html)
+        if not parsed["success"]:
+            sp.fail("no case fields")
+    return parsed
+
+
+async def capture_http_session(page, recorder, case_type, case_number, filing_year, captcha_text):
+    """Browser wale successful submit se cookies + form POST le kar direct HTTP session banata hai."""
+    option_values = await page.locator(CASE_TYPE_SELECT).first.evaluate(
+        "el => Object.fromEntries([...el.options].map(o => [o.textContent.trim(), o.value]))"
+    )
+    session = PortalSession.from_recorder(
+        recorder, await page.context.cookies(),
+        {"case_type": option_values.get(case_type, case_type), "case_number": case_number, "year": filing_year, "captcha": captcha_text},
+    )
+    session.option_values = option_values
+    return session
+
+
+async def portal_cookies(page):
+    """Session ke cookies {name: value}, taaki order PDFs browser ke bahar download ho sakein."""
+    return cookie_dict(await page.context.cookies())
+
+
+async def browser_fetch(page, case_type, case_number, filing_year, captcha_text, record_http=False):
+    """Browser se submit + parse. (parsed ya None, captured HTTP session ya None)."""
+    recorder = Recorder() if record_http else None
+    if recorder:
+        page.on("request", recorder.on_request)
+    try:
+        if not await fill_form_and_submit(page, case_type, case_number, filing_year, captcha_text):
+            return None, None
+    finally:
+        if recorder:
+            page.remove_listener("request", recorder.on_request)
+    parsed = await parse_results(page)
+    parsed["source"] = "browser"
+    http_session = None
+    if recorder and parsed["success"]:
+        try:
+            http_session = await capture_http_session(page, recorder, case_type, case_number, filing_year, captcha_text)
+        except Exception:
+            pass
+    return parsed, http_session
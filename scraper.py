@@ -1,117 +1,726 @@
+import argparse
 import asyncio
-from playwright.async_api import async_playwright
+import csv
+import json
 import os
-import sqlite3
+import re
+import time
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from urllib.parse import urlencode
+
+from playwright.async_api import async_playwright
 
-asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+from storage import DB_PATH, SOURCE_SCRAPER, get_writer
+from netrules import RouteRules, install_routes
+from case_parser import parse_case_html
+from case_search import index_case
+import metrics
+from metrics import span
+from http_backend import PortalSession, Recorder, SessionExpired, extract_html, row_params
+from pdf_pipeline import PDF_DIR, RenderQueue, cookie_dict, get_downloader, order_urls
+from waits import (RESULT_ROWS_SELECTOR, after_ajax_async, wait_for_options_async, wait_for_rows_changed_async,
+                   wait_for_rows_or_error_async, wait_for_visible_async)
 
-DB_PATH = "queries.db"
+# Windows fix
+try:
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+except (AttributeError, NotImplementedError):
+    pass
+
+GAYA_BASE_URL = os.environ.get("COURT_GAYA_URL", "https://gaya.dcourts.gov.in").rstrip("/")  # benchmarks: local fixture server
+CASE_TYPE_SEARCH_URL = f"{GAYA_BASE_URL}/case-status-search-by-case-type/"
+CASE_NUMBER_SEARCH_URL = f"{GAYA_BASE_URL}/case-status-search-by-case-number/"
+DEFAULT_ESTABLISHMENT = "BRGA01,BRGA03,BRGA02,BRGA05"
+COURT_NAME = "Gaya District Court"
+VIEW_BUTTON_SELECTOR = ".viewCnrDetails"  # 'View' button
+ROUTE_RULES = RouteRules()
+ATTRS_JS = "el => Object.fromEntries([...el.attributes].map(a => [a.name, a.value]))"
 
 # --- Database Functions ---
-def setup_database():
-     """ SQLite database table"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS case_logs (
-            id INTEGER PRIMARY KEY,
-            timestamp TEXT NOT NULL,
-            case_type_value TEXT,
-            case_year TEXT,
-            result_ok INTEGER NOT NULL,
-            saved_pdf_path TEXT,
-            raw_html TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-def log_query(case_type_value, case_year, result_ok, pdf_path, html):
-     """succsesfull fetch  log in database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute(
-        "INSERT INTO case_logs (timestamp, case_type_value, case_year, result_ok, saved_pdf_path, raw_html) VALUES (?, ?, ?, ?, ?, ?)",
-        (timestamp, case_type_value, case_year, 1 if result_ok else 0, pdf_path, html)
-    )
-    conn.commit()
-    conn.close()
+def log_query(case_type, case_number, case_year, result_ok, pdf_path, html, parsed=None):
+    """succsesfull fetch  log in database (background writer ke through, scrape rukta nahi).
+    Parsed fields case search index mein bhi jaate hain (`parsed` na diya ho toh html se)."""
+    now = datetime.now()
+    timestamp = now.isoformat(timespec="seconds")
+    writer = get_writer(DB_PATH)
+    with span("db_write") as sp:
+        logged = writer.submit("snapshots", {
+            "ts": int(now.timestamp()), "source": SOURCE_SCRAPER, "court": COURT_NAME, "case_type": case_type,
+            "case_number": case_number, "filing_year": case_year, "ok": 1 if result_ok else 0,
+            "pdf_path": pdf_path or None, "html": html,
+        })
+        if not logged:
+            sp.fail("queue full")
+    if logged and result_ok and (parsed or html):
+        index_case(writer, COURT_NAME, case_type, case_number, case_year, parsed or parse_case_html(html, GAYA_BASE_URL), timestamp, "scraper")
+    return logged
 
 
 # --- FINAL SUBMISSION SCRIPT (Gaya - With All Features) ---
 async def scrape_court_data():
-    setup_database()
 
     # --- STEP 1: ---
-    MANUAL_CAPTCHA = "4piyU" 
-    CASE_YEAR = "2024"       
+    MANUAL_CAPTCHA = "4piyU"
+    CASE_YEAR = "2024"
     CASE_TYPE_VALUE = "100" # Commercial Suit ke liye
 
-    # --- STEP 2: ---
-    VIEW_BUTTON_SELECTOR = ".viewCnrDetails" # 'View' button 
-    
     print("--- Starting Gaya Court Scraper (Search by Case Type) ---")
-    
+
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
+        net = await install_routes(page, ROUTE_RULES)
 
         try:
             print(f"Fetching details for Year: {CASE_YEAR}...")
-            await page.goto("https://gaya.dcourts.gov.in/case-status-search-by-case-type/", timeout=60000)
+            await page.goto(CASE_TYPE_SEARCH_URL, timeout=60000, wait_until="domcontentloaded")
 
-         # pause 8 second
-            print("Page loaded. Waiting 8 seconds for dynamic content to load...")
-            await page.wait_for_timeout(8000)
+            waited = await wait_for_options_async(page, "#case_type")
+            print(f"Form ready in {waited.seconds:.1f}s.")
 
             print("Filling form details...")
-            await page.select_option('#est_code', value="BRGA01,BRGA03,BRGA02,BRGA05")
+            await page.select_option('#est_code', value=DEFAULT_ESTABLISHMENT)
             await page.select_option('#case_type', value=CASE_TYPE_VALUE)
             await page.fill('#year', CASE_YEAR)
-            await page.click('#rad_pending') 
+            await page.click('#rad_pending')
             await page.fill("#captcha", MANUAL_CAPTCHA)
 
             print("Submitting form...")
             await page.click("#search-button")
-            
-            print("Waiting 10 seconds for results list to load...")
-            await page.wait_for_timeout(10000)
 
             print("--- Checking for Results ---")
-            
-            error_message_visible = await page.locator("text=Invalid Captcha, text=No records found").first.is_visible(timeout=2000)
-            if error_message_visible:
+            waited = await wait_for_rows_or_error_async(page)
+            print(f"Results answered in {waited.seconds:.1f}s.")
+
+            if waited.signal == "error":
                 print("\n ERROR: Invalid CAPTCHA ya 'No records found' message mila.")
             else:
                 print("\n SUCCESS: Case list found. Clicking 'View' button...")
-                
+
                 first_result_view_button = page.locator(f"#showList {VIEW_BUTTON_SELECTOR}").first
-                
+
                 if await first_result_view_button.count() > 0:
-                    await first_result_view_button.click()
                     print("Waiting for details page...")
-                    await page.wait_for_timeout(5000)
+                    await after_ajax_async(page, first_result_view_button.click)
+                    waited = await wait_for_visible_async(page)
+                    print(f"Details ready in {waited.seconds:.1f}s.")
 
                     print("--- Saving Page as PDF ---")
                     pdf_path = "Gaya-Case-Details.pdf"
-                    await page.pdf(path=pdf_path)
-                    
+                    with span("pdf"):
+                        await page.pdf(path=pdf_path)
+
                     # Database mein log karein
                     html_content = await page.content()
-                    log_query(CASE_TYPE_VALUE, CASE_YEAR, True, os.path.abspath(pdf_path), html_content)
+                    log_query(CASE_TYPE_VALUE, "", CASE_YEAR, True, os.path.abspath(pdf_path), html_content)
                     print(f"\n SUCCESS! Page saved as '{pdf_path}' and query logged to database.")
                 else:
                     print(" ERROR: 'View' button nahi mila.")
-                    
+
         except Exception as e:
             print(f"\nAn error occurred: {e}")
         finally:
             print("\nBrowser 60 second mein band ho jayega...")
+            if net.requests:
+                print(f"Network: {net.requests_saved}/{net.requests} requests saved, {net.bytes_from_cache / 1024:.0f} KB from cache")
             await page.wait_for_timeout(60000)
             await browser.close()
 
-if __name__ == "__main__":
 
-    asyncio.run(scrape_court_data())
+# --- Batch Mode (many cases, one browser) ---
+@dataclass
+class BatchJob:
+    establishment: str
+    case_type: str
+    year: str
+    case_number: str = ""
+    captcha: str = ""
+
+    @property
+    def label(self):
+        return f"{self.case_type}/{self.case_number or '*'}/{self.year}"
+
+
+def load_jobs(path):
+    """Jobs file (CSV) padhta hai: establishment,case_type,year,case_number[,captcha]."""
+    jobs = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            if not row.get("case_type") or not row.get("year"):
+                continue
+            jobs.append(BatchJob(
+                establishment=row.get("establishment") or DEFAULT_ESTABLISHMENT,
+                case_type=row["case_type"],
+                year=row["year"],
+                case_number=row.get("case_number", ""),
+                captcha=row.get("captcha", ""),
+            ))
+    return jobs
+
+
+class ContextPool:
+    """Ek browser ke andar fixed number of BrowserContexts; har job ek context borrow karta hai."""
+
+    def __init__(self, browser, size):
+        self.browser = browser
+        self.size = size
+        self._free = asyncio.Queue()
+
+    async def start(self):
+        for _ in range(self.size):
+            await self._free.put(await self.browser.new_context())
+
+    async def acquire(self):
+        # None: slot khaali hai (recycle ke waqt naya context nahi bana), yahin bana lo
+        context = await self._free.get()
+        if context is None:
+            try:
+                context = await self.browser.new_context()
+            except BaseException:
+                self._free.put_nowait(None)  # slot wapas, warna pool ek context chhota ho jaata
+                raise
+        return context
+
+    async def release(self, context, broken=False):
+        # Failed job ka context recycle karo taaki agla job saaf session se shuru ho
+        if broken:
+            try:
+                await context.close()
+            except Exception:
+                pass
+            try:
+                context = await self.browser.new_context()
+            except Exception as e:
+                print(f"[pool] could not recreate a browser context ({e}); will retry on next acquire")
+                context = None
+        self._free.put_nowait(context)
+
+    async def close(self):
+        while not self._free.empty():
+            context = self._free.get_nowait()
+            if context is None:
+                continue
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+
+_captcha_prompt_lock = asyncio.Lock()
+
+async def ask_captcha(page, job):
+    """CAPTCHA image save karke console par text maangta hai (ek waqt mein ek hi prompt)."""
+    async with _captcha_prompt_lock:
+        os.makedirs(PDF_DIR, exist_ok=True)
+        img_path = os.path.join(PDF_DIR, "captcha.png")
+        await page.locator("img#siwp_captcha_image_0, img[id*='captcha']").first.screenshot(path=img_path, timeout=10000)
+        return (await asyncio.to_thread(input, f"[{job.label}] CAPTCHA ({img_path}): ")).strip()
+
+
+async def _fill_search_form(page, job, captcha_solver):
+    """Job ke hisaab se case-number ya case-type form bhar kar submit karta hai; rows/error ka Waited return karta hai."""
+    with span("page_load"):
+        await page.goto(CASE_NUMBER_SEARCH_URL if job.case_number else CASE_TYPE_SEARCH_URL, timeout=60000, wait_until="domcontentloaded")
+    with span("dropdowns"):
+        await wait_for_options_async(page, "#case_type")
+    await page.select_option('#est_code', value=job.establishment)
+    await page.select_option('#case_type', value=job.case_type)
+    if job.case_number:
+        await page.fill('#reg_no', job.case_number)
+        await page.fill('#reg_year', job.year)
+    else:
+        await page.fill('#year', job.year)
+        await page.click('#rad_pending')
+
+    if not job.captcha:
+        with span("captcha"):
+            job.captcha = await captcha_solver(page, job)
+    await page.fill("#captcha", job.captcha)
+    with span("submit") as sp:
+        await page.click("#search-button")
+        # Result rows ya error message, jo pehle aaye
+        waited = await wait_for_rows_or_error_async(page)
+        if waited.signal == "error":
+            sp.fail("error message")
+    return waited
+
+
+def queue_orders(orders, parsed, case_key, cookies):
+    """Parsed case ke order PDFs background downloader ko; queue bhari ho toh chhod deta hai (scrape kabhi nahi rukta)."""
+    for url in order_urls(parsed):
+        if orders.submit(url, case_key, cookies, timeout=0) is None:
+            print(f"   order download queue full, skipped {url}")
+
+
+async def _search_once(context, job, captcha_solver, renders=None, orders=None):
+    """Ek job ka search + detail. PDF `renders` queue mein jaata hai aur order PDFs `orders` downloader mein;
+    dono ke liye yahan ruka nahi jaata."""
+    page = await context.new_page()
+    net = await install_routes(page, ROUTE_RULES)
+    try:
+        waited = await _fill_search_form(page, job, captcha_solver)
+        if waited.signal == "error":
+            body = await page.inner_text("body")
+            return {"ok": False, "error": "Invalid Captcha" if "invalid captcha" in body.lower() else "No records found", "net": net.as_dict()}
+
+        view_button = page.locator(f"#showList {VIEW_BUTTON_SELECTOR}").first
+        row = row_params(await view_button.evaluate(ATTRS_JS))
+        with span("detail"):
+            await after_ajax_async(page, view_button.click)
+            await wait_for_visible_async(page)
+
+        html = await page.content()
+        pdf_path = ""
+        if renders is not None:
+            safe = "_".join(x for x in (job.case_type, job.case_number, job.year) if x).replace("/", "-")
+            pdf_path = os.path.abspath(os.path.join(PDF_DIR, f"Gaya-{safe}.pdf"))
+            await renders.submit(html, pdf_path, page.url, job.label)
+        if orders is not None:
+            queue_orders(orders, parse_case_html(html, GAYA_BASE_URL), job.label, cookie_dict(await context.cookies()))
+        return {"ok": True, "pdf_path": pdf_path, "html": html, "row": row, "net": net.as_dict()}
+    finally:
+        await page.close()
+
+
+async def run_job(pool, job, captcha_solver, retries=2, backoff=2.0, renders=None, orders=None):
+    """Ek job ko pool ke context par chalata hai; exception par retry (naye context ke saath)."""
+    started = time.monotonic()
+    result = {"ok": False, "error": ""}
+    for attempt in range(1, retries + 2):
+        context = await pool.acquire()
+        broken = False
+        try:
+            result = await _search_once(context, job, captcha_solver, renders, orders)
+        except Exception as e:
+            broken = True
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            await pool.release(context, broken=broken)
+        # "No records found" dobara try karne se nahi badlega
+        if result["ok"] or result.get("error") == "No records found":
+            break
+        if attempt <= retries:
+            # Captcha galat tha toh agli baar naya captcha maango
+            job.captcha = ""
+            await asyncio.sleep(backoff * attempt)
+    result.update(job=asdict(job), attempts=attempt, elapsed=round(time.monotonic() - started, 2))
+    return result
+
+
+async def run_batch(jobs, pool_size=4, concurrency=None, retries=2, headless=True, captcha_solver=ask_captcha, pdf=True,
+                    orders=None):
+    """Saare jobs ek browser aur ek context pool par chalata hai; results jaise-jaise poore hon, yield karta hai.
+    `pdf` ho toh PDFs alag render pages mein bante hain (result ka `pdf_path` generator khatam hone tak likh jaata hai);
+    `orders` (pdf_pipeline.Downloader) ho toh order PDFs background mein download hote hain."""
+    limit = asyncio.Semaphore(concurrency or pool_size)
+
+    async def limited(pool, job):
+        async with limit:
+            return await run_job(pool, job, captcha_solver, retries=retries, renders=renders, orders=orders)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        pool = ContextPool(browser, pool_size)
+        await pool.start()
+        renders = await RenderQueue(browser, route_rules=ROUTE_RULES).start() if pdf else None
+        try:
+            tasks = [asyncio.create_task(limited(pool, job)) for job in jobs]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for t in tasks:
+                    t.cancel()
+        finally:
+            if renders is not None:
+                await renders.close()
+            await pool.close()
+            await browser.close()
+
+
+def _search_values(job):
+    values = {"establishment": job.establishment, "case_type": job.case_type, "year": job.year, "captcha": job.captcha}
+    if job.case_number:
+        values["case_number"] = job.case_number
+    return values
+
+
+async def capture_portal_session(pool, job, captcha_solver, pool_size, orders=None):
+    """Ek job browser se chalata hai aur us ke form POSTs record karke direct-HTTP PortalSession banata hai."""
+    recorder = Recorder()
+    context = await pool.acquire()
+    context.on("request", recorder.on_request)
+    broken = False
+    try:
+        result = await _search_once(context, job, captcha_solver, orders=orders)
+        session = None
+        if result["ok"]:
+            session = PortalSession.from_recorder(recorder, await context.cookies(), _search_values(job), row=result.get("row"), pool_size=pool_size)
+        return result, session
+    except Exception:
+        broken = True
+        raise
+    finally:
+        context.remove_listener("request", recorder.on_request)
+        await pool.release(context, broken=broken)
+
+
+async def run_batch_http(jobs, workers=8, retries=2, headless=True, captcha_solver=ask_captcha, orders=None):
+    """Browser sirf session/CAPTCHA capture ke liye; baaki jobs pooled HTTP client par parallel chalte hain.
+    Session expire hone par browser se dobara capture hota hai."""
+    jobs = list(jobs)
+    if not jobs:
+        return
+    limit = asyncio.Semaphore(workers)
+    capture_lock = asyncio.Lock()
+    state = {"session": None}
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        pool = ContextPool(browser, 1)
+        await pool.start()
+
+        async def ensure_session(job):
+            """Session na ho toh isi job se capture karo (result return hota hai); ho toh None."""
+            async with capture_lock:
+                if state["session"] is not None:
+                    return None
+                job.captcha = ""
+                result, state["session"] = await capture_portal_session(pool, job, captcha_solver, workers, orders)
+                return result
+
+        async def http_job(job):
+            started = time.monotonic()
+            values = {k: v for k, v in _search_values(job).items() if k != "captcha"}
+            result = {"ok": False, "error": ""}
+            for attempt in range(1, retries + 2):
+                session = None
+                try:
+                    async with limit:
+                        captured = await ensure_session(job)
+                        if captured is not None and not captured["ok"]:
+                            # Galat CAPTCHA / page glitch: ek baar aur (tab tak kisi aur job ka session ban gaya ho
+                            # toh ye job seedhe HTTP par chalega)
+                            captured = await ensure_session(job)
+                        if captured is not None:
+                            result = captured
+                            break
+                        session = state["session"]
+                        with span("http_lookup"):
+                            parsed = await asyncio.to_thread(session.lookup, **values)
+                    if orders is not None and parsed["success"]:
+                        queue_orders(orders, parsed, job.label, session.http.cookies.get_dict())
+                    result = {"ok": parsed["success"], "pdf_path": "", "html": parsed["html"],
+                              "error": "" if parsed["success"] else "No records found"}
+                    break
+                except SessionExpired as e:
+                    # Agla attempt browser se naya session capture karega
+                    if session is not None and state["session"] is session:
+                        state["session"] = None
+                        session.close()
+                    result = {"ok": False, "error": f"SessionExpired: {e}"}
+                except Exception as e:
+                    result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            result.pop("row", None)
+            result.update(job=asdict(job), attempts=attempt, elapsed=round(time.monotonic() - started, 2))
+            return result
+
+        tasks = [asyncio.create_task(http_job(job)) for job in jobs]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for t in tasks:
+                t.cancel()
+            if state["session"] is not None:
+                state["session"].close()
+            await pool.close()
+            await browser.close()
+
+
+# --- Harvest Mode (poori result list, har row ki detail) ---
+NEXT_PAGE_SELECTOR = "#showList .paginate_button.next:not(.disabled), #showList a[rel='next'], #showList a.next:not(.disabled)"
+CNR_PATTERN = re.compile(r"^[A-Z]{4}\d{12}$")
+MAX_LIST_PAGES = 500
+# Detail request worker tab ke andar browser ka apna fetch() chalata hai (same origin, same cookies)
+_FETCH_JS = """async ([url, body, headers]) => {
+    const r = await fetch(url, {method: "POST", body, headers, credentials: "same-origin"});
+    return [r.status, r.headers.get("content-type") || "", await r.text()];
+}"""
+_FETCH_HEADERS = ("content-type", "x-requested-with", "accept")
+
+
+def row_cnr(row):
+    """Row ka CNR (data-cno / onclick arg); na mile toh row values se bani stable key."""
+    for value in row.values():
+        if CNR_PATTERN.match(value or ""):
+            return value
+    return "|".join(f"{k}={v}" for k, v in sorted(row.items()))
+
+
+def completed_cnrs(path):
+    """Pichhle run ki output file se woh CNRs jin ki detail safal ho chuki hai (resume ke liye)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # crash ke waqt adhi likhi line
+            if rec.get("ok") and rec.get("cnr"):
+                done.add(rec["cnr"])
+    return done
+
+
+async def _list_rows(page):
+    """Result list ke saare pages par chal kar har 'View' row ke params (CNR ke order mein, bina duplicates)."""
+    rows, seen = [], set()
+    for _ in range(MAX_LIST_PAGES):
+        for attrs in await page.locator(RESULT_ROWS_SELECTOR).evaluate_all(f"els => els.map({ATTRS_JS})"):
+            row = row_params(attrs)
+            if row_cnr(row) not in seen:
+                seen.add(row_cnr(row))
+                rows.append(row)
+        next_button = page.locator(NEXT_PAGE_SELECTOR).first
+        if await next_button.count() == 0 or not await next_button.is_visible():
+            break
+        first_row = await page.locator(RESULT_ROWS_SELECTOR).first.evaluate("el => el.outerHTML")
+        await next_button.click()
+        await wait_for_rows_changed_async(page, first_row)
+    return rows
+
+
+async def _capture_detail_request(page, recorder):
+    """Ek 'View' click karke us ka AJAX POST record karta hai, jise baaki rows ke liye replay kiya jaata hai."""
+    view_button = page.locator(RESULT_ROWS_SELECTOR).first
+    row = row_params(await view_button.evaluate(ATTRS_JS))
+    before = recorder.posts[-1] if recorder.posts else None
+    await after_ajax_async(page, view_button.click)
+    detail = recorder.find(row, after=before)
+    if detail is None:
+        raise RuntimeError("case-detail request could not be captured from the 'View' button")
+    return detail.bind(row)
+
+
+async def _fetch_detail(tab, detail, row):
+    """Worker tab mein ek row ki detail: fetch + parse."""
+    headers = {k: v for k, v in detail.headers.items() if k.lower() in _FETCH_HEADERS}
+    with span("detail"):
+        status, content_type, text = await tab.evaluate(_FETCH_JS, [detail.url, urlencode(detail.build(row)), headers])
+        if status in (401, 403, 419):
+            raise SessionExpired(f"HTTP {status}")
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}")
+    html = extract_html(text, content_type)
+    with span("parse") as sp:
+        parsed = parse_case_html(html, GAYA_BASE_URL)
+        if not parsed["success"]:
+            sp.fail("no case fields")
+    return parsed
+
+
+async def harvest(job, tabs=4, retries=2, headless=True, captcha_solver=ask_captcha, skip=(), pdf=True, backoff=2.0,
+                  orders=None):
+    """Case type + year ki poori result list (saare pages) ki har row ki detail `tabs` parallel worker tabs mein laata hai.
+    Har record poora hote hi yield hota hai; `skip` wale CNRs (pichhle run mein ho chuke) dobara nahi laaye jaate.
+    PDFs aur order downloads run_batch ki tarah background mein."""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        context = await browser.new_context()
+        await install_routes(context, ROUTE_RULES)
+        recorder = Recorder()
+        context.on("request", recorder.on_request)
+        renders = await RenderQueue(browser, route_rules=ROUTE_RULES).start() if pdf else None
+        try:
+            page = await context.new_page()
+            for attempt in range(1, retries + 2):
+                waited = await _fill_search_form(page, job, captcha_solver)
+                if waited.signal == "rows":
+                    break
+                if "invalid captcha" not in (await page.inner_text("body")).lower():
+                    yield {"cnr": "", "ok": False, "error": "No records found", "job": asdict(job)}
+                    return
+                job.captcha = ""
+            else:
+                yield {"cnr": "", "ok": False, "error": "Invalid Captcha", "job": asdict(job)}
+                return
+
+            rows = [row for row in await _list_rows(page) if row_cnr(row) not in skip]
+            if not rows:
+                return
+            detail = await _capture_detail_request(page, recorder)
+            cookies = cookie_dict(await context.cookies()) if orders is not None else None
+
+            free = asyncio.Queue()
+            for _ in range(max(1, min(tabs, len(rows)))):
+                tab = await context.new_page()
+                # Tab portal ke origin par rahe taaki fetch() ko session cookies milein
+                await tab.goto(CASE_TYPE_SEARCH_URL, timeout=60000, wait_until="domcontentloaded")
+                await free.put(tab)
+
+            async def one(row):
+                started = time.monotonic()
+                result = {"cnr": row_cnr(row), "ok": False, "error": ""}
+                parsed = None
+                for attempt in range(1, retries + 2):
+                    tab = await free.get()
+                    try:
+                        parsed = await _fetch_detail(tab, detail, row)
+                        break
+                    except SessionExpired as e:
+                        # Session gaya toh retry se kuch nahi badlega
+                        result["error"] = f"SessionExpired: {e}"
+                        break
+                    except Exception as e:
+                        result["error"] = f"{type(e).__name__}: {e}"
+                    finally:
+                        await free.put(tab)
+                    if attempt <= retries:
+                        await asyncio.sleep(backoff * attempt)
+                if parsed is not None:
+                    html = parsed.pop("html", "")
+                    pdf_path = ""
+                    if parsed["success"] and renders is not None:
+                        pdf_path = os.path.abspath(os.path.join(PDF_DIR, f"Gaya-{result['cnr']}.pdf".replace("|", "_").replace("/", "-")))
+                        await renders.submit(html, pdf_path, GAYA_BASE_URL, result["cnr"])
+                    if parsed["success"] and orders is not None:
+                        queue_orders(orders, parsed, result["cnr"], cookies)
+                    result.update(ok=parsed["success"], error="" if parsed["success"] else "Case details not found",
+                                  record=parsed, pdf_path=pdf_path, html=html)
+                result.update(row=row, job=asdict(job), attempts=attempt, elapsed=round(time.monotonic() - started, 2))
+                return result
+
+            tasks = [asyncio.create_task(one(row)) for row in rows]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for t in tasks:
+                    t.cancel()
+        finally:
+            if renders is not None:
+                await renders.close()
+            await context.close()
+            await browser.close()
+
+
+async def scrape_harvest(jobs_file, out_path, tabs, retries, headless, pdf=True, orders=False):
+    """Har job (case type + year) ki poori list harvest karke JSONL mein line-by-line likhta hai. Crash ke baad
+    dobara chalane par `out_path` mein pehle se safal CNRs chhod diye jaate hain."""
+    jobs = load_jobs(jobs_file)
+    done_before = completed_cnrs(out_path)
+    print(f"--- Harvest: {len(jobs)} searches, {tabs} tabs, {len(done_before)} CNRs already done ---")
+    downloader = get_downloader(DB_PATH) if orders else None
+    started = time.monotonic()
+    done = ok = 0
+    with open(out_path, "a", encoding="utf-8") as out:
+        for job in jobs:
+            async for result in harvest(job, tabs=tabs, retries=retries, headless=headless, skip=done_before, pdf=pdf,
+                                        orders=downloader):
+                done += 1
+                ok += result["ok"]
+                html = result.pop("html", "")
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if result["ok"]:
+                    done_before.add(result["cnr"])
+                    if not log_query(job.case_type, result["record"].get("registration_number") or result["cnr"], job.year,
+                                     True, result["pdf_path"], html, parsed=result["record"]):
+                        print("   DB log queue full, row dropped")
+                status = "OK " if result["ok"] else "ERR"
+                print(f"[{done}] {status} {job.case_type}/{job.year} {result['cnr']} {result.get('error', '')}")
+    elapsed = time.monotonic() - started
+    await finish_orders(downloader)
+    get_writer(DB_PATH).flush()
+    print(metrics.format_summary(metrics.summarize(metrics.recent)))
+    print(f"\n--- Done: {ok}/{done} ok in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} cases/s) -> {out_path} ---")
+
+
+async def finish_orders(downloader):
+    """Bache order downloads poore hone ka intezaar (event loop block kiye bina) aur un ka hisaab."""
+    if downloader is None:
+        return
+    print("--- Waiting for order PDF downloads ---")
+    await asyncio.to_thread(downloader.join)
+    print(f"   Orders: {downloader.downloaded} downloaded, {downloader.reused} already stored, "
+          f"{downloader.failed} failed, {downloader.dropped} skipped (queue full)")
+
+
+async def scrape_batch(jobs_file, out_path, pool_size, concurrency, retries, headless, http=False, pdf=True, orders=False):
+    jobs = load_jobs(jobs_file)
+    print(f"--- Batch: {len(jobs)} jobs, pool={pool_size} ---")
+    downloader = get_downloader(DB_PATH) if orders else None
+    started = time.monotonic()
+    done = ok = 0
+    net_total = {"requests": 0, "requests_saved": 0, "bytes_from_cache": 0}
+    with open(out_path, "a", encoding="utf-8") as out:
+        if http:
+            results = run_batch_http(jobs, workers=concurrency or pool_size, retries=retries, headless=headless, orders=downloader)
+        else:
+            results = run_batch(jobs, pool_size=pool_size, concurrency=concurrency, retries=retries, headless=headless, pdf=pdf,
+                                orders=downloader)
+        async for result in results:
+            done += 1
+            ok += result["ok"]
+            for k in net_total:
+                net_total[k] += result.get("net", {}).get(k, 0)
+            html = result.pop("html", "")
+            result.pop("row", None)
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            if result["ok"] and not log_query(result["job"]["case_type"], result["job"]["case_number"], result["job"]["year"], True, result["pdf_path"], html):
+                print("   DB log queue full, row dropped")
+            status = "OK " if result["ok"] else "ERR"
+            print(f"[{done}/{len(jobs)}] {status} {result['job']['case_type']}/{result['job']['case_number'] or '*'}/{result['job']['year']} "
+                  f"({result['elapsed']}s, {result['attempts']} attempt) {result.get('error', '')}")
+    elapsed = time.monotonic() - started
+    await finish_orders(downloader)
+    writer = get_writer(DB_PATH)
+    writer.flush()
+    if writer.dropped or writer.failed or writer.last_error:
+        print(f"   DB: {writer.written} rows written, {writer.dropped} dropped, {writer.failed} failed, last error: {writer.last_error}")
+    if net_total["requests"]:
+        print(f"   Network: {net_total['requests_saved']}/{net_total['requests']} requests saved, "
+              f"{net_total['bytes_from_cache'] / 1e6:.1f} MB served from static cache")
+    print(metrics.format_summary(metrics.summarize(metrics.recent)))
+    print(f"\n--- Done: {ok}/{done} ok in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} jobs/s) -> {out_path} ---")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gaya District Court scraper")
+    parser.add_argument("--batch", metavar="JOBS_CSV", help="CSV of establishment,case_type,year,case_number[,captcha]")
+    parser.add_argument("--harvest", metavar="JOBS_CSV", help="CSV of establishment,case_type,year: fetch every case in each result list")
+    parser.add_argument("--out", default=None, help="results file (JSON lines, appended; default batch_results.jsonl / harvest_results.jsonl)")
+    parser.add_argument("--pool", type=int, default=4, help="number of browser contexts")
+    parser.add_argument("--concurrency", type=int, default=None, help="max jobs in flight (default: pool size)")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--no-block", action="store_true", help="load every page resource (no request blocking/static cache)")
+    parser.add_argument("--http", action="store_true", help="capture one browser session, then fetch the rest over direct HTTP")
+    parser.add_argument("--tabs", type=int, default=4, help="parallel detail tabs in harvest mode")
+    parser.add_argument("--no-pdf", action="store_true", help="batch/harvest mode: don't render case detail PDFs")
+    parser.add_argument("--orders", action="store_true", help="batch/harvest mode: also download order/judgment PDFs in the background")
+    args = parser.parse_args()
+    if args.no_block:
+        ROUTE_RULES.enabled = False
+    metrics.set_source("scraper")
+
+    try:
+        if args.harvest:
+            asyncio.run(scrape_harvest(args.harvest, args.out or "harvest_results.jsonl", args.tabs, args.retries, not args.headed,
+                                       pdf=not args.no_pdf, orders=args.orders))
+        elif args.batch:
+            asyncio.run(scrape_batch(args.batch, args.out or "batch_results.jsonl", args.pool, args.concurrency, args.retries,
+                                     not args.headed, http=args.http, pdf=not args.no_pdf, orders=args.orders))
+        else:
+            asyncio.run(scrape_court_data())
+    finally:
+        get_writer(DB_PATH).close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+# storage.py
+# SQLite persistence for app.py and scraper.py.
+# Ek hi long-lived WAL connection ek background thread mein rehta hai; log records ek bounded queue se aate hain
+# aur batched transactions mein likhe jaate hain, taaki scrape path kabhi DB ka intezaar na kare.
+
+import asyncio
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+
+from blobstore import BLOB_DIR, BlobStore
+
+DB_PATH = "queries.db"
+QUEUE_SIZE = 1000
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5  # seconds
+PUT_TIMEOUT = 1.0
+LOG_PAGE_SIZE = 50
+CASE_ID_CACHE = 50_000  # writer thread ki identity -> case id map itne entries tak
+
+# snapshots.source
+SOURCE_APP, SOURCE_SCRAPER = 1, 2
+SOURCE_NAMES = {SOURCE_APP: "app", SOURCE_SCRAPER: "scraper"}
+# parties.role
+PETITIONER, RESPONDENT, PETITIONER_ADVOCATE, RESPONDENT_ADVOCATE, ADVOCATE = 1, 2, 3, 4, 5
+
+TABLES = {
+    "queries": """
+        CREATE TABLE IF NOT EXISTS queries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT NOT NULL, court TEXT NOT NULL,
+            case_type TEXT NOT NULL, case_number TEXT NOT NULL, filing_year TEXT NOT NULL,
+            captcha_used TEXT, result_ok INTEGER NOT NULL, latest_pdf TEXT, html TEXT
+        )
+    """,
+    "case_logs": """
+        CREATE TABLE IF NOT EXISTS case_logs (
+            id INTEGER PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            case_type TEXT,
+            case_number TEXT,
+            case_year TEXT,
+            result_ok INTEGER,
+            saved_pdf_path TEXT,
+            raw_html TEXT
+        )
+    """,
+    "case_records": """
+        CREATE TABLE IF NOT EXISTS case_records (
+            id INTEGER PRIMARY KEY,
+            case_key TEXT NOT NULL UNIQUE,
+            ts TEXT NOT NULL,
+            source TEXT,
+            court TEXT,
+            case_type TEXT,
+            case_number TEXT,
+            filing_year TEXT,
+            cnr TEXT,
+            petitioner TEXT,
+            respondent TEXT,
+            advocates TEXT,
+            acts TEXT,
+            case_status TEXT,
+            filing_date TEXT,
+            registration_date TEXT,
+            next_hearing TEXT,
+            decision_date TEXT,
+            latest_pdf TEXT
+        )
+    """,
+    "watchlist": """
+        CREATE TABLE IF NOT EXISTS watchlist (
+            id INTEGER PRIMARY KEY,
+            establishment TEXT NOT NULL,
+            case_type TEXT NOT NULL,
+            case_number TEXT NOT NULL,
+            filing_year TEXT NOT NULL,
+            label TEXT,
+            added_at REAL NOT NULL,
+            next_check REAL NOT NULL,
+            interval REAL NOT NULL,
+            last_checked REAL,
+            last_changed REAL,
+            snapshot_hash TEXT,
+            next_hearing TEXT,
+            latest_pdf TEXT,
+            case_status TEXT,
+            decision_date TEXT,
+            checks INTEGER NOT NULL DEFAULT 0,
+            changes INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            UNIQUE (establishment, case_type, case_number, filing_year)
+        )
+    """,
+    "watch_changes": """
+        CREATE TABLE IF NOT EXISTS watch_changes (
+            id INTEGER PRIMARY KEY,
+            watch_id INTEGER NOT NULL,
+            ts REAL NOT NULL,
+            field TEXT NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            html_hash TEXT
+        )
+    """,
+    "metrics": """
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            source TEXT,
+            stage TEXT NOT NULL,
+            ms REAL NOT NULL,
+            ok INTEGER NOT NULL,
+            error TEXT
+        )
+    """,
+    "documents": """
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            source TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            case_key TEXT,
+            ts REAL NOT NULL,
+            sha256 TEXT,
+            size INTEGER,
+            error TEXT
+        )
+    """,
+    "cache_invalidations": """
+        CREATE TABLE IF NOT EXISTS cache_invalidations (
+            case_key TEXT PRIMARY KEY,
+            max_id INTEGER NOT NULL,
+            ts REAL NOT NULL
+        )
+    """,
+}
+
+# Purane DBs mein jo columns nahi hain (shipped queries.db ke case_logs mein result_ok/saved_pdf_path nahi the).
+# queries/case_logs ab sirf purana data hain: naye lookups `snapshots` (migrations.py) mein jaate hain.
+COLUMNS = {
+    "queries": {"html_hash": "TEXT"},
+    "case_logs": {"case_type": "TEXT", "case_number": "TEXT", "result_ok": "INTEGER", "saved_pdf_path": "TEXT",
+                  "html_hash": "TEXT", "pdf_hash": "TEXT"},
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_metrics_ts ON metrics (ts, stage)",
+    "CREATE INDEX IF NOT EXISTS idx_watchlist_due ON watchlist (next_check)",
+    "CREATE INDEX IF NOT EXISTS idx_watch_changes_ts ON watch_changes (ts)",
+]
+
+# case_records ka full-text index (external content); triggers dono ko sync rakhte hain.
+# SQLite FTS5 ke bina build ho toh ye skip hote hain aur case_search LIKE par chalta hai.
+FTS_COLUMNS = ("petitioner", "respondent", "advocates", "acts", "case_status", "cnr", "case_number", "court")
+_fts_cols = ", ".join(FTS_COLUMNS)
+_fts_new = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_fts_old = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS case_records_fts USING fts5(
+            {_fts_cols}, content='case_records', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_records_ai AFTER INSERT ON case_records BEGIN
+            INSERT INTO case_records_fts (rowid, {_fts_cols}) VALUES (new.id, {_fts_new});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_records_ad AFTER DELETE ON case_records BEGIN
+            INSERT INTO case_records_fts (case_records_fts, rowid, {_fts_cols}) VALUES ('delete', old.id, {_fts_old});
+        END""",
+    # Sirf indexed columns badlein tab (case_id jaise columns ka update index ko nahi chhoota)
+    f"""CREATE TRIGGER IF NOT EXISTS case_records_au AFTER UPDATE OF {_fts_cols} ON case_records BEGIN
+            INSERT INTO case_records_fts (case_records_fts, rowid, {_fts_cols}) VALUES ('delete', old.id, {_fts_old});
+            INSERT INTO case_records_fts (rowid, {_fts_cols}) VALUES (new.id, {_fts_new});
+        END""",
+]
+
+# Is tables mein same key ka naya row purane ko update karta hai (INSERT ... ON CONFLICT DO UPDATE)
+UPSERT_KEYS = {"case_records": "case_key", "documents": "source"}
+
+LOG_COLUMNS = ("id", "ts", "source", "case_type", "case_number", "filing_year", "result_ok", "latest_pdf")
+_LOG_SELECT = ("s.id", "datetime(s.ts, 'unixepoch', 'localtime')",
+               "CASE s.source " + " ".join(f"WHEN {k} THEN '{v}'" for k, v in SOURCE_NAMES.items()) + " END",
+               "k.case_type", "k.case_number", "k.filing_year", "s.ok", "s.latest_pdf")
+
+# Writer in columns ka content blob store mein rakhta hai aur row mein sirf hash likhta hai
+BLOB_TEXT_COLUMNS = {"snapshots": {"html": "html_hash"}}
+BLOB_FILE_COLUMNS = {"snapshots": {"pdf_path": "pdf_hash"}}
+
+# Writer in tables ke rows ki case identity (IDENTITY_COLUMNS) ko `cases` ki id (case_id) mein badalta hai.
+# True: identity columns row se hat jaate hain (snapshots); False: rehte hain (case_records unhe search mein dikhata hai).
+IDENTITY_COLUMNS = ("court", "case_type", "case_number", "filing_year", "cnr")
+CASE_TABLES = {"snapshots": True, "case_records": False}
+CASE_NUMBER = re.compile(r"0*(\d+)(?:\s*/\s*(\d{4}))?")
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def add_missing_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def ensure_schema(conn):
+    with conn:
+        for ddl in TABLES.values():
+            conn.execute(ddl)
+        for table, columns in COLUMNS.items():
+            add_missing_columns(conn, table, columns)
+        for ddl in INDEXES:
+            conn.execute(ddl)
+    try:
+        with conn:
+            for ddl in FTS_DDL:
+                conn.execute(ddl)
+    except sqlite3.OperationalError as e:
+        print(f"[storage] full-text index unavailable ({e}); case search will use LIKE")
+    from migrations import migrate  # migrations.py storage ko import karta hai
+    migrate(conn)
+
+
+def has_fts(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'case_records_fts'").fetchone() is not None
+
+
+def insert_sql(table, columns):
+    """INSERT statement; UPSERT_KEYS wale tables mein key conflict par baaki columns update hote hain."""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    key = UPSERT_KEYS.get(table)
+    if key in columns:
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+        sql += f" ON CONFLICT({key}) DO UPDATE SET {updates}"
+    return sql
+
+
+def case_identity(court, case_type, case_number, filing_year, cnr=""):
+    """Normalized case identity (court, TYPE, number int, year int, CNR). Registration number "45/2024" se number
+    (aur year na diya ho toh year bhi). Number/year samajh na aaye toh dono None: tab case sirf CNR se pehchana jaata hai."""
+    m = CASE_NUMBER.fullmatch(str(case_number or "").strip())
+    year = str(filing_year or "").strip()
+    number = int(m.group(1)) if m else None
+    year = int(year) if len(year) == 4 and year.isdigit() else (int(m.group(2)) if m and m.group(2) else None)
+    if number is None or year is None:
+        number = year = None
+    return (str(court or "").strip(), str(case_type or "").strip().upper(), number, year, str(cnr or "").strip().upper() or None)
+
+
+def _find_case(conn, identity):
+    court, case_type, number, year, cnr = identity
+    if number is not None:
+        row = conn.execute(
+            "SELECT k.id FROM cases k JOIN courts c ON c.id = k.court_id "
+            "WHERE c.name = ? AND k.case_type = ? AND k.case_number = ? AND k.filing_year = ?",
+            (court, case_type, number, year),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+    if cnr is not None:
+        row = conn.execute("SELECT id FROM cases WHERE cnr = ?", (cnr,)).fetchone()
+        if row is not None:
+            return row[0]
+    return None
+
+
+def find_case(conn, court, case_type, case_number, filing_year, cnr=""):
+    """`cases` ki id, ya None agar ye case kabhi log nahi hua. Sirf padhta hai."""
+    return _find_case(conn, case_identity(court, case_type, case_number, filing_year, cnr))
+
+
+def resolve_case(conn, court, case_type, case_number, filing_year, cnr="", cache=None):
+    """find_case jaisa, par case na ho toh bana deta hai; number aur CNR dono na hon toh None (case mein nahi jaata).
+    `cache` (dict) writer thread ka identity -> id map hai; transaction rollback ho toh caller use khali kare."""
+    identity = case_identity(court, case_type, case_number, filing_year, cnr)
+    if cache is not None and identity in cache:
+        return cache[identity]
+    court, case_type, number, year, cnr = identity
+    if number is None and cnr is None:
+        return None
+    case_id = _find_case(conn, identity)
+    if case_id is None:
+        conn.execute("INSERT INTO courts (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (court,))
+        court_id = conn.execute("SELECT id FROM courts WHERE name = ?", (court,)).fetchone()[0]
+        case_id = conn.execute(
+            "INSERT INTO cases (court_id, case_type, case_number, filing_year, cnr) VALUES (?, ?, ?, ?, ?)",
+            (court_id, case_type, number, year, cnr),
+        ).lastrowid
+    else:
+        # Pehle sirf number ya sirf CNR se dekha gaya case: ab doosra bhi pata hai toh jod do
+        if cnr is not None:
+            conn.execute("UPDATE cases SET cnr = ? WHERE id = ? AND cnr IS NULL AND NOT EXISTS (SELECT 1 FROM cases WHERE cnr = ?)",
+                         (cnr, case_id, cnr))
+        if number is not None:
+            conn.execute("UPDATE cases SET case_type = ?, case_number = ?, filing_year = ? WHERE id = ? AND case_number IS NULL",
+                         (case_type, number, year, case_id))
+    if cache is not None:
+        if len(cache) >= CASE_ID_CACHE:
+            cache.clear()
+        cache[identity] = case_id
+    return case_id
+
+
+def write_rows(conn, rows, cache=None):
+    """(table, row dict) rows likhta hai; transaction caller ka. CASE_TABLES ke rows ko case_id milti hai, aur
+    case_records row ki `parties` list [(role, name), ...] us case ke parties ki jagah le leti hai."""
+    groups, parties = {}, []
+    for table, row in rows:
+        if table in CASE_TABLES:
+            row = dict(row)
+            values = [row.pop(c, "") if CASE_TABLES[table] else row.get(c, "") for c in IDENTITY_COLUMNS]
+            row["case_id"] = resolve_case(conn, *values, cache=cache)
+            if "parties" in row:
+                parties.append((row["case_id"], row.pop("parties")))
+        groups.setdefault((table, tuple(row)), []).append(tuple(row.values()))
+    for (table, columns), values in groups.items():
+        conn.executemany(insert_sql(table, columns), values)
+    for case_id, names in parties:
+        if case_id is not None:
+            replace_parties(conn, case_id, names)
+
+
+def replace_parties(conn, case_id, names):
+    """Case ke parties [(role, name), ...] se badal deta hai (khaali naam chhod kar)."""
+    conn.execute("DELETE FROM parties WHERE case_id = ?", (case_id,))
+    conn.executemany("INSERT INTO parties (case_id, role, position, name) VALUES (?, ?, ?, ?)",
+                     [(case_id, role, i, name) for i, (role, name) in enumerate(names) if name])
+
+
+def query_log_page(conn, before_id=None, limit=LOG_PAGE_SIZE, case_type=None, filing_year=None, result_ok=None):
+    """Lookup log (saare sources ke snapshots) ka ek page, newest first. Keyset pagination: `before_id` se purane rows
+    (OFFSET nahi). (rows, agle page ka before_id ya None) return karta hai; rows ke columns LOG_COLUMNS ke order mein."""
+    where, args = [], []
+    for clause, value in (("s.id < ?", before_id), ("k.case_type = upper(?)", case_type),
+                          ("k.filing_year = ?", filing_year), ("s.ok = ?", result_ok)):
+        if value is not None:
+            where.append(clause)
+            args.append(value)
+    sql = f"SELECT {', '.join(_LOG_SELECT)} FROM snapshots s LEFT JOIN cases k ON k.id = s.case_id"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    rows = conn.execute(sql + " ORDER BY s.id DESC LIMIT ?", args + [limit + 1]).fetchall()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1][0]
+    return rows, None
+
+
+class LogWriter:
+    """Background SQLite writer. `submit()` sirf queue mein daalta hai; thread batches mein commit karta hai."""
+
+    _STOP = object()
+
+    def __init__(self, path=DB_PATH, maxsize=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, blobs=None):
+        self.path = path
+        self.blobs = blobs or BlobStore(BLOB_DIR)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.last_error = None
+        self._case_ids = {}
+        self._queue = queue.Queue(maxsize)
+        self._ready = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="sqlite-log-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        atexit.register(self.close)
+
+    def submit(self, table, row, timeout=PUT_TIMEOUT):
+        """Row (dict) ko queue karta hai. Queue bhari ho aur `timeout` tak jagah na mile toh False (row drop).
+        Asyncio event loop ke andar se bulaya jaaye toh kabhi nahi rukta (poora scrape loop ruk jaata): turant False."""
+        if self._closed:
+            return False
+        if timeout and _in_event_loop():
+            timeout = 0
+        try:
+            if timeout:
+                self._queue.put((table, row), timeout=timeout)
+            else:
+                self._queue.put_nowait((table, row))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        """Ab tak submit hue saare rows ke commit hone tak rukta hai."""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self):
+        conn = None
+        try:
+            conn = connect(self.path)
+            ensure_schema(conn)
+            # Purane rows ki copy alag thread mein: submit karne wale (event loop samet) is ka intezaar nahi karte
+            from migrations import copy_in_background
+            copy_in_background(self.path, self.blobs)
+        except Exception as e:
+            self.last_error = e
+            print(f"[storage] writer setup failed: {e}")
+        finally:
+            self._ready.set()
+        stop = False
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Jo kuch already queue mein hai, ek hi transaction mein
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is self._STOP for item in batch)
+            rows = [item for item in batch if item is not self._STOP]
+            try:
+                conn = conn or connect(self.path)
+                self._write(conn, rows)
+            except Exception as e:
+                # Thread zinda rehna chahiye: ye mar gaya toh flush()/close() hamesha ke liye ruk jaate hain
+                self._case_ids.clear()
+                self.failed += len(rows)
+                self.last_error = e
+                print(f"[storage] batch of {len(rows)} rows dropped: {type(e).__name__}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if conn is not None:
+            conn.close()
+
+    def _to_blobs(self, table, row):
+        """HTML snapshot aur PDF file ko blob store mein daal kar row mein unka hash rakhta hai."""
+        row = dict(row)
+        for column, hash_column in BLOB_TEXT_COLUMNS.get(table, {}).items():
+            text = row.pop(column, None)
+            if text:
+                row[hash_column] = self.blobs.put_text(text)
+        for column, hash_column in BLOB_FILE_COLUMNS.get(table, {}).items():
+            file_path = row.get(column)
+            if file_path and hash_column not in row and os.path.exists(file_path):
+                row[hash_column] = self.blobs.put_file(file_path)
+        return row
+
+    def _write(self, conn, rows):
+        if not rows:
+            return
+        prepared = []
+        for table, row in rows:
+            try:
+                row = self._to_blobs(table, row)
+            except OSError as e:
+                self.last_error = e
+                print(f"[storage] blob write failed, logging the {table} row without its snapshot: {e}")
+                row = {k: v for k, v in row.items() if k not in BLOB_TEXT_COLUMNS.get(table, {})}
+            prepared.append((table, row))
+        try:
+            with conn:
+                write_rows(conn, prepared, self._case_ids)
+            self.written += len(prepared)
+        except sqlite3.Error as e:
+            self._case_ids.clear()  # rollback mein bane cases ab DB mein nahi hain
+            self.last_error = e
+            print(f"[storage] batch of {len(rows)} rows failed ({e}); retrying row by row")
+            self._write_each(conn, prepared)
+
+    def _write_each(self, conn, rows):
+        """Batch fail hone par: har row apne transaction mein, taaki ek kharab row baaki batch na le doobe."""
+        for table, row in rows:
+            try:
+                with conn:
+                    write_rows(conn, [(table, row)], self._case_ids)
+                self.written += 1
+            except sqlite3.Error as e:
+                self._case_ids.clear()
+                self.failed += 1
+                self.last_error = e
+                print(f"[storage] {table} row dropped: {e}")
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path=DB_PATH):
+    """Process-wide ek writer per DB file."""
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None or writer._closed:
+            writer = _writers[path] = LogWriter(path)
+        return writer
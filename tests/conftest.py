@@ -0,0 +1,64 @@
+# tests/conftest.py
+# Tests repo ke top-level modules seedhe import karte hain. Har test apni tmp directory mein chalta hai, taaki
+# queries.db, blobs/ jaise relative defaults asli data ko kabhi na chhooyein.
+#
+#   py -m pytest -q
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from blobstore import BlobStore  # noqa: E402
+from storage import SOURCE_APP, connect, ensure_schema  # noqa: E402
+
+FIXTURE_HTML = os.path.join(ROOT, "benchmarks", "fixtures", "case_detail.html")
+
+
+@pytest.fixture(autouse=True)
+def in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def case_html():
+    with open(FIXTURE_HTML, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queries.db")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = connect(db_path)
+    ensure_schema(conn)
+    yield conn
+    conn.close()
+
+
+def snapshot_row(n, case_type="CS", number=None, year="2024", ok=1, source=SOURCE_APP, html=None):
+    """Writer ke liye snapshot row; `n` se ts aur (na diya ho toh) case number. `html` writer blob store mein daal kar
+    html_hash banata hai, isliye sirf diya ho tab."""
+    row = {"ts": 1_700_000_000 + n, "source": source, "court": "Gaya District Court", "case_type": case_type,
+           "case_number": str(n) if number is None else number, "filing_year": year, "ok": ok, "latest_pdf": None}
+    if html is not None:
+        row["html"] = html
+    return row
+
+
+@pytest.fixture
+def snapshot():
+    return snapshot_row
@@ -0,0 +1,57 @@
+# tests/test_blobstore.py
+# Blob store: same content ek hi file, stream/bytes ka same hash, aur purane inline HTML columns ka migrate.
+
+import gzip
+import hashlib
+import io
+import os
+
+from blobstore import BlobStore, migrate_inline_html
+from storage import TABLES, connect
+
+
+def blob_files(store):
+    return sorted(os.path.join(d, f) for d, _, files in os.walk(store.root) for f in files)
+
+
+def test_same_content_stored_once(blobs):
+    html = "<html>" + "case " * 1000 + "</html>"
+    digest = blobs.put_text(html)
+    assert digest == hashlib.sha256(html.encode("utf-8")).hexdigest()
+    assert blobs.put_text(html) == digest
+    assert blobs.put_stream(io.BytesIO(html.encode("utf-8"))) == digest
+    assert blob_files(blobs) == [blobs.path(digest)]  # tmp files bhi nahi bache
+    assert os.path.getsize(blobs.path(digest)) < len(html) / 10
+    assert blobs.read_text(digest) == html
+    assert blobs.put_text(html + " ") != digest and len(blob_files(blobs)) == 2
+
+
+def test_stream_and_export(blobs, tmp_path):
+    data = os.urandom(200_000)
+    source = tmp_path / "order.pdf"
+    source.write_bytes(data)
+    digest = blobs.put_file(str(source))
+    assert b"".join(blobs.iter_chunks(digest, size=4096)) == data
+    with open(blobs.path(digest), "rb") as f:
+        assert gzip.decompress(f.read()) == data
+    assert open(blobs.export(digest, str(tmp_path / "copy.pdf")), "rb").read() == data
+    assert not blobs.exists("") and not blobs.exists("0" * 64)
+
+
+def test_migrate_inline_html(db_path, tmp_path):
+    conn = connect(db_path)
+    with conn:
+        conn.execute(TABLES["queries"])
+        conn.executemany("INSERT INTO queries (ts, court, case_type, case_number, filing_year, result_ok, html) "
+                         "VALUES ('2025-03-01T10:00:00', 'Gaya', 'CS', ?, '2024', 1, ?)",
+                         [("1", "<p>same</p>"), ("2", "<p>same</p>"), ("3", ""), ("4", "<p>other</p>")])
+    conn.close()
+    store = BlobStore(str(tmp_path / "moved"))
+    assert migrate_inline_html(db_path, store, chunk=1) == 3
+    assert migrate_inline_html(db_path, store) == 0
+    conn = connect(db_path)
+    rows = conn.execute("SELECT html, html_hash FROM queries ORDER BY id").fetchall()
+    conn.close()
+    assert [html for html, _ in rows] == [None, None, "", None]
+    assert rows[0][1] == rows[1][1] and len(blob_files(store)) == 2
+    assert store.read_text(rows[3][1]) == "<p>other</p>"
@@ -0,0 +1,164 @@
+# tests/test_browser_pool.py
+# BrowserManager ka context bookkeeping: ek session = ek context (saath aaye calls par bhi), LRU eviction, warm pages,
+# jobs ko saunpe (pinned) pages eviction se bache rehte hain, aur session ke handoffs ki limit. Chromium ki jagah chhota
+# fake browser (manager sirf us ke yeh methods chhoota hai).
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+
+import browser_pool  # noqa: E402
+from browser_pool import BrowserManager, HandoffLimit, PoolExhausted  # noqa: E402
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    def __init__(self):
+        self.page = FakePage()
+
+    async def new_page(self):
+        return self.page
+
+    async def close(self):
+        self.page.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self):
+        await asyncio.sleep(0.01)  # asli browser ki tarah beech mein doosre calls chal sakein
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.browser = FakeBrowser()
+        self.chromium = self
+
+    async def start(self):
+        return self
+
+    async def launch(self, **kwargs):
+        return self.browser
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: playwright)
+    return playwright.browser
+
+
+@pytest.fixture
+def make_manager(browser):
+    managers = []
+
+    def make(**kwargs):
+        managers.append(BrowserManager(**kwargs))
+        return managers[-1]
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+async def current_page(page):
+    return page
+
+
+def test_concurrent_calls_share_one_context(make_manager, browser):
+    manager = make_manager(max_contexts=4)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.call("a", current_page))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(browser.contexts) == 1 and len(set(map(id, results))) == 1
+    assert manager.stats()["contexts"] == 1
+
+
+def test_full_pool_evicts_least_recently_used(make_manager):
+    manager = make_manager(max_contexts=2)
+    a = manager.call("a", current_page)
+    b = manager.call("b", current_page)
+    manager.call("a", current_page)
+    manager.call("c", current_page)
+    assert b.is_closed() and not a.is_closed()
+    # "b" lautne par naya context paata hai
+    assert manager.call("b", current_page) is not b
+
+
+def test_warm_pages(make_manager, browser):
+    async def warmup(page):
+        return {"captcha_src": f"captcha-{id(page)}"}
+
+    manager = make_manager(max_contexts=3, warm_size=1, warmup=warmup)
+    deadline = time.monotonic() + 2
+    while manager.stats()["warm"] < 1:
+        assert time.monotonic() < deadline, "no warm page"
+        time.sleep(0.01)
+    info = manager.claim_warm("a")
+    assert info["captcha_src"] == f"captcha-{id(manager.call('a', current_page))}"
+    assert manager.stats()["contexts"] == 1
+
+
+def test_eviction_skips_queued_job_page(make_manager):
+    manager = make_manager(max_contexts=2, max_handoffs=1)
+    job_page = manager.call("a", current_page)  # user ne is page par CAPTCHA padha
+    assert manager.handoff("a", "job-1") is True
+    other = manager.call("b", current_page)
+    # Pool bhara: naya session "b" ka idle context leta hai, queue mein pade job ka nahi
+    manager.call("c", current_page)
+    assert other.is_closed() and not job_page.is_closed()
+    assert manager.call("job-1", current_page) is job_page
+    assert manager.stats()["pinned"] == 1
+
+    manager.release("job-1")
+    assert job_page.is_closed() and manager.stats()["pinned"] == 0
+
+
+def test_handoff_limit_keeps_session_page(make_manager):
+    manager = make_manager(max_contexts=4, max_handoffs=1)
+    manager.call("a", current_page)
+    manager.handoff("a", "job-1")
+    page = manager.call("a", current_page)
+    with pytest.raises(HandoffLimit):
+        manager.handoff("a", "job-2")
+    assert manager.call("a", current_page) is page and not page.is_closed()
+    manager.release("job-1")
+    assert manager.handoff("a", "job-2") is True
+    assert manager.handoff("nobody", "job-3") is False
+
+
+def test_pinned_pages_count_toward_pool(make_manager):
+    manager = make_manager(max_contexts=2, max_handoffs=2)
+    for job in ("job-1", "job-2"):
+        manager.call("a", current_page)
+        manager.handoff("a", job)
+    with pytest.raises(PoolExhausted):
+        manager.call("b", current_page)
+    manager.release("job-1")
+    assert not manager.call("b", current_page).is_closed()
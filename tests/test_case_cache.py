@@ -0,0 +1,71 @@
+# tests/test_case_cache.py
+# CaseCache: memory tier ka LRU, DB tier (cases/snapshots + blob) ka TTL, aur invalidate.
+
+import time
+
+import pytest
+
+from case_cache import CaseCache, case_key
+from storage import SOURCE_APP, write_rows
+
+COURT = "Gaya District Court"
+
+
+@pytest.fixture
+def cache(conn, db_path, blobs):
+    return CaseCache(db_path, ttl=3600, max_entries=2, blobs=blobs)
+
+
+def log_snapshot(conn, blobs, html, ts, number="45", ok=1):
+    with conn:
+        write_rows(conn, [("snapshots", {"ts": int(ts), "source": SOURCE_APP, "court": COURT, "case_type": "CS",
+                                         "case_number": number, "filing_year": "2024", "ok": ok,
+                                         "html_hash": blobs.put_text(html), "latest_pdf": None})])
+
+
+def test_case_key_normalizes():
+    assert case_key(" Gaya District Court ", "cs", "0045", "2024") == case_key("gaya district court", "CS", "45", 2024)
+
+
+def test_memory_tier_lru(cache):
+    for n in ("1", "2", "3"):
+        cache.put(COURT, "CS", n, "2024", {"n": n})
+    assert cache.get(COURT, "CS", "1", "2024") is None  # sabse purana nikal gaya
+    hit = cache.get(COURT, "CS", "3", "2024")
+    assert hit.tier == "memory" and hit.result == {"n": "3"}
+    cache.get(COURT, "CS", "2", "2024")
+    cache.put(COURT, "CS", "4", "2024", {"n": "4"})
+    assert cache.get(COURT, "CS", "3", "2024") is None  # "2" abhi use hua tha, "3" LRU tha
+    assert cache.get(COURT, "CS", "2", "2024").result == {"n": "2"}
+
+
+def test_memory_tier_ttl(cache):
+    cache.put(COURT, "CS", "1", "2024", {"n": "1"})
+    assert cache.get(COURT, "CS", "1", "2024", ttl=-1) is None
+    assert cache.get(COURT, "CS", "1", "2024") is None  # expire hua entry hat chuka
+
+
+def test_database_tier(cache, conn, blobs, case_html):
+    log_snapshot(conn, blobs, case_html, time.time() - 60)
+    hit = cache.get(COURT, "cs", "045", "2024")
+    assert hit.tier == "database" and 55 <= hit.age <= 120
+    assert hit.result["petitioner"] == "Ram Kumar"
+    assert cache.get(COURT, "CS", "45", "2024").tier == "memory"
+
+
+def test_database_tier_ttl_and_failures(cache, conn, blobs, case_html):
+    log_snapshot(conn, blobs, case_html, time.time() - 7200)
+    assert cache.get(COURT, "CS", "45", "2024") is None
+    log_snapshot(conn, blobs, "<p>Invalid Captcha</p>", time.time(), ok=0)
+    assert cache.get(COURT, "CS", "45", "2024") is None
+    assert cache.get(COURT, "CS", "46", "2024") is None
+
+
+def test_invalidate(cache, conn, blobs, case_html):
+    log_snapshot(conn, blobs, case_html, time.time() - 60)
+    assert cache.get(COURT, "CS", "45", "2024") is not None
+    cache.invalidate(COURT, "CS", "45", "2024")
+    assert cache.get(COURT, "CS", "45", "2024") is None
+    # Invalidation ke baad ka snapshot phir valid hai
+    log_snapshot(conn, blobs, case_html, time.time() + 5)
+    assert cache.get(COURT, "CS", "45", "2024").tier == "database"
@@ -0,0 +1,72 @@
+# tests/test_case_parser.py
+# case_parser ka output benchmarks/fixtures/case_detail.html par, aur seedhi table rows wala fast path.
+
+from case_parser import ActSection, Hearing, Order, parse_case, parse_case_html
+
+ECOURTS = "https://services.ecourts.gov.in"
+
+
+def test_fixture_fields(case_html):
+    record = parse_case(case_html)
+    assert (record.petitioner, record.respondent) == ("Ram Kumar", "State of Bihar & Ors.")
+    assert record.petitioner_advocates == ["S. Prasad"]
+    assert record.case_type == "CS - Civil Suit"
+    assert record.cnr == "BRGA010001232024"
+    assert (record.filing_number, record.filing_date) == ("123/2024", "12-01-2024")
+    assert (record.registration_number, record.registration_date) == ("45/2024", "15-01-2024")
+    assert record.first_hearing == "20th January 2024"
+    assert record.next_hearing == "05th November 2026"
+    assert record.case_status == "Evidence"
+    assert record.court == "3-Civil Judge Gaya"
+    assert record.decision_date == ""
+
+
+def test_fixture_tables(case_html):
+    record = parse_case(case_html)
+    assert record.hearings == [
+        Hearing("Civil Judge", "20-01-2024", "15-02-2024", "Appearance"),
+        Hearing("Civil Judge", "15-02-2024", "05-11-2026", "Evidence"),
+    ]
+    assert record.orders == [
+        Order("1", "20-01-2024", "Copy of order", f"{ECOURTS}/ecourtindia_v6/display_pdf.php?f=a1"),
+        Order("2", "15-02-2024", "Copy of order", f"{ECOURTS}/orders/o2.pdf"),
+    ]
+    assert record.acts == [ActSection("Indian Penal Code", "420,406")]
+    # Aakhri order sabse naya
+    assert record.latest_pdf == f"{ECOURTS}/orders/o2.pdf"
+    assert record.pdf_links == [f"{ECOURTS}/ecourtindia_v6/display_pdf.php?f=a1", f"{ECOURTS}/orders/o2.pdf"]
+
+
+def test_base_url(case_html):
+    record = parse_case(case_html, "https://gaya.dcourts.gov.in")
+    assert record.latest_pdf == "https://gaya.dcourts.gov.in/orders/o2.pdf"
+
+
+def test_parse_case_html_dict(case_html):
+    result = parse_case_html(case_html)
+    assert result["success"] is True
+    assert result["html"] == case_html
+    assert result["petitioner"] == "Ram Kumar"
+    assert result["latest_pdf"].endswith("/orders/o2.pdf")
+
+
+def test_script_and_comments_ignored():
+    html = ("<script>document.write('<td>Petitioner: X</td>')</script><!-- Petitioner: Y -->"
+            "<table><tr><td>Petitioner</td><td>Z</td></tr></table>")
+    assert parse_case(html).petitioner == "Z"
+
+
+def test_not_a_case_page():
+    result = parse_case_html("<html><body><p class='error'>Invalid Captcha</p></body></html>")
+    assert result["success"] is False
+    assert result["latest_pdf"] == ""
+
+
+def test_plain_rows_match_marked_up_rows():
+    header = "<table><tr><th>Judge</th><th>Business on Date</th><th>Hearing Date</th><th>Purpose of Hearing</th></tr>"
+    plain = header + "<tr><td>Civil Judge</td><td>01-03-2024</td><td>02-04-2024</td><td>Evidence &amp; Args</td></tr></table>"
+    marked = header + ("<tr><td><b>Civil</b> Judge</td><td>01-03-2024</td><td><span>02-04-2024</span></td>"
+                       "<td>Evidence &amp; Args</td></tr></table>")
+    assert parse_case(plain).hearings == parse_case(marked).hearings == [
+        Hearing("Civil Judge", "01-03-2024", "02-04-2024", "Evidence & Args"),
+    ]
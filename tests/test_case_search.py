@@ -0,0 +1,91 @@
+# tests/test_case_search.py
+# case_search: writer se index, bm25 ranking, FTS5 triggers (upsert/delete), backfill ka dobara chalna, aur FTS5 na ho
+# toh LIKE fallback.
+
+import storage
+from case_search import backfill, index_case, record_row, search_cases
+from storage import LogWriter, connect, ensure_schema, has_fts, write_rows
+
+COURT = "Gaya District Court"
+
+
+def parsed(petitioner, respondent="State of Bihar", cnr="", advocates=(), acts=(), status="Evidence"):
+    return {"success": True, "petitioner": petitioner, "respondent": respondent, "cnr": cnr,
+            "petitioner_advocates": list(advocates), "respondent_advocates": [], "case_status": status,
+            "acts": [{"act": a, "section": ""} for a in acts], "next_hearing": "05th November 2026"}
+
+
+def index(conn, number, result, case_type="CS"):
+    with conn:
+        write_rows(conn, [("case_records", record_row(COURT, case_type, str(number), "2024", result, "2025-03-01T10:00:00"))])
+
+
+def found(conn, text, **kwargs):
+    return [(r["case_type"], r["case_number"]) for r in search_cases(conn, text, **kwargs)]
+
+
+def test_index_case_through_writer(db_path, blobs):
+    writer = LogWriter(db_path, flush_interval=0.05, blobs=blobs)
+    try:
+        assert index_case(writer, COURT, "CS", "45", "2024", parsed("Ram Kumar", advocates=["S. Prasad"]), "2025-03-01T10:00:00")
+        assert index_case(writer, COURT, "CS", "46", "2024", {"success": False}, "2025-03-01T10:00:00") is False
+        writer.flush()
+    finally:
+        writer.close()
+    conn = connect(db_path)
+    assert found(conn, "ram kumar") == [("CS", 45)]
+    assert found(conn, "prasad") == [("CS", 45)]
+    assert conn.execute("SELECT count(*) FROM parties").fetchone()[0] == 3
+    conn.close()
+
+
+def test_party_name_ranks_above_other_columns(conn):
+    index(conn, 1, parsed("Sita Devi", acts=["Kumar Land Act"]))
+    index(conn, 2, parsed("Mohan Kumar"))
+    index(conn, 3, parsed("Rajesh Singh"))
+    assert found(conn, "kumar") == [("CS", 2), ("CS", 1)]
+    assert found(conn, "kum") == [("CS", 2), ("CS", 1)]  # prefix
+    assert found(conn, 'mohan "kumar') == [("CS", 2)]     # quotes/operators error nahi dete
+    assert found(conn, "kumar", case_type="cr") == []
+    assert found(conn, "  ") == []
+
+
+def test_triggers_follow_update_and_delete(conn):
+    index(conn, 1, parsed("Ram Kumar"))
+    index(conn, 1, parsed("Shyam Lal"))  # same case_key: upsert
+    assert conn.execute("SELECT count(*) FROM case_records").fetchone()[0] == 1
+    assert found(conn, "ram") == []
+    assert found(conn, "shyam") == [("CS", 1)]
+    # Sirf case_id badalne par index nahi chhoota (aur integrity bani rehti hai)
+    with conn:
+        conn.execute("UPDATE case_records SET case_id = case_id")
+        conn.execute("INSERT INTO case_records_fts (case_records_fts) VALUES ('integrity-check')")
+    with conn:
+        conn.execute("DELETE FROM case_records")
+    assert found(conn, "shyam") == []
+
+
+def test_backfill_twice_does_not_duplicate(conn, db_path, blobs, case_html, snapshot):
+    with conn:
+        write_rows(conn, [("snapshots", {**snapshot(1, number="45"), "html_hash": blobs.put_text(case_html)}),
+                          ("snapshots", {**snapshot(2, number="45"), "html_hash": blobs.put_text(case_html)}),
+                          ("snapshots", {**snapshot(3, number="46", ok=0), "html_hash": blobs.put_text("<p>error</p>")})])
+    assert backfill(db_path, blobs=blobs) == 2
+    assert backfill(db_path, blobs=blobs) == 2
+    assert conn.execute("SELECT count(*) FROM case_records").fetchone()[0] == 1
+    assert found(conn, "ram kumar") == [("CS", 45)]
+    assert conn.execute("SELECT count(*) FROM case_records_fts WHERE case_records_fts MATCH 'ram'").fetchone()[0] == 1
+
+
+def test_like_fallback_without_fts5(db_path, monkeypatch):
+    # SQLite bina FTS5 ke: virtual table banana fail hota hai aur search LIKE par chalta hai
+    monkeypatch.setattr(storage, "FTS_DDL", ["CREATE VIRTUAL TABLE case_records_fts USING no_such_module (x)"])
+    conn = connect(db_path)
+    ensure_schema(conn)
+    assert not has_fts(conn)
+    index(conn, 1, parsed("Ram Kumar", cnr="BRGA010000012024"))
+    index(conn, 2, parsed("Sita Devi", advocates=["Ram Prasad"]))
+    assert sorted(found(conn, "ram")) == [("CS", 1), ("CS", 2)]
+    assert found(conn, "ram kumar") == [("CS", 1)]
+    assert found(conn, "brga01000001") == [("CS", 1)]
+    conn.close()
@@ -0,0 +1,88 @@
+# tests/test_http_backend.py
+# Direct HTTP backend, benchmarks/fixture_server.py ke local portal ke khilaaf: recorded POSTs mein se search chunna,
+# form ka replay (naam se bind), result list se detail, CAPTCHA reject par SessionExpired, aur parallel lookup_many.
+
+import pytest
+
+pytest.importorskip("requests")
+
+from fixture_server import TEST_CAPTCHA, CaseStore, FixtureServer  # noqa: E402
+from http_backend import SEARCH_FIELDS, PortalSession, RecordedRequest, Recorder, SessionExpired  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FixtureServer(CaseStore.build(synthetic=6)).start()
+    yield server
+    server.stop()
+
+
+def recorded_session(server, captcha=TEST_CAPTCHA):
+    """Browser ne jo POST bheja hota wahi form: case 1 (type 100) ki search, phir us ki detail."""
+    cnr = server.httpd.store.cases[0]["cnr"]
+    search = RecordedRequest(server.url + "/search", {"Content-Type": "application/x-www-form-urlencoded"}, [
+        ("est_code", "BRGA01"), ("case_type", "100"), ("year", ""), ("reg_no", "1"), ("reg_year", "2024"),
+        ("captcha", captcha), ("page", "1"),
+    ]).bind({"case_type": "100", "case_number": "1", "year": "2024", "captcha": captcha}, SEARCH_FIELDS)
+    detail = RecordedRequest(server.url + "/detail", {}, [("cino", cnr)]).bind({"data-cno": cnr})
+    return PortalSession([], search, detail, pool_size=4)
+
+
+def test_binds_by_name(server):
+    session = recorded_session(server)
+    form = dict(session.search_request.build({"case_type": "101", "case_number": "2", "year": "2024"}))
+    # case number "1" page number "1" se ittefaq se nahi judta
+    assert (form["reg_no"], form["page"], form["case_type"], form["reg_year"]) == ("2", "1", "101", "2024")
+    # CAPTCHA na diya ho toh session ka apna recorded CAPTCHA (app doosre page ka CAPTCHA nahi bhejta)
+    assert form["captcha"] == TEST_CAPTCHA
+    session.close()
+
+
+def test_lookup_follows_detail(server):
+    store = server.httpd.store
+    session = recorded_session(server)
+    result = session.lookup(case_type="101", case_number="1", year="2024")
+    assert result["success"] and result["cnr"] == store.cases[1]["cnr"]
+    assert not session.lookup(case_type="101", case_number="99", year="2024")["success"]
+    session.close()
+
+
+def test_rejected_captcha_expires_session(server):
+    session = recorded_session(server, captcha="WRONG")
+    with pytest.raises(SessionExpired):
+        session.lookup(case_type="100", case_number="1", year="2024")
+    session.close()
+
+
+def test_lookup_many(server):
+    store = server.httpd.store
+    session = recorded_session(server)
+    items = [{"case_type": c["case_type"], "case_number": c["reg_no"], "year": c["year"]} for c in store.cases]
+    results = {(values["case_type"], values["case_number"]): result for values, result in session.lookup_many(items)}
+    assert {key: r["cnr"] for key, r in results.items()} == {(c["case_type"], c["reg_no"]): c["cnr"] for c in store.cases}
+    session.close()
+
+
+def test_recorder_skips_dropdown_ajax_posts(server):
+    """Asli portal dropdown AJAX se bharta hai: woh POSTs bhi est_code bhejte hain aur search se pehle record hote hain."""
+    store = server.httpd.store
+    cnr = store.cases[0]["cnr"]
+    recorder = Recorder()
+    form = {"Content-Type": "application/x-www-form-urlencoded"}
+    recorder.posts = [
+        RecordedRequest(server.url + "/options", form, [("state_code", "8"), ("est_code", "BRGA01")]),
+        RecordedRequest(server.url + "/options", form, [("est_code", "BRGA01"), ("case_type", "100"), ("year", "2024")]),
+        RecordedRequest(server.url + "/search", form, [
+            ("est_code", "BRGA01"), ("case_type", "100"), ("reg_no", "1"), ("reg_year", "2024"), ("captcha", TEST_CAPTCHA),
+            ("page", "1")]),
+        RecordedRequest(server.url + "/detail", form, [("cino", cnr)]),
+    ]
+    values = {"establishment": "BRGA01", "case_type": "100", "case_number": "1", "year": "2024", "captcha": TEST_CAPTCHA}
+    assert recorder.find(values, fields=SEARCH_FIELDS) is recorder.posts[2]
+    # CAPTCHA value na ho (pehle capture) tab bhi naam se jude fields zyada hone par search hi
+    assert recorder.find({k: v for k, v in values.items() if k != "captcha"}, fields=SEARCH_FIELDS) is recorder.posts[2]
+
+    session = PortalSession.from_recorder(recorder, [], values, row={"data-cno": cnr})
+    assert session.search_request is recorder.posts[2] and session.detail_request is recorder.posts[3]
+    assert session.lookup(case_type="101", case_number="1", year="2024")["cnr"] == store.cases[1]["cnr"]
+    session.close()
@@ -0,0 +1,67 @@
+# tests/test_jobs.py
+# JobQueue: submit turant id deta hai, worker progress/result/error job par likhta hai, aur session-wise list.
+
+import threading
+import time
+
+import pytest
+
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+def wait_for(queue, job_id, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not queue.get(job_id).finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return queue.get(job_id)
+
+
+@pytest.fixture
+def jobs():
+    return JobQueue(workers=1, keep=2)
+
+
+def test_job_lifecycle(jobs):
+    started, release = threading.Event(), threading.Event()
+
+    def work(progress, n):
+        progress("fetching")
+        started.set()
+        release.wait(2)
+        return n * 2
+
+    job_id = jobs.submit("s1", "CS/1/2024", work, 21)
+    queued = jobs.submit("s1", "CS/2/2024", lambda progress: None)
+    started.wait(2)
+    running = jobs.get(job_id)
+    assert (running.status, running.stage) == (RUNNING, "fetching")
+    assert jobs.get(queued).status == QUEUED
+    assert jobs.pending("s1") == 2 and jobs.pending("s2") == 0
+    running.stage = "changed"  # copy hai, queue ka job nahi badalta
+    assert jobs.get(job_id).stage == "fetching"
+
+    release.set()
+    done = wait_for(jobs, job_id)
+    assert (done.status, done.result, done.stage) == (DONE, 42, "done")
+    wait_for(jobs, queued)
+    assert jobs.pending() == 0
+
+
+def test_failed_job_and_session_list(jobs):
+    def broken(progress):
+        raise ValueError("portal down")
+
+    failed = wait_for(jobs, jobs.submit("s1", "CS/1/2024", broken))
+    assert failed.status == FAILED and failed.error == "ValueError: portal down"
+    other = wait_for(jobs, jobs.submit("s2", "CS/2/2024", lambda progress: "ok"))
+    assert [j.id for j in jobs.for_session("s1")] == [failed.id]
+    jobs.forget(failed.id)
+    assert jobs.get(failed.id) is None and jobs.get(other.id) is not None
+
+
+def test_finished_jobs_are_trimmed(jobs):
+    ids = [jobs.submit("s1", str(n), lambda progress: None) for n in range(3)]
+    wait_for(jobs, ids[-1])
+    jobs.submit("s1", "3", lambda progress: None)  # submit par purane poore jobs hatte hain (keep=2)
+    assert jobs.get(ids[0]) is None and jobs.get(ids[-1]) is not None
@@ -0,0 +1,57 @@
+# tests/test_metrics.py
+# Stage spans: ok/fail/exception, sampling, metrics table tak likhna, aur percentiles / per-stage summary.
+
+import pytest
+
+import metrics
+import storage
+from metrics import failure_rates, percentile, record, span, stage_stats, summarize
+from storage import connect
+
+
+@pytest.fixture
+def metrics_db(db_path, monkeypatch):
+    """Spans is test ke DB mein (process ka shared writer), aur test ke baad writer band."""
+    monkeypatch.setattr(metrics, "DB_PATH", db_path)
+    monkeypatch.setattr(metrics, "_source", "test")
+    yield db_path
+    writer = storage._writers.pop(db_path, None)
+    if writer is not None:
+        writer.close()
+
+
+def test_span_outcomes(metrics_db):
+    with span("parse", sample_rate=0):
+        pass
+    with span("submit", sample_rate=0) as s:
+        s.fail("rejected")
+    with pytest.raises(TimeoutError):
+        with span("page_load", sample_rate=0):
+            raise TimeoutError
+    assert [(stage, ok) for stage, _, ok in list(metrics.recent)[-3:]] == [("parse", True), ("submit", False), ("page_load", False)]
+    assert metrics_db not in storage._writers  # sample_rate 0: DB tak kuch nahi gaya
+
+
+def test_sampled_spans_reach_metrics_table(metrics_db):
+    for ms, ok in ((10, True), (20, True), (30, False)):
+        record("captcha", ms, ok, "" if ok else "timeout", sample_rate=1)
+    record("captcha", 40, sample_rate=0)
+    storage.get_writer(metrics_db).flush()
+    conn = connect(metrics_db)
+    assert conn.execute("SELECT source, stage, ms, ok, error FROM metrics ORDER BY id").fetchall() == [
+        ("test", "captcha", 10, 1, None), ("test", "captcha", 20, 1, None), ("test", "captcha", 30, 0, "timeout")]
+    stats = stage_stats(conn, since=0)["captcha"]
+    assert (stats["count"], stats["failed"], stats["p50"], stats["p99"]) == (3, 1, 20, 30)
+    assert stage_stats(conn, since=0, source="app") == {}
+    ((_, stage, total, failed),) = failure_rates(conn, since=0)
+    assert (stage, total, failed) == ("captcha", 3, 1)
+    conn.close()
+
+
+def test_percentile_and_summarize():
+    values = sorted(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([], 50) == 0.0
+    stats = summarize([("a", 5, True), ("b", 1, False), ("a", 15, False)])
+    assert list(stats) == ["a", "b"]
+    assert stats["a"]["count"] == 2 and stats["a"]["fail_rate"] == 0.5 and stats["a"]["p95"] == 15
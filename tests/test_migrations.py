@@ -0,0 +1,141 @@
+# tests/test_migrations.py
+# Normalized schema: case identity (number/year/CNR), aur purane schema wale queries.db par migrations: version,
+# legacy rows ki chunked copy, beech mein rukne ke baad resume, aur writer ka background copy ka intezaar na karna.
+
+import threading
+import time
+
+import pytest
+
+import migrations
+from blobstore import BlobStore
+from migrations import MIGRATIONS, migrate_data, pending, schema_version
+from storage import (SOURCE_APP, SOURCE_SCRAPER, TABLES, LogWriter, case_identity, connect, ensure_schema, resolve_case,
+                     write_rows)
+
+LEGACY_CASE_LOGS = ("CREATE TABLE case_logs (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, case_type TEXT, "
+                    "case_number TEXT, case_year TEXT, raw_html TEXT)")
+QUERIES = [
+    ("2025-03-01T10:00:00", "Gaya District Court", "CS", "45", "2024", 1, "<html>45</html>"),
+    ("2025-03-02T10:00:00", "Gaya District Court", "CS", "0045", "2024", 1, "<html>45 again</html>"),
+    ("2025-03-03T10:00:00", "Gaya District Court", "CS", "", "2024", 0, ""),
+    ("bad timestamp", "Gaya District Court", "CS", "", "2024", 1, None),
+]
+CASE_LOGS = [
+    ("2025-03-04T10:00:00", "CS", "45/2024", "2024", "<html>log</html>"),
+    ("2025-03-05T10:00:00", "CS", "", "2024", None),
+]
+
+
+def test_case_identity():
+    assert case_identity(" Gaya ", "cs", "045", "2024") == ("Gaya", "CS", 45, 2024, None)
+    assert case_identity("Gaya", "CS", "45/2024", "") == ("Gaya", "CS", 45, 2024, None)
+    assert case_identity("Gaya", "CS", "", "2024", "brga010001232024") == ("Gaya", "CS", None, None, "BRGA010001232024")
+
+
+def test_rows_without_number_or_cnr_get_no_case(conn, snapshot):
+    assert resolve_case(conn, "Gaya", "CS", "", "2024") is None
+    with conn:
+        write_rows(conn, [("snapshots", snapshot(1, number="")), ("snapshots", snapshot(2, number=""))])
+    assert conn.execute("SELECT count(*) FROM cases").fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM snapshots WHERE case_id IS NULL").fetchone()[0] == 2
+
+
+def test_same_case_any_spelling(conn, snapshot):
+    with conn:
+        write_rows(conn, [("snapshots", snapshot(1, number="045")), ("snapshots", snapshot(2, number="45/2024", year="")),
+                          ("snapshots", snapshot(3, case_type="cs", number="45"))])
+    assert conn.execute("SELECT case_number, filing_year, typeof(case_number) FROM cases").fetchall() == [(45, 2024, "integer")]
+
+
+@pytest.fixture
+def legacy_db(db_path):
+    """Normalized tables se pehle wala queries.db: sirf `queries` aur asli `case_logs`."""
+    conn = connect(db_path)
+    with conn:
+        conn.execute(TABLES["queries"])
+        conn.execute(LEGACY_CASE_LOGS)
+        conn.executemany("INSERT INTO queries (ts, court, case_type, case_number, filing_year, result_ok, html) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", QUERIES)
+        conn.executemany("INSERT INTO case_logs (timestamp, case_type, case_number, case_year, raw_html) VALUES (?, ?, ?, ?, ?)",
+                         CASE_LOGS)
+    yield conn
+    conn.close()
+
+
+def counts(conn):
+    return {source: conn.execute("SELECT count(*) FROM snapshots WHERE source = ?", (source,)).fetchone()[0]
+            for source in (SOURCE_APP, SOURCE_SCRAPER)}
+
+
+def test_baseline_db_is_migrated(legacy_db):
+    assert schema_version(legacy_db) == 0
+    ensure_schema(legacy_db)
+    assert schema_version(legacy_db) == MIGRATIONS[-1][0]
+    # ensure_schema sirf schema badalta hai; rows ki copy alag
+    assert pending(legacy_db) == {"queries": 4, "case_logs": 2, "case_records": 0}
+    assert counts(legacy_db) == {SOURCE_APP: 0, SOURCE_SCRAPER: 0}
+    assert migrate_data(legacy_db) == 6
+    assert set(pending(legacy_db).values()) == {0}
+    assert counts(legacy_db) == {SOURCE_APP: 4, SOURCE_SCRAPER: 2}
+
+    # "45", "0045" aur "45/2024" ek hi case; khaali number wale rows kisi case ke nahi
+    assert legacy_db.execute("SELECT case_number, typeof(case_number), filing_year FROM cases").fetchall() == \
+        [(45, "integer", 2024)]
+    assert legacy_db.execute("SELECT count(*) FROM snapshots WHERE case_id IS NULL").fetchone()[0] == 3
+    assert legacy_db.execute("SELECT ts FROM snapshots WHERE legacy_id = 4 AND source = ?", (SOURCE_APP,)).fetchone() == (0,)
+
+    # Inline HTML blob store mein (relative default "blobs", test ki tmp directory mein)
+    blobs = BlobStore("blobs")
+    hashes = [h for (h,) in legacy_db.execute("SELECT html_hash FROM snapshots WHERE html_hash IS NOT NULL ORDER BY id")]
+    assert [blobs.read_text(h) for h in hashes] == ["<html>45</html>", "<html>45 again</html>", "<html>log</html>"]
+
+    ensure_schema(legacy_db)
+    assert migrate_data(legacy_db) == 0
+    assert counts(legacy_db) == {SOURCE_APP: 4, SOURCE_SCRAPER: 2}
+
+
+def test_interrupted_copy_resumes(legacy_db):
+    ensure_schema(legacy_db)
+    assert pending(legacy_db) == {"queries": 4, "case_logs": 2, "case_records": 0}
+
+    def stop(name, copied):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        migrate_data(legacy_db, chunk=1, progress=stop)
+    assert counts(legacy_db) == {SOURCE_APP: 1, SOURCE_SCRAPER: 0}
+    assert pending(legacy_db)["queries"] == 3
+
+    assert migrate_data(legacy_db, chunk=1) == 5
+    assert counts(legacy_db) == {SOURCE_APP: 4, SOURCE_SCRAPER: 2}
+    assert set(pending(legacy_db).values()) == {0}
+
+
+def test_writer_does_not_wait_for_the_copy(legacy_db, db_path, blobs, snapshot, monkeypatch):
+    ensure_schema(legacy_db)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_copy(conn, **kwargs):
+        started.set()
+        release.wait(5)
+        return real_copy(conn, **kwargs)
+
+    real_copy = migrations.migrate_data
+    monkeypatch.setattr(migrations, "migrate_data", slow_copy)
+    began = time.monotonic()
+    writer = LogWriter(db_path, flush_interval=0.05, blobs=blobs)
+    try:
+        assert started.wait(2) and time.monotonic() - began < 1
+        assert migrations.copy_in_background(db_path) is None  # ek hi copy
+        assert writer.submit("snapshots", snapshot(1))
+        writer.flush()
+        assert counts(legacy_db)[SOURCE_APP] == 1
+    finally:
+        release.set()
+        writer.close()
+    deadline = time.monotonic() + 5
+    while any(pending(legacy_db).values()):
+        assert time.monotonic() < deadline, "background copy did not finish"
+        time.sleep(0.02)
+    assert counts(legacy_db) == {SOURCE_APP: 5, SOURCE_SCRAPER: 2}
@@ -0,0 +1,159 @@
+# tests/test_netrules.py
+# Static cache ki freshness (Cache-Control / Expires), validators, aur install_routes ka handler: block, fresh hit,
+# 304 par revalidate. Page/route ki jagah chhote fake objects (handler sirf unke yeh methods chhoota hai). Fixture
+# server ki static files bhi cacheable honi chahiye, warna benchmark mein cache hits dikhte hi nahi.
+
+import asyncio
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from fixture_server import CaseStore, FixtureServer
+from netrules import RouteRules, RouteStats, StaticCache, _cacheable, freshness, install_routes
+
+JS = "http://portal.test/static/app.js"
+
+
+def test_freshness():
+    assert freshness({"cache-control": "public, max-age=600"}, 99) == 600
+    assert freshness({"cache-control": "no-cache, max-age=600"}, 99) == 0
+    assert freshness({"cache-control": "max-age=abc"}, 99) == 0
+    assert freshness({"expires": "Wed, 01 Jan 2025 01:00:00 GMT", "date": "Wed, 01 Jan 2025 00:00:00 GMT"}, 99) == 3600
+    assert freshness({"expires": "0"}, 99) == 0
+    assert freshness({}, 99) == 99
+
+
+def test_cacheable_needs_validator():
+    assert _cacheable({"etag": '"v1"'})
+    assert _cacheable({"last-modified": "Wed, 01 Jan 2025 00:00:00 GMT", "cache-control": "max-age=60"})
+    assert not _cacheable({"cache-control": "max-age=86400"})
+    assert not _cacheable({"etag": '"v1"', "cache-control": "no-store"})
+    assert not _cacheable({"etag": '"v1"', "cache-control": "private, max-age=60"})
+
+
+def test_static_cache_put_touch(tmp_path):
+    cache = StaticCache(str(tmp_path / "cache"))
+    assert cache.get(JS) == (None, None)
+    cache.put(JS, b"js()", {"content-type": "text/javascript", "etag": '"v1"'}, 60)
+    meta, body = cache.get(JS)
+    assert body == b"js()" and meta["etag"] == '"v1"' and meta["expires_at"] == pytest.approx(time.time() + 60, abs=2)
+    cache.touch(JS, 600)
+    assert cache.get(JS)[0]["expires_at"] == pytest.approx(time.time() + 600, abs=2)
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type, method="GET"):
+        self.url, self.resource_type, self.method, self.headers = url, resource_type, method, {}
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body=b""):
+        self.status, self.headers, self._body = status, headers, body
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    def __init__(self, request, server):
+        self.request, self.server, self.result, self.sent_headers = request, server, None, None
+
+    async def continue_(self):
+        self.result = "continued"
+
+    async def abort(self, reason):
+        self.result = "aborted"
+
+    async def fetch(self, headers):
+        self.sent_headers = headers
+        return self.server(headers)
+
+    async def fulfill(self, response=None, body=None, status=None, headers=None):
+        self.result = ("fulfilled", body)
+
+
+class FakePage:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+def run_routes(server, requests, rules):
+    """Har request handler se guzarti hai; (routes, stats)."""
+    async def main():
+        page = FakePage()
+        stats = await install_routes(page, rules)
+        routes = []
+        for request in requests:
+            routes.append(FakeRoute(request, server))
+            await page.handler(routes[-1])
+        return routes, stats
+    return asyncio.run(main())
+
+
+def test_handler_blocks_and_caches(tmp_path):
+    fetched = []
+
+    def server(headers):
+        fetched.append(headers)
+        if headers.get("if-none-match") == '"v1"':
+            return FakeResponse(304, {"cache-control": "max-age=0"})
+        return FakeResponse(200, {"content-type": "text/javascript", "etag": '"v1"', "cache-control": "max-age=600"}, b"js()")
+
+    rules = RouteRules(cache_dir=str(tmp_path / "cache"), enabled=True)
+    routes, stats = run_routes(server, [
+        FakeRequest("http://portal.test/logo.png", "image"),
+        FakeRequest("http://portal.test/securimage/captcha.png", "image"),
+        FakeRequest("https://www.google-analytics.com/ga.js", "script"),
+        FakeRequest(JS, "script"),
+        FakeRequest(JS, "script"),
+        FakeRequest(JS, "script", method="POST"),
+    ], rules)
+    assert [r.result if isinstance(r.result, str) else r.result[0] for r in routes] == \
+        ["aborted", "continued", "aborted", "fulfilled", "fulfilled", "continued"]
+    assert (stats.blocked, stats.cache_misses, stats.cache_hits, len(fetched)) == (2, 1, 1, 1)
+    assert routes[4].result == ("fulfilled", b"js()")
+
+    # max-age khatam: ETag ke saath revalidate, 304 par cached body
+    StaticCache(rules.cache_dir).touch(JS, 0)
+    routes, stats = run_routes(server, [FakeRequest(JS, "script")], rules)
+    assert routes[0].sent_headers["if-none-match"] == '"v1"'
+    assert routes[0].result == ("fulfilled", b"js()") and stats.revalidated == 1
+
+
+def test_handler_skips_cache_without_validator(tmp_path):
+    def server(headers):
+        return FakeResponse(200, {"cache-control": "max-age=600"}, b"js()")
+
+    rules = RouteRules(cache_dir=str(tmp_path / "cache"), enabled=True)
+    _, stats = run_routes(server, [FakeRequest(JS, "script"), FakeRequest(JS, "script")], rules)
+    assert (stats.cache_misses, stats.cache_hits) == (2, 0)
+
+
+def test_disabled_rules_install_nothing():
+    page = FakePage()
+    stats = asyncio.run(install_routes(page, RouteRules(enabled=False)))
+    assert isinstance(stats, RouteStats) and not hasattr(page, "handler")
+
+
+def test_fixture_static_files_are_cacheable():
+    server = FixtureServer(CaseStore([])).start()
+
+    def get(path, **headers):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(server.url + path, headers=headers)) as r:
+                return r.status, {k.lower(): v for k, v in r.headers.items()}
+        except urllib.error.HTTPError as e:
+            return e.code, {k.lower(): v for k, v in e.headers.items()}
+
+    try:
+        status, headers = get("/static/gaya.js")
+        assert status == 200 and _cacheable(headers) and freshness(headers, 0) == 86400
+        assert get("/static/gaya.js", **{"If-None-Match": headers["etag"]})[0] == 304
+        assert get("/static/gaya.js", **{"If-Modified-Since": headers["last-modified"]})[0] == 304
+        assert get("/static/gaya.js", **{"If-None-Match": '"old"'})[0] == 200
+        assert not _cacheable(get("/case-status-search-by-case-type/")[1])
+        assert server.not_modified == {"/static/gaya.js": 2}
+    finally:
+        server.stop()
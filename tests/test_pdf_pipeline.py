@@ -0,0 +1,112 @@
+# tests/test_pdf_pipeline.py
+# Order PDF downloader ek local HTTP server ke khilaaf: beech mein kata download Range se wahin se aage, poori file blob
+# store mein, dobara submit par reuse, aur PDF ki jagah HTML aaye toh error row.
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import metrics
+import pdf_pipeline
+from pdf_pipeline import Downloader, order_urls, stream_to_file, with_base
+from storage import LogWriter, connect
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 800
+
+
+class PdfHandler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        self.server.seen.append((self.path, self.headers.get("Range")))
+        if self.path == "/expired.pdf":
+            body = b"<html>Session expired</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        start = int(self.headers["Range"][6:].rstrip("-")) if self.headers.get("Range") else 0
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(PDF) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(PDF) - 1}/{len(PDF)}")
+        self.end_headers()
+        if self.path == "/flaky.pdf" and not start:
+            # Pehli baar aadhi file bhej kar connection kaat do
+            self.wfile.write(PDF[:len(PDF) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(PDF[start:])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PdfHandler)
+    httpd.seen = []
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def downloader(conn, db_path, blobs, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_pipeline, "DOWNLOAD_BACKOFF", 0)
+    monkeypatch.setattr(metrics, "SAMPLE_RATE", 0)
+    writer = LogWriter(db_path, flush_interval=0.05, blobs=blobs)
+    downloader = Downloader(db_path, workers=2, blobs=blobs, writer=writer, part_dir=str(tmp_path / "partial"))
+    yield downloader
+    downloader.close()
+    writer.close()
+
+
+def test_stream_to_file_resumes(server, tmp_path):
+    part = tmp_path / "order.part"
+    part.write_bytes(PDF[:1000])
+    with requests.Session() as session:
+        assert stream_to_file(session, server.url + "/order.pdf", str(part)) == len(PDF)
+    assert part.read_bytes() == PDF
+    assert server.seen[-1] == ("/order.pdf", "bytes=1000-")
+
+
+def test_interrupted_download_resumes_and_is_reused(downloader, server, blobs):
+    url = server.url + "/flaky.pdf"
+    result = downloader.submit(url, "CS/45/2024").result(10)
+    assert result["size"] == len(PDF) and not result["reused"]
+    first, resumed = [r for p, r in server.seen if p == "/flaky.pdf"]
+    # Dusra attempt wahan se jahan tak pehla disk par likh paaya
+    assert first is None and 0 < int(resumed[6:-1]) <= len(PDF) // 2
+    with blobs.open(result["sha256"]) as f:
+        assert f.read() == PDF
+
+    downloader.writer.flush()
+    again = downloader.submit(url).result(10)
+    assert again["reused"] and again["sha256"] == result["sha256"]
+    assert len([p for p, _ in server.seen if p == "/flaky.pdf"]) == 2
+    assert (downloader.downloaded, downloader.reused) == (1, 1)
+
+
+def test_non_pdf_response_is_an_error(downloader, server, db_path):
+    future = downloader.submit(server.url + "/expired.pdf", "CS/46/2024")
+    with pytest.raises(ValueError):
+        future.result(10)
+    downloader.writer.flush()
+    conn = connect(db_path)
+    assert conn.execute("SELECT case_key, sha256, error IS NOT NULL FROM documents").fetchall() == [("CS/46/2024", None, 1)]
+    conn.close()
+    assert os.listdir(downloader.part_dir) == []
+
+
+def test_order_urls_and_base():
+    parsed = {"latest_pdf": "/o/3.pdf", "orders": [{"url": "/o/1.pdf"}, {"url": "/o/3.pdf"}, {"url": ""}],
+              "pdf_links": ["/o/2.pdf", "/o/1.pdf"]}
+    assert order_urls(parsed) == ["/o/3.pdf", "/o/1.pdf", "/o/2.pdf"]
+    assert with_base("<html><head><title>x</title>", "https://gaya.dcourts.gov.in/") == \
+        '<html><head><base href="https://gaya.dcourts.gov.in/"><title>x</title>'
+    assert with_base("<base href='a'><p>", "https://b/") == "<base href='a'><p>"
@@ -0,0 +1,25 @@
+# tests/test_query_log.py
+# query_log_page: id cursor se keyset paging aur filters (Query Log view isi se page karta hai).
+
+from storage import SOURCE_APP, SOURCE_SCRAPER, query_log_page, write_rows
+
+
+def test_query_log_page_keyset(conn, snapshot):
+    with conn:
+        write_rows(conn, [("snapshots", snapshot(n, case_type="CR" if n % 2 else "CS", ok=n % 3 != 0,
+                                                 source=SOURCE_SCRAPER if n > 5 else SOURCE_APP)) for n in range(1, 8)])
+    pages, cursor = [], None
+    while True:
+        rows, cursor = query_log_page(conn, before_id=cursor, limit=3)
+        pages.append([r[0] for r in rows])
+        if cursor is None:
+            break
+    assert pages == [[7, 6, 5], [4, 3, 2], [1]]
+
+    rows, cursor = query_log_page(conn, limit=3)
+    assert rows[0][2] == "scraper" and rows[0][3:6] == ("CR", 7, 2024)
+    assert [r[0] for r in query_log_page(conn, case_type="cr")[0]] == [7, 5, 3, 1]
+    assert [r[0] for r in query_log_page(conn, case_type="cr", result_ok=0)[0]] == [3]
+    assert query_log_page(conn, filing_year="2023") == ([], None)
+    # Pura page bhara ho par aage kuch na ho toh cursor None
+    assert query_log_page(conn, before_id=4, limit=3)[1] is None
@@ -0,0 +1,102 @@
+# tests/test_storage.py
+# LogWriter: batching, flush/close, kharab row, aur event loop se submit.
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from storage import LogWriter, connect
+
+
+@pytest.fixture
+def writer(db_path, blobs):
+    writer = LogWriter(db_path, batch_size=3, flush_interval=0.05, blobs=blobs)
+    yield writer
+    writer.close()
+
+
+def count(db_path, table):
+    conn = connect(db_path)
+    try:
+        return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_writer_batches_and_flush(writer, db_path, snapshot):
+    batches = []
+    write = writer._write
+    writer._write = lambda conn, rows: (batches.append(len(rows)), write(conn, rows))
+    for n in range(1, 8):
+        assert writer.submit("snapshots", snapshot(n))
+    writer.flush()
+    assert sum(batches) == 7 and max(batches) <= 3
+    assert writer.written == 7 and writer.failed == 0
+    assert count(db_path, "snapshots") == 7
+    assert count(db_path, "cases") == 7
+
+
+def test_writer_stores_html_in_blobs(writer, db_path, blobs, case_html, snapshot):
+    writer.submit("snapshots", snapshot(1, html=case_html))
+    writer.flush()
+    conn = connect(db_path)
+    (digest,) = conn.execute("SELECT html_hash FROM snapshots").fetchone()
+    conn.close()
+    assert blobs.read_text(digest) == case_html
+
+
+def test_close_drains_queue(db_path, blobs, snapshot):
+    writer = LogWriter(db_path, batch_size=2, flush_interval=0.05, blobs=blobs)
+    for n in range(1, 6):
+        writer.submit("snapshots", snapshot(n))
+    writer.close()
+    assert count(db_path, "snapshots") == 5
+    assert writer.submit("snapshots", snapshot(6)) is False
+
+
+def test_bad_row_does_not_drop_batch(writer, db_path, snapshot):
+    writer.submit("snapshots", snapshot(1))
+    writer.submit("no_such_table", {"x": 1})
+    writer.submit("snapshots", snapshot(2))
+    writer.flush()
+    assert writer.failed == 1
+    assert count(db_path, "snapshots") == 2
+
+
+def test_writer_survives_unexpected_error(writer, db_path, snapshot):
+    write = writer._write
+    writer._write = lambda conn, rows: 1 / 0
+    writer.submit("snapshots", snapshot(1))
+    writer.flush()
+    assert writer.failed == 1 and isinstance(writer.last_error, ZeroDivisionError)
+    writer._write = write
+    writer.submit("snapshots", snapshot(2))
+    writer.flush()
+    assert count(db_path, "snapshots") == 1
+
+
+def test_submit_from_event_loop_never_blocks(db_path, blobs, snapshot):
+    writer = LogWriter(db_path, maxsize=1, flush_interval=0.05, blobs=blobs)
+    release = threading.Event()
+    write = writer._write
+    writer._write = lambda conn, rows: (release.wait(5), write(conn, rows))
+    try:
+        writer.submit("snapshots", snapshot(1))  # thread utha kar release par ruka hai
+        deadline = time.monotonic() + 2
+        while writer._queue.qsize() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.submit("snapshots", snapshot(2))  # queue ab bhari
+
+        async def submit():
+            started = time.monotonic()
+            return writer.submit("snapshots", snapshot(3)), time.monotonic() - started
+
+        accepted, waited = asyncio.run(submit())
+        assert accepted is False and waited < 0.5
+        assert writer.dropped == 1
+    finally:
+        release.set()
+        writer.close()
+    assert count(db_path, "snapshots") == 2
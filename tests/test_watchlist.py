@@ -0,0 +1,116 @@
+# tests/test_watchlist.py
+# Watch list: due scheduling, backoff, aur page badalne par diff (sirf tab snapshot store hota hai).
+
+import os
+import re
+from datetime import datetime
+
+import pytest
+
+from storage import write_rows
+from watchlist import (COURT_NAME, MAX_INTERVAL, MIN_INTERVAL, RETRY_DELAY, add, apply_snapshot, changes_since, due, next_check_at,
+                       parse_date, record_failure, snapshot_hash)
+
+NOW = datetime(2026, 1, 1, 10, 0).timestamp()
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def watch_id(conn):
+    assert add(conn, "100", "45", "2024", now=NOW)
+    return due(conn, now=NOW)[0]["id"]
+
+
+def scraper_court():
+    """scraper.COURT_NAME (scraper playwright import karta hai, isliye uski file se padha)."""
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper.py"), encoding="utf-8") as f:
+        return re.search(r'^COURT_NAME = "([^"]+)"', f.read(), re.M).group(1)
+
+
+def blobs_written(blobs):
+    return any(files for _, _, files in os.walk(blobs.root))
+
+
+def watch_row(conn, watch_id):
+    return conn.execute("SELECT interval, next_check, checks, changes, next_hearing FROM watchlist WHERE id = ?",
+                        (watch_id,)).fetchone()
+
+
+def test_parse_date():
+    assert parse_date("05th November 2026") == datetime(2026, 11, 5)
+    assert parse_date("15-07-2025") == datetime(2025, 7, 15)
+    assert parse_date("not a date") is None
+
+
+def test_next_check_at():
+    assert next_check_at(NOW, DAY) == NOW + DAY
+    assert next_check_at(NOW, DAY, "03-01-2026") == datetime(2026, 1, 4).timestamp()  # hearing ke agle din
+    assert next_check_at(NOW, DAY, "01-06-2026") == NOW + MAX_INTERVAL                # door ki hearing: cap
+    assert next_check_at(NOW, DAY, "01-12-2025") == NOW + DAY                          # beeti hearing
+
+
+def test_add_and_due(conn, watch_id):
+    assert add(conn, "100", "45", "2024", now=NOW) is False
+    assert add(conn, " 100 ", "45", "2024", now=NOW) is False
+    with pytest.raises(ValueError):
+        add(conn, "CS", "46", "2024", now=NOW)  # label portal ka option value nahi
+    assert [w["case_number"] for w in due(conn, now=NOW)] == ["45"]
+    assert due(conn, now=NOW - 1) == []
+
+
+def test_snapshot_hash_ignores_volatile_parts(case_html):
+    noisy = case_html.replace("<body>", "<body><input type='hidden' name='t' value='123'><!-- 10:01 -->")
+    assert snapshot_hash(noisy) == snapshot_hash(case_html)
+
+
+def test_baseline_then_backoff(conn, watch_id, blobs, case_html):
+    assert apply_snapshot(conn, watch_id, case_html, now=NOW, blobs=blobs) == []
+    interval, next_check, checks, changes, next_hearing = watch_row(conn, watch_id)
+    assert (interval, checks, changes, next_hearing) == (MIN_INTERVAL, 1, 0, "05th November 2026")
+    assert next_check == next_check_at(NOW, MIN_INTERVAL, next_hearing)
+    assert due(conn, now=NOW) == []
+    assert not blobs_written(blobs)
+    assert conn.execute("SELECT count(*) FROM case_records").fetchone()[0] == 1
+
+    # Page wahi: na parse na store, bas interval dugna (MAX_INTERVAL tak)
+    for i in range(2, 8):
+        assert apply_snapshot(conn, watch_id, case_html, now=NOW + i, blobs=blobs) == []
+    assert watch_row(conn, watch_id)[0] == MAX_INTERVAL
+    assert not blobs_written(blobs)
+
+
+def test_record_shares_the_scraper_case(conn, watch_id, blobs, case_html, snapshot):
+    with conn:
+        write_rows(conn, [("snapshots", {**snapshot(1, case_type="100", number="45"), "court": scraper_court()})])
+    apply_snapshot(conn, watch_id, case_html, now=NOW, blobs=blobs)
+    assert conn.execute("SELECT count(*) FROM cases").fetchone()[0] == 1
+    assert conn.execute("SELECT r.court, r.case_type, r.case_id = k.id FROM case_records r, cases k").fetchone() == \
+        (COURT_NAME, "100", 1)
+
+
+def test_change_is_recorded(conn, watch_id, blobs, case_html, monkeypatch):
+    apply_snapshot(conn, watch_id, case_html, now=NOW, blobs=blobs)
+    apply_snapshot(conn, watch_id, case_html, now=NOW + 1, blobs=blobs)
+    assert watch_row(conn, watch_id)[0] == 2 * MIN_INTERVAL
+
+    changed = case_html.replace("05th November 2026", "10th December 2026")
+    diffs = apply_snapshot(conn, watch_id, changed, now=NOW + 2, blobs=blobs)
+    assert diffs == [("next_hearing", "05th November 2026", "10th December 2026")]
+    interval, _, checks, changes, next_hearing = watch_row(conn, watch_id)
+    assert (interval, checks, changes, next_hearing) == (MIN_INTERVAL, 3, 1, "10th December 2026")
+    assert blobs_written(blobs)
+    rows = changes_since(conn, NOW)
+    assert [(r[1], r[2], r[5], r[6], r[7]) for r in rows] == [("100", "45", "next_hearing", "05th November 2026", "10th December 2026")]
+
+
+def test_unparseable_page_backs_off(conn, watch_id, blobs, case_html):
+    apply_snapshot(conn, watch_id, case_html, now=NOW, blobs=blobs)
+    assert apply_snapshot(conn, watch_id, "<p>Server busy</p>", now=NOW + 1, blobs=blobs) == []
+    assert conn.execute("SELECT last_error, next_hearing FROM watchlist WHERE id = ?", (watch_id,)).fetchone() == \
+        ("page could not be parsed", "05th November 2026")
+
+
+def test_record_failure(conn, watch_id):
+    record_failure(conn, watch_id, "timeout", now=NOW)
+    assert watch_row(conn, watch_id)[1] == NOW + RETRY_DELAY
+    assert due(conn, now=NOW + RETRY_DELAY)[0]["id"] == watch_id
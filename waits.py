@@ -0,0 +1,94 @@
+# waits.py
+# Readiness-based waits shared by app.py and scraper.py (dono async Playwright par chalte hain).
+# Har wait ek specific signal ka intezaar karta hai aur batata hai ki asal mein kitna time laga.
+
+import os
+import re
+import time
+from typing import NamedTuple
+
+DEFAULT_TIMEOUT_MS = int(os.environ.get("COURT_WAIT_TIMEOUT_MS", "30000"))
+
+# Gaya (dcourts) result list aur detail panel
+RESULT_ROWS_SELECTOR = "#showList .viewCnrDetails"
+DETAIL_PANEL_SELECTOR = "#cnrResultsDetails, #caseHistoryDiv, .case-details"
+ERROR_PATTERN = r"Invalid Captcha|No records? found|Invalid Case Details|Record not found"
+
+
+class Waited(NamedTuple):
+    signal: str
+    seconds: float
+
+
+def _record(signal, started):
+    return Waited(signal, round(time.monotonic() - started, 3))
+
+
+def _timeout(timeout):
+    return DEFAULT_TIMEOUT_MS if timeout is None else timeout
+
+
+# --- JS predicates ---
+_OPTIONS_POPULATED = """([sel, min]) => {
+    const el = document.querySelector(sel);
+    return !!el && el.options.length >= min;
+}"""
+
+_ROWS_OR_ERROR = """([sel, pattern]) => {
+    if (document.querySelector(sel)) return "rows";
+    if (new RegExp(pattern, "i").test(document.body.innerText)) return "error";
+    return false;
+}"""
+
+
+_ROWS_CHANGED = """([sel, previous]) => {
+    const el = document.querySelector(sel);
+    return !!el && el.outerHTML !== previous;
+}"""
+
+
+def _is_ajax(url_part):
+    def predicate(response):
+        return response.request.method == "POST" and url_part in response.url
+    return predicate
+
+
+# --- Waits (async Playwright: app.py ka shared browser aur scraper.py) ---
+async def wait_for_options_async(page, selector, min_options=2, timeout=None):
+    """Dropdown mein kam se kam `min_options` options aane tak rukta hai."""
+    started = time.monotonic()
+    await page.wait_for_function(_OPTIONS_POPULATED, arg=[selector, min_options], timeout=_timeout(timeout))
+    return _record(f"options {selector}", started)
+
+
+async def wait_for_rows_or_error_async(page, rows_selector=RESULT_ROWS_SELECTOR, error_pattern=ERROR_PATTERN, timeout=None):
+    """Result rows ya error message, jo pehle dikhe. Signal 'rows' ya 'error' hota hai."""
+    started = time.monotonic()
+    handle = await page.wait_for_function(_ROWS_OR_ERROR, arg=[rows_selector, error_pattern], timeout=_timeout(timeout))
+    return _record(await handle.json_value(), started)
+
+
+async def wait_for_rows_changed_async(page, previous, rows_selector=RESULT_ROWS_SELECTOR, timeout=None):
+    """Pagination ke baad: pehli row ka HTML `previous` se badalne tak rukta hai (client ya server side paging dono)."""
+    started = time.monotonic()
+    await page.wait_for_function(_ROWS_CHANGED, arg=[rows_selector, previous], timeout=_timeout(timeout))
+    return _record("rows changed", started)
+
+
+async def wait_for_visible_async(page, selector=DETAIL_PANEL_SELECTOR, timeout=None):
+    started = time.monotonic()
+    await page.wait_for_selector(selector, state="visible", timeout=_timeout(timeout))
+    return _record(f"visible {selector}", started)
+
+
+async def after_ajax_async(page, action, url_part="", timeout=None):
+    """`await action()` ke baad wale POST (AJAX) response ka intezaar."""
+    started = time.monotonic()
+    async with page.expect_response(_is_ajax(url_part), timeout=_timeout(timeout)):
+        await action()
+    await page.wait_for_load_state("domcontentloaded", timeout=_timeout(timeout))
+    return _record(f"ajax {url_part or 'POST'}", started)
+
+
+def page_has_error(text, error_pattern=ERROR_PATTERN):
+    return re.search(error_pattern, text, flags=re.I) is not None
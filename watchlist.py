@@ -0,0 +1,282 @@
+# watchlist.py
+# Tracked cases ki watch list (SQLite) aur due-time scheduler. Har case tabhi dobara check hota hai jab due ho:
+# next_hearing ke agle din, warna backoff interval ke baad (kuch na badle toh interval dugna). Fetch kiye page ka
+# hash pichhle snapshot se same ho toh na parse hota hai na store; sirf badle fields `watch_changes` mein jaate hain.
+#
+#   py watchlist.py add 100 123 2024 [--est BRGA01]   # case type: portal ke Case Type dropdown ka code
+#   py watchlist.py import jobs.csv
+#   py watchlist.py run [--limit 50] [--browser]     # sirf due cases check karo
+#   py watchlist.py changes [--days 7]
+#   py watchlist.py list
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import re
+import time
+from datetime import datetime, timedelta
+
+from blobstore import BLOB_DIR, BlobStore
+from case_parser import parse_case_html
+from case_search import record_row
+from storage import DB_PATH, connect, ensure_schema, write_rows
+
+GAYA_BASE_URL = "https://gaya.dcourts.gov.in"
+DEFAULT_ESTABLISHMENT = "BRGA01,BRGA03,BRGA02,BRGA05"
+COURT_NAME = "Gaya District Court"  # scraper.COURT_NAME: watch checks aur scraper lookups ek hi `cases` row par
+MIN_INTERVAL = 24 * 3600         # seconds; badlaav ke baad agla check
+MAX_INTERVAL = 14 * 24 * 3600    # backoff ki upper limit
+RETRY_DELAY = 3600               # fetch fail hone par
+RUN_LIMIT = 100
+TRACKED_FIELDS = ("next_hearing", "latest_pdf", "case_status", "decision_date")
+
+# Har request par badalne wale hisse (scripts, hidden tokens, whitespace) hash se pehle hata diye jaate hain
+VOLATILE = re.compile(r"<script\b.*?</script\s*>|<input\b[^>]*type\s*=\s*[\"']?hidden[^>]*>|<!--.*?-->", re.S | re.I)
+SPACES = re.compile(r"\s+")
+CASE_TYPE_CODE = re.compile(r"\d+")
+ORDINAL = re.compile(r"(\d{1,2})(st|nd|rd|th)\b", re.I)
+DATE_FORMATS = ("%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d", "%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y")
+
+
+def snapshot_hash(html):
+    return hashlib.sha256(SPACES.sub(" ", VOLATILE.sub("", html)).strip().encode("utf-8")).hexdigest()
+
+
+def parse_date(text):
+    """Portal ki date ("15-07-2025", "15th July 2025") ko datetime mein; samajh na aaye toh None."""
+    text = ORDINAL.sub(r"\1", (text or "").replace(",", " ")).strip()
+    text = SPACES.sub(" ", text)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def next_check_at(now, interval, next_hearing=""):
+    """Agle check ka epoch time: aane wali hearing ke agle din (MAX_INTERVAL tak), warna `now + interval`."""
+    hearing = parse_date(next_hearing)
+    if hearing is not None:
+        # Hearing ke din order/next date upload hoti hai; us se pehle check karna bekaar hai
+        due = (hearing + timedelta(days=1)).timestamp()
+        if due > now:
+            return min(due, now + MAX_INTERVAL)
+    return now + interval
+
+
+def case_type_code(case_type):
+    """Case type ka portal code ("100"): scraper ise `#case_type` ke option value ki tarah select karta hai aur isi se
+    lookups log karta hai. Label ("CS") option value nahi hota, isliye ValueError."""
+    code = str(case_type).strip()
+    if not CASE_TYPE_CODE.fullmatch(code):
+        raise ValueError(f"case type must be the portal's numeric code from the Case Type list (e.g. 100), not {case_type!r}")
+    return code
+
+
+# --- Watch list ---
+def add(conn, case_type, case_number, filing_year, establishment=DEFAULT_ESTABLISHMENT, label="", now=None):
+    """Case ko watch list mein daalta hai (pehle se ho toh kuch nahi); turant due hota hai. Case type portal ka code
+    hona chahiye (case_type_code)."""
+    now = time.time() if now is None else now
+    case_type = case_type_code(case_type)
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO watchlist (establishment, case_type, case_number, filing_year, label, added_at, next_check, interval) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (establishment, case_type, str(case_number).strip(), str(filing_year).strip(), label, now, now, MIN_INTERVAL),
+        )
+    return cur.rowcount == 1
+
+
+def remove(conn, watch_id):
+    with conn:
+        conn.execute("DELETE FROM watchlist WHERE id = ?", (watch_id,))
+
+
+def due(conn, now=None, limit=RUN_LIMIT):
+    """Jin cases ka check ka waqt aa gaya, sabse purane due pehle (next_check index se, poori list scan nahi)."""
+    now = time.time() if now is None else now
+    rows = conn.execute(
+        "SELECT id, establishment, case_type, case_number, filing_year FROM watchlist "
+        "WHERE next_check <= ? ORDER BY next_check LIMIT ?", (now, limit),
+    ).fetchall()
+    return [dict(zip(("id", "establishment", "case_type", "case_number", "filing_year"), r)) for r in rows]
+
+
+def apply_snapshot(conn, watch_id, html, now=None, blobs=None):
+    """Fetch hua page watch row par lagata hai. Badle hue tracked fields [(field, old, new)] return karta hai.
+    Hash same ho toh bas reschedule (backoff ke saath); badla ho toh parse, diff, aur sirf diff ho toh snapshot store.
+    Pehla check sirf baseline banata hai (hash + fields + search record; koi diff ya snapshot nahi)."""
+    now = time.time() if now is None else now
+    row = conn.execute(
+        f"SELECT snapshot_hash, interval, case_type, case_number, filing_year, {', '.join(TRACKED_FIELDS)} FROM watchlist WHERE id = ?",
+        (watch_id,),
+    ).fetchone()
+    if row is None:
+        return []
+    old_hash, interval, case_type, case_number, filing_year = row[:5]
+    old = {f: v or "" for f, v in zip(TRACKED_FIELDS, row[5:])}
+    digest = snapshot_hash(html)
+    parsed = parse_case_html(html, GAYA_BASE_URL) if digest != old_hash else None
+    if parsed is None or not parsed["success"]:
+        # Kuch nahi badla (ya page samajh nahi aaya): agla check aur door
+        interval = min(interval * 2, MAX_INTERVAL)
+        with conn:
+            conn.execute(
+                "UPDATE watchlist SET interval = ?, next_check = ?, last_checked = ?, last_error = ?, checks = checks + 1 WHERE id = ?",
+                (interval, next_check_at(now, interval, old["next_hearing"]), now,
+                 None if parsed is None else "page could not be parsed", watch_id),
+            )
+        return []
+
+    new = {f: parsed.get(f) or "" for f in TRACKED_FIELDS}
+    diffs = [(f, old[f], new[f]) for f in TRACKED_FIELDS if old[f] != new[f]] if old_hash else []
+    # Hash badla par tracked fields nahi (jaise sirf hearing history ki formatting): interval wahi rehta hai
+    if diffs:
+        interval = MIN_INTERVAL
+    html_hash = (blobs or BlobStore(BLOB_DIR)).put_text(html) if diffs else None
+    ts = datetime.fromtimestamp(now).isoformat(timespec="seconds")
+    with conn:
+        conn.executemany(
+            "INSERT INTO watch_changes (watch_id, ts, field, old_value, new_value, html_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            [(watch_id, now, f, o, n, html_hash) for f, o, n in diffs],
+        )
+        conn.execute(
+            f"UPDATE watchlist SET snapshot_hash = ?, interval = ?, next_check = ?, last_checked = ?, last_error = NULL, "
+            f"checks = checks + 1, changes = changes + ?, last_changed = CASE WHEN ? THEN ? ELSE last_changed END, "
+            f"{', '.join(f'{f} = ?' for f in TRACKED_FIELDS)} WHERE id = ?",
+            (digest, interval, next_check_at(now, interval, new["next_hearing"]), now, len(diffs), bool(diffs), now,
+             *new.values(), watch_id),
+        )
+        if diffs or not old_hash:
+            # Search index bhi sirf badlaav (ya baseline) par update hota hai
+            record = record_row(COURT_NAME, case_type, case_number, filing_year, parsed, ts, "watchlist")
+            write_rows(conn, [("case_records", record)])
+    return diffs
+
+
+def record_failure(conn, watch_id, error, now=None):
+    now = time.time() if now is None else now
+    with conn:
+        conn.execute("UPDATE watchlist SET last_error = ?, last_checked = ?, next_check = ? WHERE id = ?",
+                     (error, now, now + RETRY_DELAY, watch_id))
+
+
+def changes_since(conn, since):
+    return conn.execute(
+        "SELECT c.ts, w.case_type, w.case_number, w.filing_year, w.label, c.field, c.old_value, c.new_value "
+        "FROM watch_changes c JOIN watchlist w ON w.id = c.watch_id WHERE c.ts >= ? ORDER BY c.ts, c.id",
+        (since,),
+    ).fetchall()
+
+
+# --- Run ---
+async def check_due(conn, limit=RUN_LIMIT, http=True, headless=True, now=None):
+    """Due cases scraper ke batch runner se fetch karta hai; har case ke (watch row, diffs) jaise-jaise aaye yield karta hai."""
+    from scraper import BatchJob, run_batch, run_batch_http
+
+    items = due(conn, now, limit)
+    if not items:
+        return
+    by_job = {}
+    jobs = []
+    for item in items:
+        job = BatchJob(item["establishment"], item["case_type"], item["filing_year"], item["case_number"])
+        by_job[(job.establishment, job.case_type, job.year, job.case_number)] = item
+        jobs.append(job)
+    # PDF nahi: snapshot sirf badlaav par rakha jaata hai (apply_snapshot), har check par render bekaar storage hai
+    results = run_batch_http(jobs, headless=headless) if http else run_batch(jobs, headless=headless, pdf=False)
+    async for result in results:
+        j = result["job"]
+        item = by_job[(j["establishment"], j["case_type"], j["year"], j["case_number"])]
+        if result["ok"]:
+            yield item, apply_snapshot(conn, item["id"], result.get("html", ""))
+        else:
+            record_failure(conn, item["id"], result.get("error", ""))
+            yield item, None
+
+
+async def run(db_path, limit, http, headless):
+    conn = connect(db_path)
+    ensure_schema(conn)
+    checked = changed = failed = 0
+    started = time.monotonic()
+    async for item, diffs in check_due(conn, limit, http=http, headless=headless):
+        checked += 1
+        name = f"{item['case_type']}/{item['case_number']}/{item['filing_year']}"
+        if diffs is None:
+            failed += 1
+            print(f"ERR  {name}")
+        elif diffs:
+            changed += 1
+            for field, old, new in diffs:
+                print(f"CHG  {name} {field}: {old or '-'} -> {new or '-'}")
+    pending = conn.execute("SELECT count(*), min(next_check) FROM watchlist").fetchone()
+    conn.close()
+    nxt = datetime.fromtimestamp(pending[1]).strftime("%Y-%m-%d %H:%M") if pending[1] else "-"
+    print(f"--- {checked} checked, {changed} changed, {failed} failed in {time.monotonic() - started:.1f}s; "
+          f"{pending[0]} watched, next due {nxt} ---")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch list of tracked cases")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("add")
+    a.add_argument("case_type")
+    a.add_argument("case_number")
+    a.add_argument("year")
+    a.add_argument("--est", default=DEFAULT_ESTABLISHMENT)
+    a.add_argument("--label", default="")
+    i = sub.add_parser("import", help="CSV of establishment,case_type,year,case_number[,label]")
+    i.add_argument("csv_file")
+    r = sub.add_parser("remove")
+    r.add_argument("watch_id", type=int)
+    sub.add_parser("list")
+    run_p = sub.add_parser("run", help="check the cases that are due")
+    run_p.add_argument("--limit", type=int, default=RUN_LIMIT)
+    run_p.add_argument("--browser", action="store_true", help="fetch every case in the browser instead of direct HTTP")
+    run_p.add_argument("--headed", action="store_true")
+    c = sub.add_parser("changes", help="report what changed")
+    c.add_argument("--days", type=float, default=7)
+    args = parser.parse_args()
+
+    if args.cmd == "run":
+        asyncio.run(run(args.db, args.limit, http=not args.browser, headless=not args.headed))
+        return
+    conn = connect(args.db)
+    ensure_schema(conn)
+    if args.cmd == "add":
+        try:
+            print("added" if add(conn, args.case_type, args.case_number, args.year, args.est, args.label) else "already watched")
+        except ValueError as e:
+            raise SystemExit(str(e))
+    elif args.cmd == "import":
+        added = 0
+        with open(args.csv_file, newline="", encoding="utf-8") as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+                if row.get("case_type") and row.get("case_number") and row.get("year"):
+                    try:
+                        added += add(conn, row["case_type"], row["case_number"], row["year"],
+                                     row.get("establishment") or DEFAULT_ESTABLISHMENT, row.get("label", ""))
+                    except ValueError as e:
+                        print(f"line {line} skipped: {e}")
+        print(f"{added} cases added")
+    elif args.cmd == "remove":
+        remove(conn, args.watch_id)
+    elif args.cmd == "list":
+        for r in conn.execute("SELECT id, case_type, case_number, filing_year, next_hearing, next_check, checks, changes, last_error "
+                              "FROM watchlist ORDER BY next_check"):
+            print(f"{r[0]:>4} {r[1]}/{r[2]}/{r[3]}  hearing {r[4] or '-'}  due {datetime.fromtimestamp(r[5]):%Y-%m-%d %H:%M}  "
+                  f"{r[6]} checks, {r[7]} changes{'  ERR ' + r[8] if r[8] else ''}")
+    else:
+        for ts, ctype, number, year, label, field, old, new in changes_since(conn, time.time() - args.days * 86400):
+            print(f"{datetime.fromtimestamp(ts):%Y-%m-%d %H:%M} {ctype}/{number}/{year} {label or ''} {field}: {old or '-'} -> {new or '-'}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()